@@ -4,9 +4,18 @@ A single-file Streamlit dashboard that orchestrates and visualizes
 the analyses in the repository "job-market-analysis".
 
 How it works:
-- Provides toggles in the sidebar to run/import each analysis script.
-- Attempts to import <script>.py and call main(); if import fails, runs it with subprocess.
+- Provides toggles in the sidebar to run each analysis script.
+- Runs the selected scripts (plus the scripts whose outputs they read) with
+  pipeline.py: independent scripts run in parallel processes, unchanged ones
+  are skipped, and each script's log and timing are shown as it runs.
 - Displays CSV samples, summary stats and any PNGs produced under ./graphs/.
+- Charts each script's step timings (wall time, CPU time, peak RSS) across
+  runs, from the trace file every run writes (instrumentation.py).
+- Answers structured filter queries on linkedin_historical one page at a
+  time, from inverted indexes built once per file version (query_engine.py).
+- Loaded frames, stats, dtype tables and graphs are cached across reruns and
+  sessions, keyed on each file's path, mtime and size; a run that rewrites
+  the CSVs or graphs clears the affected caches.
 - Looks for 'spiderman_logo.png' in repo root; if missing, uses emoji header.
 
 Drop this file in the repo root (next to the other .py files & CSVs).
@@ -14,9 +23,6 @@ Run: streamlit run dashboard.py
 """
 
 import streamlit as st
-import subprocess
-import importlib.util
-import sys
 import os
 import glob
 import pandas as pd
@@ -24,72 +30,128 @@ import matplotlib.pyplot as plt
 from pathlib import Path
 import textwrap
 
+import schemas
+from dataset_cache import DATA_DIR, data_path, load_dataset
+import pipeline
+from timeseries_store import DIMENSIONS, SOURCES, load_store
+from query_engine import OPS, QueryEngine, parse_query
+from instrumentation import TRACE_DIR, load_traces
+
 # ---------------------------
 # Configuration / helpers
 # ---------------------------
 REPO_ROOT = Path(__file__).parent
-GRAPHS_DIR = REPO_ROOT / "graphs"
+# Data and graphs live in the data directory the scripts use (the repo unless
+# JOB_MARKET_DATA_DIR is set, see dataset_cache.py)
+GRAPHS_DIR = DATA_DIR / "graphs"
 CSV_FILES = {
-    "linkedin": REPO_ROOT / "linkedin_historical.csv",
-    "indeed": REPO_ROOT / "indeed_webscrape.csv",
-    "linkedin_no_skills": REPO_ROOT / "linkedin_no_skills.csv",
+    "linkedin": data_path("linkedin_historical.csv"),
+    "indeed": data_path("indeed_webscrape.csv"),
+    "linkedin_no_skills": data_path("linkedin_no_skills.csv"),
 }
 
-SCRIPTS = [
-    "clean_linkedin",
-    "clean_skills_plot",
-    "most_common_job_titles",
-    "skill_demand_evolution",
-    "top_hiring_companies",
-    "top_hiring_locations",
-    "hiring_trends_overtime",
-    "forecast_job_postings",
-]
-
-def run_script_as_subprocess(script_name: str):
-    """Run a script as a subprocess and return (success, output)."""
-    path = REPO_ROOT / f"{script_name}.py"
-    if not path.exists():
-        return False, f"{path} not found."
-    try:
-        # Use same python executable
-        proc = subprocess.run([sys.executable, str(path)], capture_output=True, text=True, timeout=300)
-        success = proc.returncode == 0
-        out = proc.stdout + ("\nERR:\n" + proc.stderr if proc.stderr else "")
-        return success, out
-    except Exception as e:
-        return False, str(e)
-
-def try_import_and_run(script_name: str):
-    """Try to import a module and call main() if present."""
-    path = REPO_ROOT / f"{script_name}.py"
-    if not path.exists():
-        return False, f"{path} not found."
-
-    spec = importlib.util.spec_from_file_location(script_name, str(path))
+# Scripts and the files they read/write are declared in pipeline.STAGES
+SCRIPTS = list(pipeline.STAGES)
+
+# ---------------------------
+# Caching
+# ---------------------------
+# Streamlit reruns this whole file on every widget interaction. The cached
+# functions below take a file "version" (mtime_ns, size) as an argument, so a
+# rewritten file is a cache miss and is read again; unchanged files are not.
+
+GRAPH_SUFFIXES = [".png", ".jpg", ".jpeg", ".svg"]
+
+def file_version(path: Path):
+    """(mtime_ns, size) of a file, or None if it doesn't exist."""
     try:
-        module = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(module)
-        if hasattr(module, "main"):
-            result = module.main()
-            return True, f"Imported and executed {script_name}.main() (returned: {result})"
-        else:
-            return False, f"Imported {script_name} but no main() found."
-    except Exception as e:
-        return False, f"Import failed: {e}"
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+def csv_versions():
+    return {label: file_version(path) for label, path in CSV_FILES.items()}
 
-def list_graphs():
-    """Return list of PNG/SVG/JPG in graphs dir, sorted by mtime desc."""
+@st.cache_data(max_entries=len(CSV_FILES) * 2, show_spinner=False)
+def load_sample(path: str, version) -> pd.DataFrame:
+    """First 10000 rows of a CSV (typed by its schema, see schemas.py)."""
+    return schemas.read_csv(path, nrows=10000)
+
+@st.cache_data(max_entries=len(CSV_FILES) * 2, show_spinner=False)
+def sample_stats(path: str, version) -> pd.DataFrame:
+    return load_sample(path, version).describe(include="all").transpose()
+
+@st.cache_data(max_entries=len(CSV_FILES) * 2, show_spinner=False)
+def sample_dtypes(path: str, version) -> pd.DataFrame:
+    return pd.DataFrame(load_sample(path, version).dtypes.astype(str), columns=["dtype"])
+
+@st.cache_resource(max_entries=2, show_spinner="Loading full dataset...")
+def load_full(name: str, version) -> pd.DataFrame:
+    """
+    A whole dataset (via dataset_cache, so a Parquet copy is reused across
+    restarts). A resource: one shared frame for all sessions, never copied,
+    so callers must not modify it.
+    """
+    return load_dataset(name)
+
+@st.cache_resource(max_entries=2, show_spinner="Indexing dataset for queries...")
+def query_engine(name: str, version) -> QueryEngine:
+    """query_engine.QueryEngine over load_full(name) (its indexes are built once per version)."""
+    return QueryEngine(load_full(name, version))
+
+def graph_versions():
+    """(name, mtime_ns, size) of each graph, newest first."""
     if not GRAPHS_DIR.exists():
-        return []
-    files = sorted(GRAPHS_DIR.glob("*"), key=lambda p: p.stat().st_mtime, reverse=True)
-    return [p for p in files if p.suffix.lower() in [".png", ".jpg", ".jpeg", ".svg"]]
+        return ()
+    entries = [(e.name, e.stat().st_mtime_ns, e.stat().st_size)
+               for e in os.scandir(GRAPHS_DIR)
+               if e.is_file() and Path(e.name).suffix.lower() in GRAPH_SUFFIXES]
+    return tuple(sorted(entries, key=lambda e: e[1], reverse=True))
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def load_graphs(versions):
+    """Image bytes of each graph in `versions` (as returned by graph_versions())."""
+    return [(name, mtime_ns, (GRAPHS_DIR / name).read_bytes()) for name, mtime_ns, _ in versions]
 
-def show_image(path: Path, caption=None):
+# Cleaned postings behind the hiring trends panel
+TRENDS_FILE = data_path(SOURCES["linkedin"]["file"])
+
+@st.cache_resource(max_entries=2, show_spinner="Building daily time series...")
+def trends_store(version):
+    """timeseries_store.load_store() (memory-mapped arrays, shared by all sessions)."""
+    return load_store()
+
+def traces_version():
+    """(number, newest mtime_ns) of the trace files."""
+    mtimes = [p.stat().st_mtime_ns for p in TRACE_DIR.glob("*/*.json")]
+    return len(mtimes), max(mtimes, default=0)
+
+@st.cache_data(max_entries=2, show_spinner=False)
+def stage_traces(version) -> pd.DataFrame:
+    """instrumentation.load_traces(): one row per step of every kept run."""
+    return load_traces()
+
+TRACE_MEASURES = {"Wall time (s)": "seconds", "CPU time (s)": "cpu_seconds", "Peak RSS (MiB)": "peak_rss_mib"}
+
+def invalidate_caches(csv_before, graphs_before):
+    """Drop cached entries made stale by a run (the version keys alone would keep them in memory)."""
+    if csv_versions() != csv_before:
+        load_sample.clear()
+        sample_stats.clear()
+        sample_dtypes.clear()
+        load_full.clear()
+        query_engine.clear()
+        trends_store.clear()
+    if graph_versions() != graphs_before:
+        load_graphs.clear()
+    stage_traces.clear()
+
+def show_image(image, caption=None):
     try:
-        st.image(str(path), caption=caption, use_column_width=True)
+        st.image(image, caption=caption, use_column_width=True)
     except Exception:
-        st.write(f"Could not render image: {path}")
+        st.write(f"Could not render image: {caption}")
 
 # ---------------------------
 # Streamlit layout & styles
@@ -126,8 +188,9 @@ st.write("---")
 
 # Sidebar controls
 st.sidebar.header("Controls")
-st.sidebar.markdown("Pick analyses to run or refresh outputs. The dashboard will try to import scripts (preferred) and fallback to running them as standalone scripts if import fails.")
+st.sidebar.markdown("Pick analyses to run or refresh outputs. Scripts they depend on run first; scripts whose inputs haven't changed since their last successful run are skipped.")
 selected = {s: st.sidebar.checkbox(s.replace("_", " ").title(), value=False) for s in SCRIPTS}
+force_run = st.sidebar.checkbox("Rerun even if unchanged", value=False)
 st.sidebar.markdown("### Data preview")
 for name, path in CSV_FILES.items():
     if path.exists():
@@ -135,83 +198,134 @@ for name, path in CSV_FILES.items():
     else:
         st.sidebar.write(f"- {name}: *not found*")
 
+if st.sidebar.button("Clear cached data"):
+    st.cache_data.clear()
+    st.cache_resource.clear()
+
 if st.sidebar.button("Run selected scripts"):
     st.sidebar.info("Running... outputs will appear below.")
-    run_results = {}
-    for script_name, chosen in selected.items():
-        if not chosen:
-            continue
-        st.sidebar.write(f"→ {script_name}.py")
-        ok, msg = try_import_and_run(script_name)
-        if not ok:
-            # fallback to subprocess
-            ok_sub, out = run_script_as_subprocess(script_name)
-            run_results[script_name] = (ok_sub, out)
-        else:
-            run_results[script_name] = (True, msg)
-    st.sidebar.success("Done. Scroll main area for outputs.")
-    # Show run results in main area
+    csv_before, graphs_before = csv_versions(), graph_versions()
+    chosen = [script_name for script_name, chosen in selected.items() if chosen]
+    # Show run results in main area, updated as each stage starts, logs and finishes
     st.subheader("Run results")
-    for name, (ok, out) in run_results.items():
-        if ok:
-            st.success(f"{name}: success")
-            st.code(out[:1500] if isinstance(out, str) else str(out))
-        else:
-            st.error(f"{name}: failed")
-            st.code(out[:1500] if isinstance(out, str) else str(out))
+    panels, logs = {}, {}
+    for kind, script_name, info in pipeline.run(chosen, force=force_run):
+        if script_name not in panels:
+            st.sidebar.write(f"→ {script_name}.py")
+            panels[script_name] = st.empty()
+            logs[script_name] = []
+        with panels[script_name].container():
+            if kind == "start":
+                st.info(f"{script_name}: running")
+            elif kind == "log":
+                logs[script_name].append(info)
+                st.info(f"{script_name}: running")
+                st.code("\n".join(logs[script_name][-30:]))
+            elif kind == "skip":
+                st.info(f"{script_name}: skipped ({info})")
+            elif info["ok"]:
+                st.success(f"{script_name}: success in {info['seconds']:.1f}s")
+                if info["trace"]:
+                    st.dataframe(pd.DataFrame(info["trace"]["steps"]), hide_index=True)
+                st.code("\n".join(logs[script_name])[-1500:])
+            else:
+                st.error(f"{script_name}: failed after {info['seconds']:.1f}s")
+                st.code("\n".join(logs[script_name])[-1500:])
+    invalidate_caches(csv_before, graphs_before)
+    st.sidebar.success("Done. Scroll main area for outputs.")
 
 # Main panels
 left, right = st.columns([2, 3])
 
 with left:
     st.markdown("### Data Explorer")
+    versions = csv_versions()
     for label, path in CSV_FILES.items():
-        if path.exists():
-            df = pd.read_csv(path, nrows=10000)  # sample
+        version = versions[label]
+        if version is not None:
+            df = load_sample(str(path), version)  # sample
             st.markdown(f"#### {label} ({path.name}) — sample")
             st.dataframe(df.head(10))
             if st.button(f"Show basic stats for {label}", key=f"stats_{label}"):
-                st.write(df.describe(include="all").transpose())
+                st.write(sample_stats(str(path), version))
             if st.button(f"Show column types for {label}", key=f"types_{label}"):
-                st.write(pd.DataFrame(df.dtypes, columns=["dtype"]))
+                st.write(sample_dtypes(str(path), version))
         else:
             st.markdown(f"#### {label} — *file not found*")
 
     st.markdown("### Quick custom query")
-    expr = st.text_area("Pandas query on linkedin_historical (e.g. df[df['location'].str.contains('Bengaluru', na=False)])", height=80)
-    if st.button("Run query"):
-        if CSV_FILES["linkedin"].exists():
-            df_full = pd.read_csv(CSV_FILES["linkedin"])
-            try:
-                res = df_full.query(expr) if "@" not in expr else df_full.loc[eval(expr)]
-                st.dataframe(res.head(200))
-            except Exception as e:
-                try:
-                    # fallback: use eval with df variable
-                    df = df_full
-                    res = eval(expr)
-                    st.dataframe(res.head(200))
-                except Exception as e2:
-                    st.error(f"Query failed: {e} / {e2}")
+    query_text = st.text_input(
+        "Filters on linkedin_historical, separated by ';' (e.g. location contains Bengaluru; skills == python)",
+        help="Each filter is 'column op value' with op one of: " + ", ".join(OPS)
+             + ". Other text searches location, company, title and skills. Case is ignored.",
+    )
+    page_number = st.number_input("Page", min_value=1, value=1, step=1)
+    if query_text and versions["linkedin"] is not None:
+        engine = query_engine(CSV_FILES["linkedin"].name, versions["linkedin"])
+        try:
+            result = engine.query(*parse_query(query_text), page=page_number - 1)
+        except ValueError as e:
+            st.error(f"Query failed: {e}")
         else:
-            st.error("linkedin_historical.csv not found in repo root.")
+            st.caption(f"{result.total:,} matching rows — page {result.page + 1} of {result.pages}")
+            st.dataframe(result.rows)
+    elif query_text:
+        st.error("linkedin_historical.csv not found in repo root.")
 
 with right:
+    st.markdown("### Hiring Trends")
+    trends_version = file_version(TRENDS_FILE)
+    if trends_version is None:
+        st.info(f"{TRENDS_FILE.name} not found. Run Clean Linkedin to build it.")
+    else:
+        store = trends_store(trends_version)
+        c1, c2, c3 = st.columns(3)
+        freq = {"Month": "M", "Week": "W", "Day": "D"}[c1.selectbox("Granularity", ["Month", "Week", "Day"])]
+        dimension = c2.selectbox("Segment by", ["total"] + list(DIMENSIONS))
+        values = store.segments[store.segments.get_level_values(0) == dimension].get_level_values(1)
+        segment = c3.selectbox("Segment", list(values))
+        first, last = store.start.date(), store.end.date()
+        date_range = st.slider("Dates", min_value=first, max_value=last, value=(first, last))
+        trend = store.query(freq, *date_range, dimension=dimension, segment=segment)
+        st.line_chart(trend.set_axis(trend.index.to_timestamp()).rename("postings"))
+
+    st.markdown("### Stage Timings")
+    traces = stage_traces(traces_version())
+    if traces.empty:
+        st.info("No trace files yet. Run scripts to record the timings of their steps (see instrumentation.py).")
+    else:
+        c1, c2 = st.columns(2)
+        script = c1.selectbox("Script", sorted(traces["script"].unique()))
+        measure = TRACE_MEASURES[c2.selectbox("Measure", list(TRACE_MEASURES))]
+        runs = traces[traces["script"] == script]
+        # Top-level steps only: nested steps are part of their parent's time
+        steps = runs[runs["parent"].isna() & (runs["step"] != "total")]
+        if measure == "peak_rss_mib":
+            st.line_chart(steps.pivot_table(index="started", columns="step", values=measure, aggfunc="max", sort=False))
+        else:
+            st.bar_chart(steps.pivot_table(index="started", columns="step", values=measure, aggfunc="sum", sort=False))
+        latest = runs[runs["run_id"] == runs["run_id"].iloc[-1]]
+        st.caption(f"Steps of the latest run ({latest['started'].iloc[0]:%Y-%m-%d %H:%M:%S} UTC, "
+                   f"{len(runs['run_id'].unique())} runs kept)")
+        st.dataframe(latest.drop(columns=["script", "run_id", "started"]), hide_index=True)
+
     st.markdown("### Generated Graphs")
-    graphs = list_graphs()
+    graphs = load_graphs(graph_versions())
     if not graphs:
         st.info("No graphs found in ./graphs/. Try running scripts to produce plots (select them in sidebar and click 'Run selected scripts').")
     else:
-        for p in graphs:
-            st.markdown(f"**{p.name}** — {p.stat().st_mtime_ns}")
-            show_image(p)
+        for name, mtime_ns, image in graphs:
+            st.markdown(f"**{name}** — {mtime_ns}")
+            show_image(image, caption=name)
 
 st.write("---")
 st.markdown("### Utilities & Notes")
 st.markdown(textwrap.dedent("""
-- The dashboard first **attempts to import** the .py files and call `main()`. This is the safest integration path.
-- If import fails (missing `main()` or dependencies), it runs the script as `python script.py`. Make sure each script can run standalone.
-- Produced plots should be saved by the scripts into `./graphs/` for the dashboard to automatically display them.
+- Scripts run as `python script.py` in separate processes (see `pipeline.py`). Make sure each script can run standalone.
+- When adding a script, declare the files it reads and writes in `pipeline.STAGES` so it runs after the scripts it depends on.
+- Scripts run headless here, so their figures are saved into `./graphs/` (see `plotting.py`) for the dashboard to display them.
+- Start the dashboard with `ANALYSIS_BACKEND=duckdb` to run the scripts' aggregations as DuckDB queries on the data files (see `sql_backend.py`; `python sql_backend.py` checks them against the pandas results).
+- Each script run writes the timings of its steps to `./.traces/<script>/`. Set `JOB_MARKET_PROFILE=cprofile` (or `sample`, a cheaper stack sampler) before starting the dashboard to also save a profile of every run next to its trace (see `instrumentation.py`).
 - To add a Spiderman logo, drop an image named `spiderman_logo.png` into the repo root and refresh the app.
 """))
 
@@ -0,0 +1,185 @@
+"""
+arima_cache.py
+Reuses fitted ARIMA parameters across runs instead of refitting every series.
+
+For each (series, order) the cache keeps the fitted parameters, how many
+observations they were fitted on, and a hash of the observations seen so far.
+When the series comes back:
+
+- unchanged: the cached parameters are reused (a Kalman filter pass over the
+  data, no optimization);
+- with new months appended: the new months are filtered with the cached
+  parameters (as ARIMAResults.append(refit=False) would). A full refit, warm
+  started from the cached parameters, happens only once REFIT_EVERY months
+  have been appended since the last fit, or when the new months drift: their
+  mean absolute one-step error exceeds DRIFT_THRESHOLD standard deviations;
+- rewritten (the old observations changed): refit.
+
+backtest_orders() compares (p, d, q) orders by walk-forward one-step errors
+over the last `holdout` months. Each order is fitted (or taken from the
+cache) on the months before the holdout; one filter pass then gives every
+one-step forecast of the holdout at once. select_order() caches the winner
+per series and only backtests again every REFIT_EVERY months.
+
+Each script keeps its own cache file,
+./.dataset_cache/arima_models-<stage>.json: the pipeline runs
+forecast_job_postings.py and batch_forecast.py at the same time, and with
+one shared file each would overwrite the entries the other just saved.
+"""
+
+import hashlib
+import json
+import os
+import warnings
+
+import numpy as np
+from statsmodels.tsa.arima.model import ARIMA
+
+from dataset_cache import CACHE_DIR
+
+REFIT_EVERY = 6
+DRIFT_THRESHOLD = 3.0
+HOLDOUT = 3
+
+# Orders compared by backtest_orders() when no list is given
+ORDERS = [(p, 1, q) for p in range(3) for q in range(3)]
+
+
+def series_key(dimension, segment, order) -> str:
+    """Cache key of a series' model for `order`, or of its order selection for order="auto"."""
+    return f"{dimension}\t{segment}\t{order if isinstance(order, str) else ','.join(map(str, order))}"
+
+
+def values_hash(values) -> str:
+    return hashlib.blake2b(np.asarray(values, dtype=float).tobytes(), digest_size=12).hexdigest()
+
+
+def cache_file(stage):
+    return CACHE_DIR / f"arima_models-{stage}.json"
+
+
+def load_models(stage) -> dict:
+    """The model cache of `stage` (the script using it), {} if there is none yet."""
+    try:
+        with open(cache_file(stage)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_models(models: dict, stage):
+    CACHE_DIR.mkdir(exist_ok=True)
+    path = cache_file(stage)
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    with open(tmp, "w") as f:
+        json.dump(models, f)
+    os.replace(tmp, path)
+
+
+def _model(values, order):
+    return ARIMA(np.asarray(values, dtype=float), order=order)
+
+
+def _fit(values, order, start_params=None):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        return _model(values, order).fit(start_params=start_params)
+
+
+def _filter(values, order, params):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        return _model(values, order).filter(np.asarray(params))
+
+
+def _entry(values, order, results, fit_n_obs):
+    return {
+        "order": list(order),
+        "params": results.params.tolist(),
+        "fit_n_obs": fit_n_obs,
+        "n_obs": len(values),
+        "hash": values_hash(values),
+    }
+
+
+def matches(entry, values) -> bool:
+    """Whether `values` starts with the observations `entry` has seen."""
+    return (entry is not None and entry["n_obs"] <= len(values)
+            and values_hash(values[:entry["n_obs"]]) == entry["hash"])
+
+
+def drift(results, start) -> float:
+    """Mean absolute one-step error from observation `start` on, in standard deviations."""
+    sigma = np.sqrt(results.params[-1]) if results.param_names[-1] == "sigma2" else np.std(results.resid)
+    errors = np.asarray(results.resid)[start:]
+    return float(np.mean(np.abs(errors)) / sigma) if len(errors) and sigma > 0 else 0.0
+
+
+def update_model(values, order, entry=None, refit_every=REFIT_EVERY, drift_threshold=DRIFT_THRESHOLD):
+    """
+    ARIMA results for `values`, reusing `entry` (a cache entry for this series
+    and order, or None) where possible. Returns (results, new entry, action),
+    action being one of "fit", "cached", "append", "refit-schedule", "refit-drift".
+    """
+    values = np.asarray(values, dtype=float)
+    if not matches(entry, values) or list(entry["order"]) != list(order):
+        start_params = entry["params"] if entry is not None and list(entry["order"]) == list(order) else None
+        results = _fit(values, order, start_params)
+        return results, _entry(values, order, results, len(values)), "fit"
+
+    results = _filter(values, order, entry["params"])
+    if len(values) == entry["n_obs"]:
+        return results, entry, "cached"
+
+    if len(values) - entry["fit_n_obs"] >= refit_every:
+        action = "refit-schedule"
+    elif drift(results, entry["n_obs"]) > drift_threshold:
+        action = "refit-drift"
+    else:
+        return results, _entry(values, order, results, entry["fit_n_obs"]), "append"
+    results = _fit(values, order, start_params=entry["params"])
+    return results, _entry(values, order, results, len(values)), action
+
+
+def backtest_orders(values, orders=None, holdout=HOLDOUT, entries=None) -> dict:
+    """
+    Mean absolute one-step error of each order over the last `holdout`
+    values: {order: mae}. entries maps order -> cache entry; a cached fit
+    that only saw months before the holdout (e.g. from an earlier run) is
+    reused as is, other orders are fitted on the months before the holdout.
+    """
+    values = np.asarray(values, dtype=float)
+    train = values[:len(values) - holdout]
+    scores = {}
+    for order in orders or ORDERS:
+        entry = (entries or {}).get(tuple(order))
+        if matches(entry, train) and list(entry["order"]) == list(order):
+            params = entry["params"]
+        else:
+            try:
+                params = _fit(train, order).params
+            except (ValueError, np.linalg.LinAlgError):
+                continue
+        # One filter pass over the whole series: every one-step forecast of the holdout
+        predicted = np.asarray(_filter(values, order, params).fittedvalues)[len(train):]
+        if np.isfinite(predicted).all():
+            scores[tuple(order)] = float(np.mean(np.abs(predicted - values[len(train):])))
+    return scores
+
+
+def select_order(values, selection=None, orders=None, holdout=HOLDOUT, entries=None,
+                 reselect_every=REFIT_EVERY):
+    """
+    Order with the lowest backtest_orders() error: (order, selection entry).
+    `selection` is the cached result of an earlier call for this series; its
+    order is kept until `reselect_every` months have been appended or the
+    old months changed.
+    """
+    values = np.asarray(values, dtype=float)
+    if matches(selection, values) and len(values) - selection["n_obs"] < reselect_every:
+        return tuple(selection["order"]), selection
+    scores = backtest_orders(values, orders, holdout, entries)
+    if not scores:
+        return None, selection
+    order = min(scores, key=scores.get)
+    return order, {"order": list(order), "mae": scores[order], "n_obs": len(values), "hash": values_hash(values)}
@@ -0,0 +1,176 @@
+"""
+batch_forecast.py
+Monthly job-posting forecasts for every company, location and title family.
+
+- The monthly series come from the time-series store (timeseries_store.py):
+  one row per segment, one column per month (months without postings are
+  0). The overall total is the ("total", "all") series.
+- forecast_segments() fits ARIMA(order) to each series, in parallel worker
+  processes. Series with less than `min_length` months since their first
+  posting (or whose ARIMA fit fails) get a cheap fallback instead: the mean
+  of their last FALLBACK_WINDOW months.
+- Fitted ARIMA parameters are cached per series and order (arima_cache.py),
+  so a rerun with the same or a few more months mostly filters instead of
+  refitting. --order auto picks each series' order by walk-forward backtest.
+- All forecasts go to one long, columnar table
+  (dimension, segment, ds, forecast, model, order, fitting), saved as
+  FORECASTS_FILE.
+
+forecast_job_postings.py is the ("total", "all") case of this.
+
+Run: python batch_forecast.py [--steps 6] [--workers N] [--order auto] [--no-cache]
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import arima_cache
+from dataset_cache import HAVE_PARQUET, data_path
+from instrumentation import step
+from timeseries_store import load_store
+
+FORECASTS_FILE = "segment_forecasts.parquet" if HAVE_PARQUET else "segment_forecasts.csv"
+
+ORDER = (2, 1, 2)
+MIN_LENGTH = 12
+FALLBACK_WINDOW = 3
+CHUNK_SIZE = 64
+STAGE = "batch_forecast"
+
+
+def fit_forecast(values, steps, order=ORDER, min_length=MIN_LENGTH, entries=None):
+    """
+    Forecast one series: (forecast array, model name, order, fitting, entries).
+
+    order="auto" picks the order with arima_cache.select_order() (for series
+    long enough to hold out arima_cache.HOLDOUT months). entries maps order
+    (or "auto") -> arima_cache entry of this series (None: no caching); the
+    updated entries are returned, and `fitting` says whether the ARIMA was
+    fitted or reused (see arima_cache.update_model).
+    """
+    values = np.asarray(values, dtype=float)
+    active = values[np.argmax(values > 0):] if values.any() else values[:0]
+    entries = {} if entries is None else dict(entries)
+    if len(active) >= min_length:
+        try:
+            if order == "auto":
+                selected = None
+                if len(active) >= min_length + arima_cache.HOLDOUT:
+                    selected, entries["auto"] = arima_cache.select_order(active, entries.get("auto"), entries=entries)
+                order = selected or ORDER
+            results, entries[order], fitting = arima_cache.update_model(active, order, entries.get(order))
+            forecast = np.asarray(results.forecast(steps=steps))
+            if np.isfinite(forecast).all():
+                return forecast, "arima", order, fitting, entries
+        except (ValueError, IndexError, np.linalg.LinAlgError):  # IndexError: statsmodels on a 2-month series
+            pass
+    level = active[-FALLBACK_WINDOW:].mean() if len(active) else 0.0
+    return np.full(steps, level), "mean", None, "", entries
+
+
+def _forecast_chunk(rows, entries, steps, order, min_length):
+    return [fit_forecast(row, steps, order, min_length, row_entries) for row, row_entries in zip(rows, entries)]
+
+
+def forecast_segments(series: pd.DataFrame, steps=6, order=ORDER, min_length=MIN_LENGTH,
+                      workers=None, chunk_size=CHUNK_SIZE, models=None) -> pd.DataFrame:
+    """
+    Forecast every row of `series` (segments x monthly periods, as
+    TimeSeriesStore.matrix("M") returns) `steps` months ahead, one output row
+    per segment and month. `order` is a (p, d, q) tuple or "auto".
+
+    models: an arima_cache model dict (see arima_cache.load_models()); fitted
+    parameters are reused from it and it is updated in place.
+    """
+    values = series.to_numpy(dtype=float)
+    orders = arima_cache.ORDERS + ["auto"] if order == "auto" else [order]
+    entries = [
+        {o: models[k] for o in orders if (k := arima_cache.series_key(dim, seg, o)) in models}
+        for dim, seg in series.index
+    ] if models is not None else [{} for _ in range(len(series))]
+
+    bounds = range(0, len(values), chunk_size)
+    chunks = [(values[i:i + chunk_size], entries[i:i + chunk_size]) for i in bounds]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(chunks) == 1:
+        results = [r for rows, e in chunks for r in _forecast_chunk(rows, e, steps, order, min_length)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            n = len(chunks)
+            mapped = pool.map(_forecast_chunk, [c[0] for c in chunks], [c[1] for c in chunks],
+                              [steps] * n, [order] * n, [min_length] * n)
+            results = [r for chunk in mapped for r in chunk]
+
+    if models is not None:
+        for (dim, seg), (*_, row_entries) in zip(series.index, results):
+            for o, entry in row_entries.items():
+                models[arima_cache.series_key(dim, seg, o)] = entry
+
+    # Forecast months are labeled by their last day
+    future = pd.period_range(series.columns[-1] + 1, periods=steps, freq="M")
+    ds = future.to_timestamp(how="end").normalize()
+    forecasts = np.concatenate([r[0] for r in results]) if results else np.empty(0)
+    return pd.DataFrame({
+        "dimension": np.repeat(series.index.get_level_values(0).to_numpy(), steps),
+        "segment": np.repeat(series.index.get_level_values(1).to_numpy(), steps),
+        "ds": np.tile(ds, len(results)),
+        "forecast": forecasts,
+        "model": np.repeat([r[1] for r in results], steps),
+        "order": np.repeat([",".join(map(str, r[2])) if r[2] else "" for r in results], steps),
+        "fitting": np.repeat([r[3] for r in results], steps),
+    })
+
+
+def save_forecasts(forecasts: pd.DataFrame, name=FORECASTS_FILE):
+    path = data_path(name)
+    if path.suffix == ".parquet":
+        forecasts.to_parquet(path, index=False)
+    else:
+        forecasts.to_csv(path, index=False)
+    return path
+
+
+def parse_order(text):
+    """'2,1,2' -> (2, 1, 2); 'auto' stays 'auto'."""
+    return text if text == "auto" else tuple(int(x) for x in text.split(","))
+
+
+def main(steps=6, workers=None, min_length=MIN_LENGTH, order=ORDER, cache=True):
+    with step("load series") as s:
+        series = load_store().matrix("M")
+        s.rows_out = len(series)
+    models = arima_cache.load_models(STAGE) if cache else None
+    start = time.perf_counter()
+    with step("ARIMA fit", rows_in=len(series)) as s:
+        forecasts = forecast_segments(series, steps=steps, order=order, min_length=min_length,
+                                      workers=workers, models=models)
+        s.rows_out = len(forecasts)
+    seconds = time.perf_counter() - start
+    with step("save", rows_in=len(forecasts)):
+        if cache:
+            arima_cache.save_models(models, STAGE)
+        path = save_forecasts(forecasts)
+    per_series = forecasts.drop_duplicates(["dimension", "segment"])
+    summary = per_series.groupby(["model", "fitting"]).size()
+    print(f"Forecast {len(series)} series in {seconds:.1f}s ({len(series) / seconds:.1f} series/sec; "
+          + ", ".join(f"{n} {m}" + (f" {u}" if u else "") for (m, u), n in summary.items())
+          + f"). Saved to {path.name}")
+    return forecasts
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Forecast monthly postings per company, location and title family")
+    parser.add_argument("--steps", type=int, default=6, help="months to forecast")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--min-length", type=int, default=MIN_LENGTH,
+                        help="months of history needed for ARIMA; shorter series use the mean fallback")
+    parser.add_argument("--order", type=parse_order, default=ORDER,
+                        help="ARIMA order as p,d,q, or 'auto' to pick one per series by walk-forward backtest")
+    parser.add_argument("--no-cache", action="store_true", help="refit every series instead of reusing cached fits")
+    args = parser.parse_args()
+    main(steps=args.steps, workers=args.workers, min_length=args.min_length, order=args.order, cache=not args.no_cache)
@@ -0,0 +1,79 @@
+"""
+bench_batch_forecast.py
+Throughput (series/sec) of batch_forecast.forecast_segments on synthetic
+monthly series.
+
+Each synthetic series is Poisson counts around a random level with a trend
+and yearly seasonality; --short-share of them only start posting in the last
+few months, so they take the mean fallback instead of ARIMA. The same series
+are forecast with 1 worker and with --workers workers.
+
+The cache rows (1 worker) show the arima_cache reuse: a cold run that
+fills the model cache, a rerun on the same data, and a run with one more
+month appended.
+
+Run: python benchmarks/bench_batch_forecast.py --series 2000 --months 36
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from batch_forecast import MIN_LENGTH, forecast_segments  # noqa: E402
+
+
+def make_series(n, months, short_share, seed=0):
+    rng = np.random.default_rng(seed)
+    t = np.arange(months)
+    level = rng.lognormal(2, 1, size=(n, 1))
+    trend = rng.normal(0, 0.01, size=(n, 1)) * t
+    season = 0.2 * np.sin(2 * np.pi * (t + rng.integers(0, 12, size=(n, 1))) / 12)
+    counts = rng.poisson(level * np.exp(trend + season)).astype(np.int64)
+    short = rng.random(n) < short_share
+    starts = rng.integers(months - MIN_LENGTH + 1, months, size=n)
+    counts[short] = np.where(t >= starts[short, None], counts[short], 0)
+    index = pd.MultiIndex.from_arrays([np.repeat("company", n), [f"company-{i}" for i in range(n)]],
+                                      names=["dimension", "segment"])
+    columns = pd.period_range("2020-01", periods=months, freq="M")
+    return pd.DataFrame(counts, index=index, columns=columns)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--series", type=int, default=500)
+    parser.add_argument("--months", type=int, default=36)
+    parser.add_argument("--short-share", type=float, default=0.3)
+    parser.add_argument("--steps", type=int, default=6)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    series = make_series(args.series, args.months, args.short_share)
+    print(f"{args.series:,} series x {args.months} months, {args.steps}-month forecasts")
+    print(f"{'workers':>8}{'seconds':>10}{'series/sec':>12}{'arima':>8}{'mean':>8}")
+    for workers in sorted({1, args.workers}):
+        start = time.perf_counter()
+        forecasts = forecast_segments(series, steps=args.steps, workers=workers)
+        seconds = time.perf_counter() - start
+        models = forecasts.groupby("model").size() // args.steps
+        print(f"{workers:>8}{seconds:>10.2f}{args.series / seconds:>12.1f}"
+              f"{models.get('arima', 0):>8}{models.get('mean', 0):>8}")
+
+    print(f"{'cache':<14}{'seconds':>10}{'series/sec':>12}  fitting")
+    cache = {}
+    for label, months in [("cold", args.months - 1), ("same data", args.months - 1), ("+1 month", args.months)]:
+        start = time.perf_counter()
+        forecasts = forecast_segments(series.iloc[:, :months], steps=args.steps, workers=1, models=cache)
+        seconds = time.perf_counter() - start
+        fitting = forecasts.drop_duplicates(["dimension", "segment"])["fitting"].value_counts()
+        print(f"{label:<14}{seconds:>10.2f}{args.series / seconds:>12.1f}  "
+              + ", ".join(f"{n} {f or 'mean'}" for f, n in fitting.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+bench_canonical_names.py
+Build time, comparisons and accuracy of canonical_names.AliasTable on
+synthetic company names.
+
+--companies base names are made of random syllables; each gets up to
+--variants spellings: a legal suffix (", Inc.", " LLC", ...), another case,
+or a one-letter typo. The table is built from scratch, then a second batch
+of new variants is added to it (as a later run would), and finally every
+name is mapped with lookup() (the dictionary path). Accuracy is pairwise
+over the generated variants: precision = merged pairs that are true
+variants, recall = true variant pairs that were merged.
+
+Run: python benchmarks/bench_canonical_names.py --companies 50000
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from canonical_names import AliasTable  # noqa: E402
+
+SYLLABLES = [c + v for c in "bcdfghjklmnprstvz" for v in "aeiou"] + ["tek", "zon", "nex", "quo", "sol", "tri"]
+WORDS = ["Systems", "Labs", "Health", "Energy", "Logistics", "Partners", "Software", "Analytics"]
+SUFFIXES = [", Inc.", " Inc", " LLC", " Corp", " Corporation", " Ltd", ".com"]
+
+
+def make_names(companies, variants, seed=0):
+    """(name, company id) pairs: every company's plain name and its variants."""
+    rng = np.random.default_rng(seed)
+    rows, seen = [], set()
+    for company in range(companies):
+        base = "".join(rng.choice(SYLLABLES, size=rng.integers(2, 5))).capitalize()
+        if rng.random() < 0.5:
+            base += " " + rng.choice(WORDS)
+        if base.lower() in seen:
+            continue
+        seen.add(base.lower())
+        names = {base}
+        for _ in range(rng.integers(0, variants + 1)):
+            kind = rng.integers(3)
+            if kind == 0:
+                names.add(base + rng.choice(SUFFIXES))
+            elif kind == 1:
+                names.add(base.upper() if rng.random() < 0.5 else base.lower())
+            else:
+                i = rng.integers(1, len(base))
+                names.add(base[:i] + base[i + 1:] if len(base) > 8 else base)
+        rows += [(name, company) for name in names]
+    return pd.DataFrame(rows, columns=["name", "company"])
+
+
+def pair_accuracy(table, names):
+    """Pairwise precision and recall of the table's clusters against the true companies."""
+    canonical = table.lookup(names["name"])
+    true_pairs = names.groupby("company").size().pipe(lambda s: (s * (s - 1) // 2).sum())
+    found = names.assign(canonical=canonical.to_numpy())
+    found_pairs = found.groupby("canonical").size().pipe(lambda s: (s * (s - 1) // 2).sum())
+    both = found.groupby(["canonical", "company"]).size().pipe(lambda s: (s * (s - 1) // 2).sum())
+    return both / max(found_pairs, 1), both / max(true_pairs, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--companies", type=int, default=20_000)
+    parser.add_argument("--variants", type=int, default=3)
+    args = parser.parse_args()
+
+    names = make_names(args.companies, args.variants)
+    first = names.sample(frac=0.8, random_state=0)
+    later = names.drop(first.index)
+    counts = lambda df: df["name"].value_counts(sort=False)  # noqa: E731
+
+    table = AliasTable("company")
+    print(f"{len(names):,} names of {names['company'].nunique():,} companies")
+    print(f"{'batch':<10}{'names':>10}{'seconds':>10}{'compared':>14}{'naive':>18}{'avoided':>10}")
+    for label, batch in [("initial", first), ("later", later)]:
+        start = time.perf_counter()
+        stats = table.update(counts(batch))
+        seconds = time.perf_counter() - start
+        print(f"{label:<10}{len(batch):>10,}{seconds:>10.2f}{stats['compared']:>14,}{stats['naive']:>18,}"
+              f"{stats['avoided'] / max(stats['naive'], 1):>10.2%}")
+
+    column = names["name"].sample(n=1_000_000, replace=True, random_state=0)
+    start = time.perf_counter()
+    table.lookup(column)
+    print(f"lookup of {len(column):,} rows: {time.perf_counter() - start:.2f}s")
+    precision, recall = pair_accuracy(table, names)
+    print(f"pairwise precision {precision:.3f}, recall {recall:.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+bench_context_extract.py
+Rows/sec of the LinkedIn `context` date extraction paths:
+
+- apply:    df["context"].apply(extract_date)  (the original clean_linkedin path)
+- regex:    extract_dates(), vectorized regex with json.loads fallback
+- parallel: extract_context() with all CONTEXT_FIELDS, for each --workers value
+
+Run: python benchmarks/bench_context_extract.py --rows 200000 --workers 1 4
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from linkedin_context import JSON_BACKEND, extract_context, extract_date, extract_dates  # noqa: E402
+
+
+def make_context(rows, seed=0):
+    rng = random.Random(seed)
+    values = []
+    for i in range(rows):
+        values.append(json.dumps({
+            "@context": "http://schema.org",
+            "@type": "JobPosting",
+            "datePosted": f"2021-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T00:00:00.000Z",
+            "validThrough": "2021-12-31T00:00:00.000Z",
+            "employmentType": "FULL_TIME",
+            "hiringOrganization": {"@type": "Organization", "name": f"Company {rng.randint(1, 5000)}"},
+            "jobLocation": {"@type": "Place", "address": {"addressLocality": "Columbus", "addressRegion": "OH"}},
+            "description": "lorem ipsum " * rng.randint(50, 400),
+        }))
+    return pd.Series(values)
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+
+    context = make_context(args.rows)
+    print(f"{args.rows} rows, JSON backend: {JSON_BACKEND}")
+
+    base_s, base = timed(lambda: context.apply(extract_date))
+    results = [("apply (baseline)", base_s)]
+
+    regex_s, fast = timed(lambda: extract_dates(context))
+    assert fast.equals(base.astype(object)), "regex path disagrees with extract_date"
+    results.append(("regex", regex_s))
+
+    for workers in args.workers:
+        secs, _ = timed(lambda: extract_context(context, workers=workers))
+        results.append((f"parallel, all fields, workers={workers}", secs))
+
+    print(f"{'path':<40}{'seconds':>10}{'rows/sec':>14}{'speedup':>10}")
+    for name, secs in results:
+        print(f"{name:<40}{secs:>10.2f}{args.rows / secs:>14,.0f}{base_s / secs:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+bench_heavy_hitters.py
+Exact value_counts() versus the heavy-hitter sketches of heavy_hitters.py
+on a synthetic Zipf-distributed stream of company names.
+
+For each path it reports time, the number of counters it holds (its
+memory grows with this: one per distinct value for the exact path), recall
+of the true top-k, and the largest absolute count error among the
+reported top-k. The stream is fed as --shards separate shards whose
+sketches are merged, as they would be for data split across workers.
+
+Run: python benchmarks/bench_heavy_hitters.py --items 5000000 --distinct 1000000
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from heavy_hitters import CountMinSketch, SpaceSaving  # noqa: E402
+
+
+def make_stream(items, distinct, seed=0):
+    rng = np.random.default_rng(seed)
+    ranks = np.minimum(rng.zipf(1.1, size=items), distinct)
+    return pd.Series(np.char.add("company-", ranks.astype(str)).astype(object))
+
+
+def chunks(stream, shards, chunksize):
+    """Yield (shard number, chunk) pairs."""
+    bounds = np.linspace(0, len(stream), shards + 1).astype(int)
+    for shard, (lo, hi) in enumerate(zip(bounds[:-1], bounds[1:])):
+        for start in range(lo, hi, chunksize):
+            yield shard, stream.iloc[start:min(start + chunksize, hi)]
+
+
+def run(name, fn):
+    start = time.perf_counter()
+    top, counters = fn()
+    return name, time.perf_counter() - start, counters, top
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=2_000_000)
+    parser.add_argument("--distinct", type=int, default=500_000)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--capacity", type=int, default=1000)
+    parser.add_argument("--eps", type=float, default=1e-4)
+    parser.add_argument("--shards", type=int, default=4)
+    parser.add_argument("--chunksize", type=int, default=100_000)
+    args = parser.parse_args()
+
+    stream = make_stream(args.items, args.distinct)
+    print(f"{args.items:,} items, up to {args.distinct:,} distinct, {args.shards} shards, top-{args.k}")
+
+    def exact():
+        # What the scripts do: one hash table over every distinct value
+        counts = stream.value_counts()
+        return counts.head(args.k), len(counts)
+
+    def sketched(make):
+        merged = make()
+        shard_sketch, current = None, None
+        for shard, chunk in chunks(stream, args.shards, args.chunksize):
+            if shard != current:
+                if shard_sketch is not None:
+                    merged.merge(shard_sketch)
+                shard_sketch, current = make(), shard
+            shard_sketch.update(chunk.value_counts(sort=False))
+        merged.merge(shard_sketch)
+        return merged.top(args.k)["count"], merged.size
+
+    results = [
+        run("exact", exact),
+        run(f"space-saving (capacity={args.capacity})", lambda: sketched(lambda: SpaceSaving(args.capacity))),
+        run(f"count-min (eps={args.eps:g})",
+            lambda: sketched(lambda: CountMinSketch(eps=args.eps, candidates=args.capacity))),
+    ]
+
+    truth = results[0][3]
+    print(f"{'path':<32}{'seconds':>9}{'counters':>11}{'recall':>8}{'max abs err':>13}")
+    for name, seconds, counters, top in results:
+        recall = len(set(top.index) & set(truth.index)) / args.k
+        true_counts = stream[stream.isin(top.index)].value_counts().reindex(top.index)
+        err = int((top - true_counts).abs().max())
+        print(f"{name:<32}{seconds:>9.2f}{counters:>11,}{recall:>8.0%}{err:>13,}")
+
+
+if __name__ == "__main__":
+    main()
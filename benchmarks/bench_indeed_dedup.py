@@ -0,0 +1,77 @@
+"""
+bench_indeed_dedup.py
+Grouping the Indeed rows per posting: the old groupby on the full
+job_title-href with a per-group lambda, versus clean_skills_plot.py's
+grouping on 64-bit canonical-link keys (see posting_urls.py) with the skills
+joined in one pass; then an --incremental merge of a repeat scrape.
+
+The rows come from synthetic.py (--rows rows, whose links carry tracking
+parameters and where a few postings are scraped twice under different
+links). The old grouping has one row per link, the new one per posting.
+For the merge, the first half of the file is cleaned, then the second half
+is appended and merged, then a copy of the first rows with new tracking
+parameters (a repeat scrape) is appended and merged.
+
+Run: python benchmarks/bench_indeed_dedup.py --rows 1e6
+"""
+
+import argparse
+import os
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+
+def link_groupby(indeed_data):
+    """clean_skills_plot.group_indeed() before postings were keyed on canonical links."""
+    return indeed_data.groupby(['job_title-href'], as_index=False).agg({
+        'job_title': 'first', 'location': 'first', 'company': 'first',
+        'skills': lambda x: ', '.join(x.dropna().unique()),
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=float, default=2e5, help="rows of the synthetic Indeed scrape")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # The scripts' modules read and write the data directory given here (see dataset_cache.py)
+        os.environ["JOB_MARKET_DATA_DIR"] = tmp
+        import schemas
+        from clean_skills_plot import INDEED_FILE, clean_indeed_incremental, drop_blank_skills, group_indeed
+        from synthetic import generate
+
+        path = generate(tmp, int(args.rows), datasets=[INDEED_FILE])[INDEED_FILE]
+        indeed_data = drop_blank_skills(schemas.read_csv(path, schema=schemas.schema_for(INDEED_FILE)))
+        print(f"{len(indeed_data):,} rows with skills, {indeed_data['job_title-href'].nunique():,} links")
+
+        print(f"{'grouping':<34}{'rows out':>10}{'seconds':>10}")
+        for label, group in [("per link (groupby + lambda)", link_groupby), ("per posting (64-bit keys)", group_indeed)]:
+            start = time.perf_counter()
+            grouped = group(indeed_data)
+            print(f"{label:<34}{len(grouped):>10,}{time.perf_counter() - start:>10.2f}")
+
+        lines = path.read_text().splitlines(keepends=True)
+        header, rows = lines[0], lines[1:]
+        half = len(rows) // 2
+        repeat = [re.sub(r"xkcb=[0-9a-f]+", "xkcb=0000000000", line) for line in rows[:half]]
+        path.write_text(header + "".join(rows[:half]))
+        print(f"{'--incremental merge':<34}{'rows in':>10}{'seconds':>10}")
+        for label, appended in [("first half (full build)", rows[:half]), ("second half", rows[half:]),
+                                ("repeat scrape of the first half", repeat)]:
+            if label != "first half (full build)":
+                with open(path, "a") as f:
+                    f.writelines(appended)
+            start = time.perf_counter()
+            clean_indeed_incremental()
+            print(f"{label:<34}{len(appended):>10,}{time.perf_counter() - start:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
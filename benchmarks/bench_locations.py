@@ -0,0 +1,74 @@
+"""
+bench_locations.py
+Throughput of locations.normalize_locations on a synthetic location column.
+
+The column is --rows values drawn (Zipf-distributed) from --distinct
+strings built from the gazetteer's cities: plain "City, ST", with a street
+address and ZIP code, with a "Remote" marker, or with the country
+appended. The first run parses every distinct string; the second finds them
+all in the LRU memo. The per-row loop (normalize_location on every value,
+as a .map would) is timed on a --sample of the rows.
+
+Run: python benchmarks/bench_locations.py --rows 5000000 --distinct 20000
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from locations import gazetteer, normalize_location, normalize_locations  # noqa: E402
+
+
+def make_column(rows, distinct, seed=0):
+    rng = np.random.default_rng(seed)
+    cities = [(m[0], m[1], m[2]) for ms in gazetteer().cities.values() for m in ms if m[2] == "US"]
+    strings = []
+    for i in range(distinct):
+        city, region, _ = cities[rng.integers(len(cities))]
+        shape = rng.integers(4)
+        if shape == 0:
+            strings.append(f"{city}, {region}")
+        elif shape == 1:
+            strings.append(f"{rng.integers(1, 9999)} Main Street, {city}, {region} {rng.integers(10000, 99999)}")
+        elif shape == 2:
+            strings.append(f"{city}, {region}&nbsp;Remote")
+        else:
+            strings.append(f"{city}, {region}, United States")
+    ranks = np.minimum(rng.zipf(1.2, size=rows), distinct) - 1
+    return pd.Series(np.array(strings, dtype=object)[ranks])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--distinct", type=int, default=20_000)
+    parser.add_argument("--sample", type=int, default=200_000)
+    args = parser.parse_args()
+
+    column = make_column(args.rows, args.distinct)
+    n_unique = column.nunique()
+    print(f"{args.rows:,} rows, {n_unique:,} distinct strings")
+    print(f"{'path':<22}{'seconds':>10}{'rows/sec':>14}")
+
+    normalize_location.cache_clear()
+    sample = column.iloc[:args.sample]
+    start = time.perf_counter()
+    sample.map(gazetteer().parse)
+    seconds = time.perf_counter() - start
+    print(f"{'per row, no memo':<22}{seconds * args.rows / len(sample):>10.2f}{len(sample) / seconds:>14,.0f}  (extrapolated)")
+
+    for label in ("batched, cold memo", "batched, warm memo"):
+        start = time.perf_counter()
+        places = normalize_locations(column)
+        seconds = time.perf_counter() - start
+        print(f"{label:<22}{seconds:>10.2f}{args.rows / seconds:>14,.0f}")
+    print(f"unresolved cities: {places['city'].isna().mean():.1%}")
+
+
+if __name__ == "__main__":
+    main()
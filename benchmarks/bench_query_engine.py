@@ -0,0 +1,72 @@
+"""
+bench_query_engine.py
+Latency of query_engine.QueryEngine against a pandas scan of every row.
+
+linkedin_historical.csv (through dataset_cache, so typed as the dashboard
+loads it) is repeated --repeat times. Each query is run through the engine
+(a page of PAGE_SIZE rows) and as the equivalent boolean-mask scan with
+pandas string methods, which is what the dashboard's eval'd queries did;
+both must count the same rows.
+
+Run: python benchmarks/bench_query_engine.py --repeat 500
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from dataset_cache import load_dataset  # noqa: E402
+from query_engine import QueryEngine, parse_query  # noqa: E402
+
+QUERIES = {
+    "location contains Bengaluru":
+        lambda df: df["job_location"].astype(str).str.contains("bengaluru", case=False, regex=False),
+    "company == meta; title startswith senior":
+        lambda df: (df["company"].astype(str).str.lower() == "meta")
+        & df["job_title"].astype(str).str.lower().str.startswith("senior"),
+    "skills == python":
+        lambda df: df["job_skills"].str.lower().str.split(",").map(
+            lambda skills: isinstance(skills, list) and "python" in [s.strip() for s in skills]).astype(bool),
+    "link contains view/19":
+        lambda df: df["job_link"].str.contains("view/19", case=False, regex=False).fillna(False),
+}
+
+
+def timed(func, runs=5):
+    """Best of `runs` wall times, and the last result."""
+    best = np.inf
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=250, help="copies of the dataset's rows")
+    args = parser.parse_args()
+
+    source = load_dataset("linkedin_historical.csv")
+    frame = pd.concat([source] * args.repeat, ignore_index=True)
+    for column in ["job_title", "company", "job_location"]:
+        frame[column] = frame[column].astype(source[column].dtype)
+    start = time.perf_counter()
+    engine = QueryEngine(frame)
+    print(f"{len(frame):,} rows, indexes built in {time.perf_counter() - start:.2f}s")
+
+    print(f"{'query':<42}{'rows':>10}{'scan ms':>10}{'engine ms':>11}{'speedup':>9}")
+    for text, scan in QUERIES.items():
+        scan_s, mask = timed(lambda: scan(frame), runs=1)
+        engine_s, page = timed(lambda: engine.query(*parse_query(text)))
+        assert page.total == int(mask.sum()), (text, page.total, int(mask.sum()))
+        print(f"{text:<42}{page.total:>10,}{scan_s * 1e3:>10.1f}{engine_s * 1e3:>11.1f}{scan_s / engine_s:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+bench_schema_load.py
+Load time and memory of each dataset CSV read untyped versus through its
+schema (schemas.read_csv).
+
+Each CSV in the repo is repeated --repeat times into a temp dir (keeping
+its file name, so the schema still applies). The untyped read is what the
+scripts did before: pd.read_csv with every text column as Python objects,
+plus pd.to_datetime without a format for the datePosted column.
+
+Run: python benchmarks/bench_schema_load.py --repeat 200
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import schemas  # noqa: E402
+from dataset_cache import data_path  # noqa: E402
+
+FILES = ["indeed_webscrape.csv", "linkedin_historical.csv", "linkedin_no_skills.csv",
+         "linkedin_no_skills_cleaned.csv"]
+
+
+def untyped(path):
+    df = pd.read_csv(path, dtype=object)
+    if "datePosted" in df.columns:
+        df["datePosted"] = pd.to_datetime(df["datePosted"])
+    return df
+
+
+def measure(load, path):
+    start = time.perf_counter()
+    df = load(path)
+    return time.perf_counter() - start, df.memory_usage(deep=True).sum() / 2 ** 20
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=100, help="copies of each CSV's rows")
+    args = parser.parse_args()
+
+    print(f"{'file':<34}{'rows':>10}{'untyped s':>11}{'MiB':>8}{'schema s':>10}{'MiB':>8}{'speedup':>9}{'memory':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in FILES:
+            if not data_path(name).exists():
+                continue
+            source = pd.read_csv(data_path(name))
+            path = Path(tmp) / name
+            pd.concat([source] * args.repeat).to_csv(path, index=False)
+
+            base_s, base_mb = measure(untyped, path)
+            typed_s, typed_mb = measure(schemas.read_csv, path)
+            print(f"{name:<34}{len(source) * args.repeat:>10,}{base_s:>11.2f}{base_mb:>8.1f}"
+                  f"{typed_s:>10.2f}{typed_mb:>8.1f}{base_s / typed_s:>8.1f}x{base_mb / typed_mb:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+bench_skill_tokenizer.py
+Compares the original Python-loop extract_skills() with the vectorized
+skill_tokenizer.count_skills() on a synthetic comma-separated skill column,
+and checks that both produce the same counts in the same order.
+
+Run: python benchmarks/bench_skill_tokenizer.py --tokens 10000000
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from skill_tokenizer import count_skills  # noqa: E402
+
+EXCLUDE_TERMS = ['inc.', 'labs', 'corp', 'company', 'university', 'research', 'technologies', 'manager', 'director']
+
+
+def loop_extract_skills(skill_column, exclude_terms):
+    """The original skill_demand_evolution.extract_skills loop."""
+    all_skills = []
+    for skills in skill_column.dropna():
+        skill_list = [skill.strip().lower() for skill in skills.split(',')]
+        filtered_skills = [skill for skill in skill_list if not any(term in skill for term in exclude_terms)]
+        all_skills.extend(filtered_skills)
+    return pd.Series(all_skills).value_counts()
+
+
+def make_skill_column(tokens, vocab_size=20_000, per_row=8, seed=0):
+    rng = np.random.default_rng(seed)
+    vocab = np.array(
+        [f"Skill {i}" for i in range(vocab_size - 20)]
+        + [f"Acme Labs {i}" for i in range(10)]
+        + [f"Python {i} (Required)" for i in range(10)],
+        dtype=object,
+    )
+    # Zipf-like popularity, like real skill lists
+    picks = vocab[np.minimum(rng.zipf(1.3, size=tokens), vocab_size) - 1]
+    rows = [", ".join(picks[i:i + per_row]) for i in range(0, tokens, per_row)]
+    return pd.Series(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tokens", type=int, default=10_000_000)
+    parser.add_argument("--skip-baseline", action="store_true", help="don't run the (slow) Python loop")
+    args = parser.parse_args()
+
+    column = make_skill_column(args.tokens)
+    print(f"{args.tokens:,} skill tokens in {len(column):,} rows")
+
+    start = time.perf_counter()
+    fast = count_skills(column, EXCLUDE_TERMS)
+    fast_s = time.perf_counter() - start
+    print(f"vectorized: {fast_s:8.2f}s  ({args.tokens / fast_s:,.0f} tokens/sec)")
+
+    if not args.skip_baseline:
+        start = time.perf_counter()
+        slow = loop_extract_skills(column, EXCLUDE_TERMS)
+        slow_s = time.perf_counter() - start
+        print(f"loop:       {slow_s:8.2f}s  ({args.tokens / slow_s:,.0f} tokens/sec)")
+        same = list(slow.index) == list(fast.index) and (slow.to_numpy() == fast.to_numpy()).all()
+        print(f"speedup {slow_s / fast_s:.1f}x, identical counts: {same}")
+
+
+if __name__ == "__main__":
+    main()
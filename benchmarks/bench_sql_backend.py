@@ -0,0 +1,87 @@
+"""
+bench_sql_backend.py
+Title / company / location counts over all sources: the pandas path of
+job_aggregates.py versus the DuckDB query of sql_backend.py.
+
+Each source CSV is repeated --repeat times into a temp dir. DuckDB is
+timed scanning the CSVs directly (no copy, as for a file bigger than
+memory), then the Parquet copies are built (one full pandas parse of each
+CSV, see dataset_cache.py), and the pandas path and DuckDB are both timed
+on them. All three must give the same counts (in the same order, except
+ties for the CSV scan).
+
+Run: python benchmarks/bench_sql_backend.py --repeat 2000
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import sql_backend  # noqa: E402
+from dataset_cache import _cache_files, cached_parquet, data_path, load_dataset  # noqa: E402
+from job_aggregates import DIMENSIONS, SOURCES, combine, value_counts_unsorted  # noqa: E402
+
+
+def pandas_counts(sources):
+    """job_aggregates.compute_aggregates() over `sources`."""
+    scanned = []
+    for spec in sources.values():
+        df = load_dataset(spec["file"], columns=[spec[d] for d in DIMENSIONS])
+        scanned.append({dim: value_counts_unsorted(df[spec[dim]]) for dim in DIMENSIONS})
+    return {dim: combine([s[dim] for s in scanned]) for dim in DIMENSIONS}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=500, help="copies of each CSV's rows")
+    args = parser.parse_args()
+    if not sql_backend.HAVE_DUCKDB:
+        raise SystemExit("duckdb is not installed (pip install duckdb)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sources = {}
+        for source, spec in SOURCES.items():
+            path = Path(tmp) / spec["file"]
+            df = pd.read_csv(data_path(spec["file"]))
+            pd.concat([df] * args.repeat).to_csv(path, index=False)
+            sources[source] = dict(spec, file=str(path))
+        rows = sum(len(pd.read_csv(s["file"], usecols=[0])) for s in sources.values())
+        print(f"{rows:,} rows in {len(sources)} sources")
+
+        start = time.perf_counter()
+        csv_counts = sql_backend.aggregate_counts(sources, DIMENSIONS)
+        csv_s = time.perf_counter() - start
+        try:
+            start = time.perf_counter()
+            for spec in sources.values():
+                cached_parquet(spec["file"])
+            copy_s = time.perf_counter() - start
+            start = time.perf_counter()
+            expected = pandas_counts(sources)
+            pandas_s = time.perf_counter() - start
+            start = time.perf_counter()
+            parquet_counts = sql_backend.aggregate_counts(sources, DIMENSIONS)
+            parquet_s = time.perf_counter() - start
+        finally:
+            # Don't leave copies of the temp files in the dataset cache
+            for spec in sources.values():
+                for cache_file in _cache_files(Path(spec["file"])):
+                    cache_file.unlink(missing_ok=True)
+
+    for dim in DIMENSIONS:
+        assert list(parquet_counts[dim].items()) == list(expected[dim].items()), dim
+        assert csv_counts[dim].sort_index().equals(expected[dim].sort_index()), dim
+    print(f"{'path':<28}{'seconds':>10}")
+    print(f"{'Parquet copy (pandas)':<28}{copy_s:>10.2f}")
+    print(f"{'pandas (Parquet copy)':<28}{pandas_s:>10.2f}")
+    print(f"{'DuckDB (Parquet copy)':<28}{parquet_s:>10.2f}")
+    print(f"{'DuckDB (CSV scan)':<28}{csv_s:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+bench_tfidf.py
+Runtime and peak RSS of the top TF-IDF skills step, per path:
+
+- in-memory: the original TfidfVectorizer(stop_words='english', max_features=k)
+             fit on the full column
+- index:     skill_index.SkillIndex built from the column (clean_skills_plot default)
+- hashed:    streaming_tfidf.top_tfidf_out_of_core (clean_skills_plot --out-of-core)
+
+Each path runs in its own subprocess so the peak RSS is that path's own.
+
+Run: python benchmarks/bench_tfidf.py --rows 1000000 --top-k 10
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+MODES = ["in-memory", "index", "hashed"]
+
+
+def write_skills_csv(path, rows, vocab_size=50_000, per_row=8, seed=0):
+    rng = np.random.default_rng(seed)
+    vocab = np.array([f"skill{i} tool{i % 997}" for i in range(vocab_size)], dtype=object)
+    header = True
+    for start in range(0, rows, 100_000):
+        n = min(100_000, rows - start)
+        picks = vocab[np.minimum(rng.zipf(1.3, size=n * per_row), vocab_size) - 1].reshape(n, per_row)
+        pd.DataFrame({"job_skills": [", ".join(r) for r in picks]}).to_csv(
+            path, mode="w" if header else "a", header=header, index=False)
+        header = False
+
+
+def run_child(mode, csv_path, k, batch_size):
+    start = time.perf_counter()
+    if mode == "in-memory":
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        column = pd.read_csv(csv_path)["job_skills"].dropna()
+        vectorizer = TfidfVectorizer(stop_words='english', max_features=k)
+        sums = vectorizer.fit_transform(column).sum(axis=0).A1
+        top = sums.argsort()[-k:][::-1]
+        terms = list(vectorizer.get_feature_names_out()[top])
+    elif mode == "index":
+        from skill_index import SkillIndex
+        column = pd.read_csv(csv_path)["job_skills"].dropna()
+        terms = list(SkillIndex.build(column).top_tfidf(k=k, max_features=k).index)
+    else:
+        from streaming_tfidf import top_tfidf_out_of_core
+        terms = list(top_tfidf_out_of_core(csv_path, "job_skills", k=k, max_features=k, batch_size=batch_size).index)
+    seconds = time.perf_counter() - start
+    from instrumentation import peak_rss_mib
+    peak_mb = peak_rss_mib()
+    print(json.dumps({"mode": mode, "seconds": seconds, "peak_rss_mb": peak_mb, "top": terms}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--batch-size", type=int, default=50_000)
+    parser.add_argument("--modes", nargs="+", default=MODES, choices=MODES)
+    parser.add_argument("--child", choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument("--csv", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child, args.csv, args.top_k, args.batch_size)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = Path(tmp) / "skills.csv"
+        write_skills_csv(csv_path, args.rows)
+        print(f"{args.rows:,} postings ({csv_path.stat().st_size / 2**20:.0f} MB), top-k={args.top_k}")
+        results = []
+        for mode in args.modes:
+            out = subprocess.run(
+                [sys.executable, __file__, "--child", mode, "--csv", str(csv_path),
+                 "--top-k", str(args.top_k), "--batch-size", str(args.batch_size)],
+                capture_output=True, text=True, check=True,
+            )
+            results.append(json.loads(out.stdout.strip().splitlines()[-1]))
+
+    print(f"{'path':<12}{'seconds':>10}{'peak RSS MB':>14}  same ranking as first")
+    for r in results:
+        print(f"{r['mode']:<12}{r['seconds']:>10.2f}{r['peak_rss_mb']:>14.0f}  {r['top'] == results[0]['top']}")
+
+
+if __name__ == "__main__":
+    main()
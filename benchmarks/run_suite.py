@@ -0,0 +1,252 @@
+"""
+run_suite.py
+Times and memory-profiles every pipeline stage on synthetic data, and
+writes the results as JSON so that runs can be compared across commits.
+
+For each --rows scale, the synthetic datasets (see synthetic.py) are
+written to a scratch data directory, and the stages of pipeline.STAGES
+(cleaning, TF-IDF, skill extraction, top-N, trends, forecasting) are run on
+them in dependency order, each as its own process, with JOB_MARKET_DATA_DIR
+pointing at that directory. Caches therefore start cold, and nothing in the
+repo is touched. For each stage the suite records wall time, user and
+system CPU time (from the stage process's rusage) and peak RSS (the
+high-water mark of the stage process's memory, read as it exits), plus the
+per-step breakdown from the stage's trace file (see instrumentation.py).
+
+Results are written to --output (default benchmarks/results/<commit>.json):
+
+    {"commit": "ba0c85a", "dirty": false, "date": "...", "environment": {...},
+     "runs": [{"rows": 100000, "generate_seconds": 2.1, "input_mib": 75.3,
+               "stages": [{"stage": "clean_linkedin", "kind": "cleaning", "ok": true,
+                           "seconds": 1.9, "user_seconds": 1.7, "system_seconds": 0.2,
+                           "peak_rss_mib": 180.4, "steps": [...]}, ...]}]}
+
+--compare OLD.json prints each stage's time and peak memory against an
+earlier result file (e.g. one made on the previous commit).
+
+Run: python benchmarks/run_suite.py --rows 1e4 1e5 1e6 [--stages top_hiring_companies] [--compare OLD.json]
+"""
+
+import argparse
+import atexit
+import json
+import os
+import platform
+import runpy
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+try:
+    import resource  # Unix only
+except ImportError:
+    resource = None
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+# pipeline and synthetic (and with them pandas) are imported in main(), so a
+# --child process starts as small as the script it runs
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+DEFAULT_TIMEOUT = 3600
+
+STAGE_KINDS = {
+    "clean_linkedin": "cleaning",
+    "clean_skills_plot": "cleaning + TF-IDF",
+    "skill_demand_evolution": "skill extraction",
+    "most_common_job_titles": "top-N",
+    "top_hiring_companies": "top-N",
+    "top_hiring_locations": "top-N",
+    "hiring_trends_overtime": "trends",
+    "forecast_job_postings": "forecasting",
+    "batch_forecast": "forecasting",
+}
+
+# ru_maxrss is in KiB on Linux, bytes on macOS
+RSS_UNIT = 2 ** 20 if sys.platform == "darwin" else 2 ** 10
+
+
+def peak_rss_mib() -> float:
+    """
+    Peak RSS of this process. On Linux ru_maxrss also counts the parent's
+    memory copied by fork before exec, so the high-water mark of this
+    process's own address space (VmHWM) is read instead.
+    """
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / RSS_UNIT if resource else 0.0
+
+
+def run_child(script, peak_file):
+    """Run a stage script as __main__, writing its peak RSS to peak_file when it exits."""
+    def write_peak():
+        Path(peak_file).write_text(str(peak_rss_mib()))
+
+    atexit.register(write_peak)
+    sys.argv = [script]
+    runpy.run_path(script, run_name="__main__")
+
+
+def git(*args):
+    try:
+        return subprocess.run(["git", *args], cwd=REPO_ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment() -> dict:
+    import numpy as np
+    import pandas as pd
+
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "analysis_backend": os.environ.get("ANALYSIS_BACKEND", "pandas"),
+    }
+
+
+def run_stage(stage, data_dir: Path, timeout) -> dict:
+    """Run one stage's script on data_dir; its time, CPU and peak memory."""
+    import pipeline
+
+    run_id = f"suite-{os.getpid()}"
+    env = dict(os.environ, JOB_MARKET_DATA_DIR=str(data_dir), JOB_MARKET_RUN_ID=run_id, MPLBACKEND="Agg",
+               PYTHONUNBUFFERED="1")
+    log_file, peak_file = data_dir / f"{stage}.log", data_dir / f"{stage}.peak"
+    peak_file.unlink(missing_ok=True)
+    command = [sys.executable, __file__, "--child", str(pipeline.script_path(stage)), "--peak-file", str(peak_file)]
+    start = time.perf_counter()
+    with open(log_file, "w") as log:
+        proc = subprocess.Popen(command, cwd=data_dir, env=env, stdout=log, stderr=subprocess.STDOUT)
+        timer = threading.Timer(timeout, proc.kill)
+        timer.start()
+        try:
+            # wait4 gives this child's own rusage (RUSAGE_CHILDREN would mix all stages)
+            _, status, usage = os.wait4(proc.pid, 0)
+        finally:
+            timer.cancel()
+    seconds = time.perf_counter() - start
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    result = {
+        "stage": stage,
+        "kind": STAGE_KINDS.get(stage, ""),
+        "ok": proc.returncode == 0,
+        "seconds": round(seconds, 3),
+        "user_seconds": round(usage.ru_utime, 3),
+        "system_seconds": round(usage.ru_stime, 3),
+        "peak_rss_mib": round(float(peak_file.read_text()), 1) if peak_file.exists() else None,
+    }
+    # The stage's trace, written under its data directory (instrumentation.TRACE_DIR)
+    trace_file = data_dir / ".traces" / stage / f"{run_id}.json"
+    if trace_file.exists():
+        result["steps"] = json.loads(trace_file.read_text())["steps"]
+        trace_file.unlink()
+    if not result["ok"]:
+        result["log_tail"] = log_file.read_text()[-2000:]
+    return result
+
+
+def run_scale(rows, stages, data_dir: Path, months, seed, timeout) -> dict:
+    from synthetic import generate
+
+    print(f"== {rows:,} rows per dataset ({data_dir})")
+    start = time.perf_counter()
+    paths = generate(data_dir, rows, months=months, seed=seed)
+    run = {
+        "rows": rows,
+        "generate_seconds": round(time.perf_counter() - start, 3),
+        "input_mib": round(sum(p.stat().st_size for p in paths.values()) / 2 ** 20, 1),
+        "stages": [],
+    }
+    print(f"generated {run['input_mib']:.1f} MiB in {run['generate_seconds']:.1f}s")
+    print(f"{'stage':<26}{'kind':<20}{'seconds':>10}{'cpu s':>10}{'peak MiB':>10}")
+    for stage in stages:
+        result = run_stage(stage, data_dir, timeout)
+        run["stages"].append(result)
+        cpu = result["user_seconds"] + result["system_seconds"]
+        status = "" if result["ok"] else "  FAILED (see log_tail)"
+        print(f"{stage:<26}{result['kind']:<20}{result['seconds']:>10.2f}{cpu:>10.2f}"
+              f"{result['peak_rss_mib'] or 0:>10.1f}{status}")
+    return run
+
+
+def compare(results: dict, baseline: dict):
+    """Print time and peak memory of each stage relative to `baseline` (same scales only)."""
+    print(f"== compared with {baseline.get('commit')} ({baseline.get('date')})")
+    print(f"{'rows':>12}  {'stage':<26}{'seconds':>10}{'was':>10}{'ratio':>8}{'peak MiB':>10}{'was':>10}{'ratio':>8}")
+    old_runs = {run["rows"]: {s["stage"]: s for s in run["stages"]} for run in baseline.get("runs", [])}
+    for run in results["runs"]:
+        old_stages = old_runs.get(run["rows"], {})
+        for new in run["stages"]:
+            old = old_stages.get(new["stage"])
+            if old is None:
+                continue
+            new_mib, old_mib = new["peak_rss_mib"] or 0, old["peak_rss_mib"] or 0
+            print(f"{run['rows']:>12,}  {new['stage']:<26}{new['seconds']:>10.2f}{old['seconds']:>10.2f}"
+                  f"{new['seconds'] / max(old['seconds'], 1e-9):>7.2f}x"
+                  f"{new_mib:>10.1f}{old_mib:>10.1f}{new_mib / max(old_mib, 1e-9):>7.2f}x")
+
+
+def main():
+    if "--child" in sys.argv:
+        child = argparse.ArgumentParser()
+        child.add_argument("--child")
+        child.add_argument("--peak-file")
+        args = child.parse_args()
+        return run_child(args.child, args.peak_file)
+    import pipeline
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=float, nargs="+", default=[1e4, 1e5], help="rows per dataset, one run per value")
+    parser.add_argument("--stages", nargs="+", choices=list(pipeline.STAGES),
+                        help="stages to run (plus the stages they depend on; default: all)")
+    parser.add_argument("--months", type=int, default=24, help="months of posting dates in the synthetic data")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="seconds before a stage is killed")
+    parser.add_argument("--data-dir", help="write the synthetic data here and keep it (default: a temp dir)")
+    parser.add_argument("--output", help="result file (default: benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", help="an earlier result file to compare with")
+    args = parser.parse_args()
+
+    stages = pipeline.with_dependencies(args.stages or list(pipeline.STAGES))
+    commit = git("rev-parse", "--short", "HEAD")
+    results = {
+        "commit": commit,
+        "dirty": bool(git("status", "--porcelain", "--untracked-files=no")),
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "environment": environment(),
+        "runs": [],
+    }
+    for rows in map(int, args.rows):
+        if args.data_dir:
+            data_dir = Path(args.data_dir) / f"rows-{rows}"
+            results["runs"].append(run_scale(rows, stages, data_dir, args.months, args.seed, args.timeout))
+        else:
+            with tempfile.TemporaryDirectory() as tmp:
+                results["runs"].append(run_scale(rows, stages, Path(tmp), args.months, args.seed, args.timeout))
+
+    output = Path(args.output) if args.output else RESULTS_DIR / f"{commit or 'results'}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"results written to {output}")
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
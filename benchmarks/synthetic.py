@@ -0,0 +1,241 @@
+"""
+synthetic.py
+Synthetic LinkedIn and Indeed datasets of any size, with the same files,
+columns and value shapes as the real ones:
+
+- linkedin_no_skills.csv: title, company, location, the schema.org
+  JobPosting JSON in `context` (datePosted, hiringOrganization, jobLocation,
+  a description of varying length; a few rows have no datePosted), and `n`
+  (1.0, 2.0 or missing);
+- linkedin_historical.csv: one row per posting with a job_link (a few
+  postings listed twice), a comma-separated job_skills list, and some
+  missing summaries and skill lists;
+- indeed_webscrape.csv: one row per skill of a posting impression, so each
+  job_title-href repeats 1-7 times; links carry per-impression tracking
+  parameters, and a few postings are scraped again under a new link (same
+  jk=); skills are spelled as scraped ("Python\\xa0(Required)",
+  "matching qualificationSQL"), and location and company are only filled on
+  an impression's first row.
+
+Titles (with seniority variants), companies (with legal-suffix variants),
+locations (cities of gazetteer.csv, with street addresses, ZIP codes and
+"Remote" markers) and skills are drawn with Zipf-like popularity; posting
+dates follow a monthly trend with yearly seasonality over --months months,
+so the forecasting stages have a series to fit. The number of distinct
+companies and skills grows with the row count.
+
+Rows are generated and appended --chunksize at a time, so memory stays flat
+from 1e4 to 1e8 rows. The same --seed gives the same files.
+
+Run: python benchmarks/synthetic.py --rows 1000000 --out /tmp/synthetic
+"""
+
+import argparse
+import sys
+import time
+import zlib
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from locations import gazetteer  # noqa: E402
+
+CHUNKSIZE = 500_000
+START = "2021-01-01"
+
+ROLES = ["Data Scientist", "Data Engineer", "Software Engineer", "ML Engineer", "Product Manager",
+         "Data Analyst", "DevOps Engineer", "Frontend Developer", "Backend Developer", "Full Stack Developer",
+         "QA Engineer", "Business Analyst", "Cloud Architect", "Security Engineer", "Site Reliability Engineer"]
+SENIORITY = ["", "", "", "Senior ", "Sr. ", "Junior ", "Lead ", "Principal ", "Staff "]
+COMPANY_WORDS = ["Systems", "Labs", "Health", "Energy", "Logistics", "Partners", "Software", "Analytics"]
+LEGAL_SUFFIXES = ["", "", "", " Inc", ", Inc.", " LLC", " Corp"]
+SYLLABLES = [c + v for c in "bcdfghjklmnprstvz" for v in "aeiou"]
+SKILLS = ["Python", "SQL", "Java", "AWS", "Docker", "Kubernetes", "Machine Learning", "Communication", "Excel",
+          "Spark", "Tableau", "React", "JavaScript", "TypeScript", "C++", "C#", "Go", "Scala", "Airflow",
+          "Terraform", "Linux", "Git", "REST", "GraphQL", "Power BI", "Statistics", "Deep Learning", "NLP",
+          "Agile", "Scrum", "Leadership", "Azure", "GCP", "Snowflake", "dbt", "Kafka", "Hadoop", "PostgreSQL",
+          "MongoDB", "Redis", "Node.js", "Django", "Flask", "PyTorch", "TensorFlow", "Pandas", "R", "SAS"]
+COUNTRIES = ["United States", "India", "Canada", "United Kingdom"]
+# Share of postings per month: a rising trend with a yearly season
+TREND, SEASON = 0.03, 0.2
+
+
+def _zipf(rng, size, n, a=1.3):
+    """`size` ranks in [0, n), most often the first ones."""
+    return np.minimum(rng.zipf(a, size=size), n) - 1
+
+
+def _vocabularies(rows, seed):
+    """Titles, companies, locations and skills to draw from (sized by the row count)."""
+    rng = np.random.default_rng(seed)
+    titles = [s + r for r in ROLES for s in SENIORITY if s or r] + [r + " II" for r in ROLES]
+    rng.shuffle(titles)
+
+    n_companies = int(np.clip(rows // 100, 50, 200_000))
+    companies, seen = [], set()
+    while len(companies) < n_companies:
+        base = "".join(rng.choice(SYLLABLES, size=rng.integers(2, 4))).capitalize()
+        if rng.random() < 0.5:
+            base += " " + rng.choice(COMPANY_WORDS)
+        if base not in seen:
+            seen.add(base)
+            companies.append(base + rng.choice(LEGAL_SUFFIXES))
+
+    cities = [(m[0], m[1], m[2]) for ms in gazetteer().cities.values() for m in ms]
+    locations = []
+    for city, region, country in cities:
+        locations.append(f"{city}, {region}" if country == "US" else f"{city}, {gazetteer().country_names[country]}")
+        if country == "US":
+            locations.append(f"{rng.integers(1, 9999)} Main Street, {city}, {region} {rng.integers(10000, 99999)}")
+            locations.append(f"{city}, {region}&nbsp;Remote")
+    rng.shuffle(locations)
+    locations = COUNTRIES + locations
+
+    n_skills = int(np.clip(rows // 50, 200, 500_000))
+    skills = SKILLS + [f"{rng.choice(SKILLS)} {rng.choice(['Tool', 'Platform', 'SDK', 'Framework'])} {i}"
+                       for i in range(n_skills - len(SKILLS))]
+    return {name: np.array(values, dtype=object)
+            for name, values in [("title", titles), ("company", companies), ("location", locations),
+                                 ("skill", skills)]}
+
+
+def _dates(rng, size, months):
+    """Posting dates (YYYY-MM-DD strings) over `months` months from START."""
+    t = np.arange(months)
+    weights = (1 + TREND * t) * (1 + SEASON * np.sin(2 * np.pi * t / 12))
+    month = rng.choice(months, size=size, p=weights / weights.sum())
+    first = pd.date_range(START, periods=months, freq="MS")
+    days = rng.integers(0, first.days_in_month.to_numpy()[month])
+    return (first[month] + pd.to_timedelta(days, unit="D")).strftime("%Y-%m-%d").to_numpy(dtype=object)
+
+
+def _skill_lists(rng, vocab, size, low=3, high=9):
+    """Comma-separated skill lists of low..high-1 skills each."""
+    lengths = rng.integers(low, high, size=size)
+    picks = vocab[_zipf(rng, lengths.sum(), len(vocab))]
+    bounds = np.concatenate([[0], np.cumsum(lengths)])
+    return np.array([", ".join(picks[a:b]) for a, b in zip(bounds[:-1], bounds[1:])], dtype=object)
+
+
+def _missing(rng, values, share):
+    values = values.copy()
+    values[rng.random(len(values)) < share] = None
+    return values
+
+
+def linkedin_no_skills(rng, vocab, size, months, offset=0):
+    titles = vocab["title"][_zipf(rng, size, len(vocab["title"]))]
+    companies = vocab["company"][_zipf(rng, size, len(vocab["company"]))]
+    locations = vocab["location"][_zipf(rng, size, len(vocab["location"]))]
+    descriptions = np.array(["x" * n for n in range(150, 260, 10)], dtype=object)
+    context = ('{"@context": "http://schema.org", "@type": "JobPosting", "datePosted": "'
+               + pd.Series(_dates(rng, size, months)) + '", "validThrough": "2021-12-31", '
+               '"employmentType": "FULL_TIME", "hiringOrganization": {"@type": "Organization", "name": "'
+               + pd.Series(companies) + '"}, "jobLocation": {"@type": "Place", "address": {"addressLocality": "'
+               + pd.Series(locations).str.split(",").str[0] + '"}}, "description": "'
+               + pd.Series(descriptions[rng.integers(len(descriptions), size=size)]) + '"}')
+    context[rng.random(size) < 0.01] = '{"@type": "JobPosting"}'
+    n = rng.choice(np.array([1.0, 2.0, np.nan]), size=size, p=[0.34, 0.34, 0.32])
+    return pd.DataFrame({"title": titles, "company": companies, "location": locations,
+                         "context": context.to_numpy(dtype=object), "n": n})
+
+
+def linkedin_historical(rng, vocab, size, months, offset=0):
+    ids = offset + np.arange(size)
+    # A few postings are listed twice (same link)
+    repeat = rng.random(size) < 0.025
+    ids[repeat] = np.maximum(ids[repeat] - rng.integers(1, 50, size=repeat.sum()), offset)
+    return pd.DataFrame({
+        "job_link": "https://www.linkedin.com/jobs/view/" + pd.Series(ids).astype(str),
+        "job_title": vocab["title"][_zipf(rng, size, len(vocab["title"]))],
+        "company": vocab["company"][_zipf(rng, size, len(vocab["company"]))],
+        "job_location": vocab["location"][_zipf(rng, size, len(vocab["location"]))],
+        "job_summary": _missing(rng, np.full(size, "summary", dtype=object), 0.11),
+        "job_skills": _missing(rng, _skill_lists(rng, vocab["skill"], size), 0.08),
+    })
+
+
+def indeed_webscrape(rng, vocab, size, months, offset=0):
+    # Impressions of 1-7 rows each (one skill per row), cut to `size` rows
+    per_posting = rng.integers(1, 8, size=size // 3 + 1)
+    posting = np.repeat(np.arange(len(per_posting)), per_posting)[:size]
+    first = np.concatenate([[True], posting[1:] != posting[:-1]])
+    n_postings = posting[-1] + 1
+    # A few impressions are of a posting scraped earlier (same job key, new tracking parameters)
+    ids = offset + np.arange(n_postings)
+    repeat = rng.random(n_postings) < 0.05
+    ids[repeat] = np.maximum(ids[repeat] - rng.integers(1, 50, size=repeat.sum()), offset)
+    keys = pd.Series(ids).map("{:012x}".format)
+    tracking = pd.Series(rng.integers(2 ** 40, size=n_postings)).map("{:010x}".format)
+    href = ("https://www.indeed.com/rc/clk?jk=" + keys + "&from=serp&xkcb=" + tracking
+            + "&p=" + pd.Series(rng.integers(0, 15, size=n_postings)).astype(str) + "&vjs=3")
+    href = href.to_numpy(dtype=object)[posting]
+    titles = vocab["title"][_zipf(rng, n_postings, len(vocab["title"]))][posting]
+    locations = vocab["location"][_zipf(rng, n_postings, len(vocab["location"]))][posting]
+    companies = vocab["company"][_zipf(rng, n_postings, len(vocab["company"]))][posting]
+    skills = pd.Series(vocab["skill"][_zipf(rng, size, len(vocab["skill"]))])
+    spelling = rng.integers(3, size=size)
+    skills = skills.where(spelling != 1, skills + "\xa0(Required)")
+    skills = skills.where(spelling != 2, "matching qualification" + skills)
+    return pd.DataFrame({
+        "job_title": titles,
+        "job_title-href": href,
+        "location": np.where(first & (rng.random(size) < 0.9), locations, None),
+        "skills": _missing(rng, skills.to_numpy(dtype=object), 0.31),
+        "company": np.where(first & (rng.random(size) < 0.95), companies, None),
+    })
+
+
+DATASETS = {
+    "linkedin_no_skills.csv": linkedin_no_skills,
+    "linkedin_historical.csv": linkedin_historical,
+    "indeed_webscrape.csv": indeed_webscrape,
+}
+
+
+def write_dataset(path, make, rows, months=12, seed=0, chunksize=CHUNKSIZE):
+    """Write `rows` rows made by `make` to `path`, a chunk at a time."""
+    vocab = _vocabularies(rows, seed)
+    path = Path(path)
+    # Seeded by the dataset's file name, not its directory: the same --seed
+    # gives the same data wherever it is written
+    rng = np.random.default_rng([seed, zlib.crc32(path.name.encode())])
+    tmp = path.with_suffix(".csv.tmp")
+    for start in range(0, rows, chunksize):
+        chunk = make(rng, vocab, min(chunksize, rows - start), months, offset=start)
+        chunk.to_csv(tmp, mode="w" if start == 0 else "a", header=start == 0, index=False)
+    tmp.replace(path)
+
+
+def generate(out, rows, months=12, seed=0, chunksize=CHUNKSIZE, datasets=None) -> dict:
+    """Write every dataset (or those named in `datasets`) with `rows` rows each to `out`; returns their paths."""
+    out = Path(out)
+    out.mkdir(parents=True, exist_ok=True)
+    paths = {}
+    for name, make in DATASETS.items():
+        if datasets is None or name in datasets:
+            paths[name] = out / name
+            write_dataset(paths[name], make, rows, months, seed, chunksize)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=float, default=1e5, help="rows per dataset (e.g. 1e6)")
+    parser.add_argument("--out", required=True, help="directory to write the CSVs to")
+    parser.add_argument("--months", type=int, default=12)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--chunksize", type=int, default=CHUNKSIZE)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    paths = generate(args.out, int(args.rows), args.months, args.seed, args.chunksize)
+    for name, path in paths.items():
+        print(f"{name:<28}{int(args.rows):>14,} rows{path.stat().st_size / 2 ** 20:>10.1f} MiB")
+    print(f"generated in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,277 @@
+"""
+canonical_names.py
+Maps spelling variants of company names and job titles to one canonical name.
+
+"Google", "Google LLC" and "google inc." are the same employer, and
+"Sr. Software Engineer" and "Senior Software Engineer" the same title, but
+value_counts() counts them apart. Each raw name is reduced to a key:
+
+- company: lower case, punctuation and legal suffixes (Inc, LLC, Corp,
+  .com, ...) dropped, so the variants above all become "google";
+- title: lower case, punctuation dropped, abbreviations (Sr, Jr, Eng, ...)
+  spelled out.
+
+Names with the same key are aliases. Keys that differ slightly are matched
+fuzzily, word by word: same number of words, and each differing pair of
+words a likely typo ("amazn" / "amazon", "enginer" / "engineer": difflib
+ratio >= THRESHOLD). Short words, words with digits or symbols ("c++") and
+words that set titles apart (DISTINCT_WORDS: "junior" / "senior", "ii" /
+"iii") must match exactly. Keys are only compared within blocks: keys
+sharing a word, or their first PREFIX_LENGTH characters. A block bigger
+than MAX_BLOCK (a word as common as "engineer") is skipped, so the
+comparisons grow with the block sizes instead of with the square of the
+number of names. Keys are clustered most common first, each joining the
+first cluster whose leading key it matches, so a chain of small edits
+can't merge unrelated names. update() reports how many comparisons
+blocking saved.
+
+Each cluster's canonical name is its most common variant, preferring
+variants written like their key (so "Google" wins over "google inc.").
+The alias table is saved under ./.dataset_cache/; later runs map the names
+they have seen with a dictionary lookup, and only new names are blocked and
+scored, against the known keys and each other. A canonical name, once
+chosen, is kept.
+
+    table = load_aliases("company")
+    stats = table.update(df["company"].value_counts())
+    table.save()
+    df["company"] = table.lookup(df["company"])
+
+Run: python canonical_names.py [company|title] to print the merged variants.
+"""
+
+import argparse
+import html
+import json
+import os
+import re
+from difflib import SequenceMatcher
+from itertools import chain
+
+import numpy as np
+import pandas as pd
+
+from dataset_cache import CACHE_DIR
+
+KINDS = ["company", "title"]
+THRESHOLD = 0.85
+MIN_FUZZY_LENGTH = 5
+PREFIX_LENGTH = 4
+MAX_BLOCK = 500
+
+LEGAL_SUFFIXES = {
+    "inc", "incorporated", "llc", "llp", "lp", "ltd", "limited", "corp", "corporation",
+    "co", "company", "plc", "gmbh", "ag", "sa", "bv", "pvt", "pty", "com",
+}
+TITLE_ABBREVIATIONS = {
+    "sr": "senior", "snr": "senior", "jr": "junior", "eng": "engineer", "engr": "engineer",
+    "dev": "developer", "mgr": "manager", "mgmt": "management", "assoc": "associate",
+    "admin": "administrator", "dir": "director", "vp": "vice president",
+}
+
+DISTINCT_WORDS = {
+    "senior", "junior", "lead", "principal", "staff", "chief", "head", "intern", "associate",
+    "assistant", "director", "manager", "i", "ii", "iii", "iv", "v",
+}
+
+WORD_RE = re.compile(r"[^\W_]+[+#]*")
+
+
+def normalize_name(name, kind) -> str:
+    """The key variants of a name share ("" for a missing name)."""
+    if not isinstance(name, str):
+        return ""
+    words = WORD_RE.findall(html.unescape(name).lower())
+    if kind == "company":
+        while len(words) > 1 and words[-1] in LEGAL_SUFFIXES:
+            words.pop()
+    else:
+        words = [TITLE_ABBREVIATIONS.get(w, w) for w in words]
+    return " ".join(words)
+
+
+def blocking_keys(key) -> set:
+    """
+    Blocks a key is filed under: its words, and its first PREFIX_LENGTH
+    characters, each with the number of words (similar keys have as many).
+    """
+    words = key.split()
+    return {f"{len(words)}:{block}" for block in set(words) | {"^" + key[:PREFIX_LENGTH]}}
+
+
+def similar(a, b, threshold=THRESHOLD) -> bool:
+    """Whether two keys differ only by typos (see the module docstring)."""
+    words_a, words_b = a.split(), b.split()
+    if len(words_a) != len(words_b):
+        return False
+    for x, y in zip(words_a, words_b):
+        if x == y:
+            continue
+        if (min(len(x), len(y)) < MIN_FUZZY_LENGTH or x in DISTINCT_WORDS or y in DISTINCT_WORDS
+                or not (x + y).isalpha()):
+            return False
+        if 2 * min(len(x), len(y)) < threshold * (len(x) + len(y)):
+            return False
+        matcher = SequenceMatcher(None, x, y)
+        if matcher.quick_ratio() < threshold or matcher.ratio() < threshold:
+            return False
+    return True
+
+
+def _is_clean(name, key):
+    return " ".join(WORD_RE.findall(name.lower())) == key
+
+
+class AliasTable:
+    def __init__(self, kind, aliases=None, keys=None):
+        if kind not in KINDS:
+            raise ValueError(f"kind must be one of {KINDS}, not {kind!r}")
+        self.kind = kind
+        self.aliases = dict(aliases or {})   # raw name -> canonical name
+        self.keys = dict(keys or {})         # key -> canonical name
+        self._blocks = None                  # block -> known keys, built on first use
+
+    def __len__(self):
+        return len(self.aliases)
+
+    def update(self, counts: pd.Series) -> dict:
+        """
+        Add the names of `counts` (raw name -> count) that aren't in the
+        table yet. Returns statistics: names added, how many matched by key,
+        the fuzzy comparisons made, and how many naive pairwise comparisons
+        (every new key against every other key) blocking avoided.
+        """
+        # Per-name lookups, so a chunk costs O(its names), not O(table size)
+        new = counts[[isinstance(name, str) and name not in self.aliases for name in counts.index]]
+        stats = {"added": len(new), "by_key": 0, "compared": 0, "naive": 0, "avoided": 0, "merged": 0}
+        if not len(new):
+            return stats
+        new_keys = pd.Series([normalize_name(name, self.kind) for name in new.index], index=new.index)
+
+        known = np.array([key in self.keys for key in new_keys], dtype=bool)
+        for name, key in new_keys[known].items():
+            self.aliases[name] = self.keys[key]
+        stats["by_key"] = int(known.sum())
+        new, new_keys = new[~known], new_keys[~known]
+
+        # Most common keys first: each new key joins the first known key or new
+        # cluster leader it matches within its blocks, or leads a new cluster.
+        # Only leaders are compared against, so clusters don't chain.
+        n_old = len(self.keys)
+        key_counts = new.groupby(new_keys.to_numpy(), sort=False).sum().sort_values(ascending=False, kind="stable")
+        known_blocks = self._known_blocks()
+        blocks = {}  # new cluster leaders of this update
+        leader = {}
+        for key in key_counts.index:
+            match, seen = None, set()
+            for block in blocking_keys(key):
+                known_members, new_members = known_blocks.get(block, []), blocks.get(block, [])
+                if len(known_members) + len(new_members) > MAX_BLOCK:
+                    continue
+                for other in chain(known_members, new_members):
+                    if other in seen:
+                        continue
+                    seen.add(other)
+                    if similar(key, other):
+                        match = other
+                        break
+                if match is not None:
+                    break
+            stats["compared"] += len(seen)
+            leader[key] = key if match is None else leader.get(match, match)
+            if match is None:
+                self._index(blocks, key)
+        n_new = len(key_counts)
+        stats["naive"] = n_new * n_old + n_new * (n_new - 1) // 2
+        stats["avoided"] = stats["naive"] - stats["compared"]
+
+        # One canonical name per cluster: the known one, else the best new variant
+        clusters = {}
+        for name, key in new_keys.items():
+            clusters.setdefault(leader[key], []).append(name)
+        for lead, names in clusters.items():
+            if lead in self.keys:
+                canonical = self.keys[lead]
+                stats["merged"] += len(names)
+            else:
+                canonical = min(names, key=lambda n: (not _is_clean(n, new_keys[n]), -new[n]))
+                stats["merged"] += len(names) - 1
+            for name in names:
+                self.aliases[name] = canonical
+                if new_keys[name] not in self.keys:
+                    self.keys[new_keys[name]] = canonical
+                    self._index(known_blocks, new_keys[name])
+        return stats
+
+    @staticmethod
+    def _index(blocks, key):
+        for block in blocking_keys(key):
+            blocks.setdefault(block, []).append(key)
+
+    def _known_blocks(self) -> dict:
+        """Block -> known keys, kept up to date across update() calls."""
+        if self._blocks is None:
+            self._blocks = {}
+            for key in self.keys:
+                self._index(self._blocks, key)
+        return self._blocks
+
+    def lookup(self, values: pd.Series) -> pd.Series:
+        """Canonical name of each value (values not in the table are kept as they are)."""
+        codes, uniques = pd.factorize(values)
+        mapped = np.array([self.aliases.get(u, u) for u in uniques] + [None], dtype=object)
+        return pd.Series(mapped[codes], index=values.index, name=values.name)
+
+    def group(self, counts: pd.Series) -> pd.Series:
+        """Counts per raw name summed per canonical name, ranked."""
+        canonical = self.lookup(counts.index.to_series()).to_numpy()
+        grouped = pd.Series(counts.to_numpy(), index=canonical).groupby(level=0, sort=False).sum()
+        return grouped.sort_values(ascending=False, kind="stable").rename(counts.name)
+
+    def variants(self) -> pd.Series:
+        """Canonical name -> list of its raw variants, for names with more than one."""
+        table = pd.Series(list(self.aliases), index=list(self.aliases.values()), dtype=object)
+        grouped = table.groupby(level=0, sort=False).agg(list)
+        return grouped[grouped.map(len) > 1]
+
+    def save(self):
+        CACHE_DIR.mkdir(exist_ok=True)
+        path = aliases_file(self.kind)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp, "w") as f:
+            json.dump({"kind": self.kind, "aliases": self.aliases, "keys": self.keys}, f)
+        os.replace(tmp, path)
+
+
+def aliases_file(kind):
+    return CACHE_DIR / f"aliases_{kind}.json"
+
+
+def load_aliases(kind) -> AliasTable:
+    """The saved alias table of `kind` (empty if there is none yet)."""
+    try:
+        with open(aliases_file(kind)) as f:
+            saved = json.load(f)
+    except (OSError, ValueError):
+        saved = {}
+    return AliasTable(kind, saved.get("aliases"), saved.get("keys"))
+
+
+def main(kind, k=20):
+    from job_aggregates import load_aggregates
+
+    table = load_aliases(kind)
+    stats = table.update(load_aggregates()[kind])
+    table.save()
+    print(f"{stats['added']} new names: {stats['by_key']} matched by key, {stats['merged']} merged; "
+          f"{stats['compared']:,} fuzzy comparisons ({stats['avoided']:,} of {stats['naive']:,} avoided by blocking)")
+    for canonical, names in table.variants().head(k).items():
+        print(f"{canonical}: {', '.join(names)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the alias table of company names or job titles")
+    parser.add_argument("kind", choices=KINDS)
+    parser.add_argument("-k", type=int, default=20, help="canonical names to print")
+    args = parser.parse_args()
+    main(args.kind, args.k)
@@ -1,4 +1,4 @@
-# linkedin_no_skills is another linkedin dataset which provides 
+# linkedin_no_skills is another linkedin dataset which provides
 # the dates of job posting with job titles but not skills so it
 # will not be used for skills analysis
 
@@ -7,30 +7,202 @@
 # Uses: linkedin_no_skills.csv
 # Produces: linkedin_no_skills_cleaned.csv
 
+# Run with --stream to clean in chunks with bounded memory (for exports
+# that don't fit in RAM). Both modes write the same file.
+# --workers N parses the context column in N processes, and
+# --context-fields also keeps validThrough, employmentType,
+# hiringOrganization and jobLocation from the same parse.
+# --incremental only processes rows appended to the input since the last
+# run (see incremental.py).
+
+import argparse
+import os
+
 import pandas as pd
-import json
+import incremental
+import schemas
+from dataset_cache import load_dataset, data_path
+from digest_set import DigestSet, row_digests
+from instrumentation import step
+from linkedin_context import CONTEXT_FIELDS, extract_context, extract_date  # noqa: F401  (extract_date kept importable from here)
+
+INPUT_FILE = "linkedin_no_skills.csv"
+OUTPUT_FILE = "linkedin_no_skills_cleaned.csv"
+DEFAULT_CHUNKSIZE = 100_000
+STAGE = "clean_linkedin"
+
+
+def add_context_columns(df, fields=("datePosted",), workers=1):
+    """Add the extracted context `fields` to df as columns (in place)."""
+    extracted = extract_context(df["context"], fields=fields, workers=workers)
+    for col in extracted.columns:
+        df[col] = extracted[col]
+    return df
+
+
+def clean_in_memory(fields=("datePosted",), workers=1):
+    # Load CSV file
+    with step("load") as s:
+        df = load_dataset(INPUT_FILE)
+        s.rows_out = len(df)
+
+    # Extract 'datePosted' (and any extra fields) from the 'context' column
+    with step("extract_date", rows_in=len(df)):
+        add_context_columns(df, fields, workers)
+
+    # Drop rows where 'datePosted' is NULL
+    with step("dropna", rows_in=len(df)) as s:
+        df = df.dropna(subset=["datePosted"])
+        s.rows_out = len(df)
+
+    # Drop duplicate rows
+    with step("drop_duplicates", rows_in=len(df)) as s:
+        df = df.drop_duplicates()
+        s.rows_out = len(df)
+
+    # Save cleaned data to a new CSV
+    with step("save", rows_in=len(df)):
+        df.to_csv(data_path(OUTPUT_FILE), index=False)
+
+    source_columns = [c for c in df.columns if c not in fields]
+    return DigestSet(row_digests(df)), incremental.numeric_dtypes(df[source_columns])
+
+
+def _unified_dtypes(path, chunksize):
+    """
+    Dtypes that make every chunk parse like the whole file would.
+
+    Per-chunk type inference can disagree with a full read (e.g. an int column
+    whose NaNs all sit in a later chunk is float64 in a full read, so it must
+    be written as 1.0 everywhere). Columns in the file's schema (schemas.py)
+    already have a fixed dtype; for any others a cheap first pass finds those
+    columns and pins the dtype of every numeric column.
+    """
+    schema = schemas.schema_for(path)
+    header = pd.read_csv(path, nrows=0).columns
+    if all(col in schema for col in header):
+        return {}
+    kinds = {}
+    has_missing = set()
+    for chunk in pd.read_csv(path, chunksize=chunksize, usecols=lambda col: col not in schema):
+        for col in chunk.columns:
+            kinds.setdefault(col, set())
+            if chunk[col].isna().all():
+                has_missing.add(col)
+            else:
+                kinds[col].add(chunk[col].dtype.kind)
+    dtypes = {}
+    for col, seen in kinds.items():
+        if "O" in seen and len(seen) > 1:
+            dtypes[col] = str
+        elif "f" in seen or ("i" in seen and col in has_missing):
+            dtypes[col] = "float64"
+        elif seen == {"i"}:
+            dtypes[col] = "int64"
+    return dtypes
+
+
+def clean_streaming(chunksize=DEFAULT_CHUNKSIZE, fields=("datePosted",), workers=1):
+    """Clean INPUT_FILE chunk by chunk, appending to OUTPUT_FILE as it goes."""
+    path = data_path(INPUT_FILE)
+    out_path = data_path(OUTPUT_FILE)
+    tmp_path = out_path.with_name(out_path.name + ".tmp")
+    dtypes = _unified_dtypes(path, chunksize)
+
+    seen = DigestSet()
+    header = True
+    # Each step sums over the chunks (see instrumentation.py)
+    chunks = iter(schemas.read_csv(path, chunksize=chunksize, categorical=False, dtype=dtypes))
+    with open(tmp_path, "w", newline="") as out:
+        while True:
+            with step("load") as s:
+                chunk = next(chunks, None)
+                s.rows_out = 0 if chunk is None else len(chunk)
+            if chunk is None:
+                break
+            with step("extract_date", rows_in=len(chunk)):
+                add_context_columns(chunk, fields, workers)
+            with step("dropna", rows_in=len(chunk)) as s:
+                chunk = chunk.dropna(subset=["datePosted"])
+                s.rows_out = len(chunk)
+            # Drop rows already written (in this or an earlier chunk)
+            with step("drop_duplicates", rows_in=len(chunk)) as s:
+                chunk = chunk[seen.add_new(row_digests(chunk))]
+                s.rows_out = len(chunk)
+            with step("save", rows_in=len(chunk)):
+                chunk.to_csv(out, index=False, header=header)
+            header = False
+    os.replace(tmp_path, out_path)
+    return seen, {c: t for c, t in dtypes.items() if t != str}
+
+
+def clean_incremental(stream=False, chunksize=DEFAULT_CHUNKSIZE, fields=("datePosted",), workers=1):
+    """Merge only the rows appended to INPUT_FILE since the last run into OUTPUT_FILE."""
+    state = incremental.load_state(STAGE)
+    digests_file = incremental.state_file(STAGE, ".digests.npy")
+    output_in_sync = (
+        data_path(OUTPUT_FILE).exists()
+        and state.get("output_stat") == incremental.file_stat(OUTPUT_FILE)
+        and state.get("fields") == list(fields)
+    )
 
-# Load CSV file
-df = pd.read_csv("linkedin_no_skills.csv")
+    delta = None
+    if output_in_sync:
+        with step("load") as s:
+            delta, mark = incremental.read_appended(INPUT_FILE, state.get("watermark"), dtype=state.get("dtypes"))
+            s.rows_out = 0 if delta is None else len(delta)
 
-# Function to extract 'datePosted' from the 'content' column
-def extract_date(json_str):
-    try:
-        data = json.loads(json_str)
-        return data.get("datePosted", None)
-    except (json.JSONDecodeError, TypeError):
-        return None
+    if delta is None:
+        # Full rebuild. Take the watermark first: rows appended while we run
+        # are read again next time and dropped by the digest set if already in.
+        mark = incremental.watermark(INPUT_FILE)
+        if stream:
+            seen, dtypes = clean_streaming(chunksize, fields, workers)
+        else:
+            seen, dtypes = clean_in_memory(fields, workers)
+        print("Incremental state missing or stale: rebuilt from scratch")
+    else:
+        seen = DigestSet.load(digests_file)
+        dtypes = state["dtypes"]
+        with step("extract_date", rows_in=len(delta)):
+            add_context_columns(delta, fields, workers)
+        with step("dropna", rows_in=len(delta)) as s:
+            delta = delta.dropna(subset=["datePosted"])
+            s.rows_out = len(delta)
+        with step("drop_duplicates", rows_in=len(delta)) as s:
+            delta = delta[seen.add_new(row_digests(delta))]
+            s.rows_out = len(delta)
+        with step("save", rows_in=len(delta)):
+            incremental.append_csv(delta, OUTPUT_FILE)
+        print(f"Appended {len(delta)} new rows")
 
-# Apply the function to extract 'datePosted'
-df["datePosted"] = df["context"].apply(extract_date)
+    seen.save(digests_file)
+    incremental.save_state(STAGE, {
+        "watermark": mark,
+        "dtypes": dtypes,
+        "fields": list(fields),
+        "output_stat": incremental.file_stat(OUTPUT_FILE),
+    })
 
-# Drop rows where 'datePosted' is NULL
-df = df.dropna(subset=["datePosted"])
 
-# Drop duplicate rows
-df = df.drop_duplicates()
+def main(stream=False, chunksize=DEFAULT_CHUNKSIZE, context_fields=False, workers=1, incremental_mode=False):
+    fields = CONTEXT_FIELDS if context_fields else ["datePosted"]
+    if incremental_mode:
+        clean_incremental(stream, chunksize, fields, workers)
+    elif stream:
+        clean_streaming(chunksize, fields, workers)
+    else:
+        clean_in_memory(fields, workers)
+    print(f"Data cleaned and saved as '{OUTPUT_FILE}'")
 
-# Save cleaned data to a new CSV
-df.to_csv("linkedin_no_skills_cleaned.csv", index=False)
 
-print("Data cleaned and saved as 'linkedin_no_skills_cleaned.csv'")
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Clean linkedin_no_skills.csv")
+    parser.add_argument("--stream", action="store_true", help="read the input in chunks (bounded memory)")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE, help="rows per chunk in --stream mode")
+    parser.add_argument("--workers", type=int, default=1, help="processes for context parsing (0 = one per CPU)")
+    parser.add_argument("--context-fields", action="store_true", help="also keep the extra schema.org fields")
+    parser.add_argument("--incremental", action="store_true", help="only process rows appended since the last run")
+    args = parser.parse_args()
+    main(stream=args.stream, chunksize=args.chunksize, context_fields=args.context_fields,
+         workers=args.workers, incremental_mode=args.incremental)
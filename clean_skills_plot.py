@@ -1,84 +1,267 @@
+import argparse
+
+import numpy as np
 import pandas as pd
-from sklearn.feature_extraction.text import TfidfVectorizer
 import matplotlib.pyplot as plt
+from plotting import show_all
+import incremental
+import schemas
+import sql_backend
+from dataset_cache import load_dataset, data_path
+from digest_set import DigestSet, row_digests
+from instrumentation import step
+from posting_urls import posting_keys
+from skill_index import load_skill_index
+from streaming_tfidf import BATCH_SIZE, top_tfidf_out_of_core
+
+# Indeed rows are grouped per posting: links that differ only in their
+# per-impression tracking parameters are one posting (see posting_urls.py).
+# --incremental only groups the Indeed rows appended since the last run and
+# merges them into indeed_webscrape_cleaned.csv (see incremental.py)
+# --out-of-core ranks the TF-IDF terms by streaming the cleaned CSVs in
+# batches through hashed term counts (see streaming_tfidf.py), for corpora
+# too large to tokenize in memory. --top-k widens the ranking beyond 10.
+
+INDEED_FILE = "indeed_webscrape.csv"
+INDEED_CLEANED_FILE = "indeed_webscrape_cleaned.csv"
+LINKEDIN_CLEANED_FILE = "linkedin_historical_cleaned.csv"
+INDEED_STAGE = "clean_indeed"
+FIRST_COLUMNS = ['job_title', 'location', 'company']
+# How the incremental state identifies a posting (see posting_urls.py)
+POSTING_KEYS = "canonical-link"
+
+
+def drop_blank_skills(indeed_data):
+    # Remove any rows where 'skills' column is NaN or blank
+    indeed_data['skills'] = indeed_data['skills'].fillna('')  # Fill NaN values with empty string
+    return indeed_data[indeed_data['skills'].str.strip() != '']  # Remove rows with blank skills
 
-# Step 1: Load the CSV files into pandas DataFrames
-indeed_data = pd.read_csv('job-market-analysis/indeed_webscrape.csv')
-linkedin_data = pd.read_csv("job-market-analysis/linkedin_historical.csv")
 
-# Step 2: Clean and preprocess Indeed data
-# Remove any rows where 'skills' column is NaN or blank
-indeed_data['skills'] = indeed_data['skills'].fillna('')  # Fill NaN values with empty string
-indeed_data = indeed_data[indeed_data['skills'].str.strip() != '']  # Remove rows with blank skills
+def join_skills(codes, skills):
+    """
+    Comma-separated distinct skills per group code (codes 0..n-1, each
+    present), in order of first appearance; one string concatenation pass
+    instead of a Python call per group.
+    """
+    distinct = ~pd.DataFrame({'code': codes, 'skill': skills}).duplicated().to_numpy()
+    codes, skills = codes[distinct], np.asarray(skills, dtype=object)[distinct]
+    order = np.argsort(codes, kind='stable')
+    codes, skills = codes[order], skills[order]
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    # Every skill but the last of its group is followed by the separator
+    last = np.r_[codes[1:] != codes[:-1], True]
+    pieces = np.where(last, skills, skills + ', ')
+    return np.add.reduceat(pieces, starts) if len(pieces) else pieces
 
-# Group Indeed data by 'job_title-href' and aggregate other columns
-indeed_data_cleaned = indeed_data.groupby(['job_title-href'], as_index=False).agg({
-    'job_title': 'first',  # Keep the first occurrence of job_title for each 'job_title-href'
-    'location': 'first',   # Keep the first occurrence of location for each 'job_title-href'
-    'company': 'first',    # Keep the first occurrence of company for each 'job_title-href'
+
+def posting_rows(indeed_data):
+    """The rows that have a link, and the 64-bit key of each row's posting (see posting_urls.py)."""
+    indeed_data = indeed_data[indeed_data['job_title-href'].notna()]
+    return indeed_data, posting_keys(indeed_data['job_title-href'])
+
+
+def group_indeed(indeed_data, keys=None):
+    # Group Indeed data per posting: links of the same posting share a key
+    # (the index of the result), and the group takes the link it was first seen under
+    if keys is None:
+        indeed_data, keys = posting_rows(indeed_data)
+    codes, uniques = pd.factorize(keys)
+    # Keep the first occurrence of job_title, location and company for each posting
+    grouped = indeed_data[['job_title-href'] + FIRST_COLUMNS].groupby(codes).first().set_axis(uniques)
     # Combine unique skills into a comma-separated list
-    'skills': lambda x: ', '.join(x.dropna().unique())  
-})
-
-# Save cleaned Indeed data to CSV
-indeed_data_cleaned.to_csv("job-market-analysis/indeed_webscrape_cleaned.csv", index=False)
-
-# Step 3: Clean and preprocess LinkedIn data
-linkedin_data = linkedin_data.drop_duplicates()  # Remove duplicate rows
-linkedin_data['job_summary'] = linkedin_data['job_summary'].fillna("No summary available")  # Fill missing job summaries
-linkedin_data = linkedin_data.dropna(subset=['job_title', 'company', 'job_skills'])  # Drop rows with missing critical columns
-
-# Analysis Process
-
-# Initialize TF-IDF Vectorizer
-# TF-IDF is a technique used in NLP to convert textual data 
-# into numerical form for machine learning models
-
-# The TfidfVectorizer is initialized with stop_words='english' 
-# and max_features=10 to focus on the most important words
-# It transforms the skills data into a numerical representation where 
-# more important or unique skills get higher weights.
-tfidf_vectorizer = TfidfVectorizer(stop_words='english', max_features=10)
-
-# Step 4: Apply TF-IDF on Indeed data
-indeed_tfidf_matrix = tfidf_vectorizer.fit_transform(indeed_data_cleaned['skills'])
-
-# Step 5: Apply TF-IDF on LinkedIn data
-linkedin_tfidf_matrix = tfidf_vectorizer.fit_transform(linkedin_data['job_skills'])
-
-# Step 6: Get the top terms (skills)
-# calculates the sum of TF-IDF scores for each skill across all job postings
-# and extracts the top 10 skills with the highest scores.
-top_skills_indeed_idx = indeed_tfidf_matrix.sum(axis=0).A1.argsort()[-10:][::-1]  # Get indices of top 10 skills
-top_skills_linkedin_idx = linkedin_tfidf_matrix.sum(axis=0).A1.argsort()[-10:][::-1]  # Get indices of top 10 skills
-
-top_skills_indeed = [tfidf_vectorizer.get_feature_names_out()[i] for i in top_skills_indeed_idx]
-top_skills_linkedin = [tfidf_vectorizer.get_feature_names_out()[i] for i in top_skills_linkedin_idx]
-
-top_skills_indeed_values = indeed_tfidf_matrix.sum(axis=0).A1[top_skills_indeed_idx]
-top_skills_linkedin_values = linkedin_tfidf_matrix.sum(axis=0).A1[top_skills_linkedin_idx]
-
-# Step 7: Plot the results
-
-# Plot for Indeed data
-plt.figure(figsize=(10, 6))
-plt.barh(top_skills_indeed, top_skills_indeed_values, color='skyblue')
-plt.title('Top Skills in Indeed Job Postings')
-plt.xlabel('Sum of TF-IDF')
-plt.ylabel('Skills')
-plt.gca().invert_yaxis()  # To have the highest value at the top
-plt.show()
-
-# Plot for LinkedIn data
-plt.figure(figsize=(10, 6))
-plt.barh(top_skills_linkedin, top_skills_linkedin_values, color='lightgreen')
-plt.title('Top Skills in LinkedIn Job Postings')
-plt.xlabel('Sum of TF-IDF')
-plt.ylabel('Skills')
-plt.gca().invert_yaxis()  # To have the highest value at the top
-plt.show()
-
-# Save cleaned LinkedIn data to CSV
-linkedin_data.to_csv("job-market-analysis/linkedin_historical_cleaned.csv", index=False)
-
-print("Data cleaning and analysis completed! Results saved as CSV files.")
+    grouped['skills'] = join_skills(codes, indeed_data['skills'])
+    return grouped.sort_values('job_title-href', kind='stable')
+
+
+def _skill_pairs(keys, skills):
+    """Digest of each (posting, skill) pair, i.e. of each skill listed under a posting."""
+    return row_digests(pd.DataFrame({'posting': keys, 'skill': np.asarray(skills, dtype=object)}))
+
+
+def _missing(cleaned):
+    """Per first column, the keys (the index of a grouped frame) of the postings missing it."""
+    return {col: DigestSet(cleaned.index[cleaned[col].isna()].to_numpy(dtype=np.uint64)) for col in FIRST_COLUMNS}
+
+
+def clean_indeed_incremental():
+    """
+    Merge only the Indeed rows appended since the last run into INDEED_CLEANED_FILE.
+
+    Seen-sets of posting keys and (posting, skill) pairs are kept between
+    runs (plus, per column, the postings still missing a title, location or
+    company), so a repeat scrape that adds nothing costs O(new rows) and
+    leaves the cleaned file alone. If the new rows do add a posting or
+    skill, or fill one of those gaps, the cleaned file is read, patched and
+    rewritten whole (O(cleaned file), as it is kept sorted by link); only
+    the raw scrape is never re-read. Returns the cleaned postings, or None
+    if the file was left as it was.
+    """
+    state = incremental.load_state(INDEED_STAGE)
+    pairs_file = incremental.state_file(INDEED_STAGE, ".pairs.npy")
+    postings_file = incremental.state_file(INDEED_STAGE, ".postings.npy")
+    missing_files = {col: incremental.state_file(INDEED_STAGE, f".missing_{col}.npy") for col in FIRST_COLUMNS}
+    delta = None
+    # State from before postings were keyed on canonical links is rebuilt
+    if (data_path(INDEED_CLEANED_FILE).exists() and state.get("keys") == POSTING_KEYS
+            and state.get("output_stat") == incremental.file_stat(INDEED_CLEANED_FILE)):
+        delta, mark = incremental.read_appended(INDEED_FILE, state.get("watermark"))
+
+    if delta is None:
+        mark = incremental.watermark(INDEED_FILE)
+        indeed_data, keys = posting_rows(drop_blank_skills(load_dataset(INDEED_FILE)))
+        cleaned = group_indeed(indeed_data, keys)
+        pairs, postings = DigestSet(_skill_pairs(keys, indeed_data['skills'])), DigestSet(keys)
+        missing = _missing(cleaned)
+        print("Incremental state missing or stale: rebuilt Indeed data from scratch")
+    else:
+        pairs, postings = DigestSet.load(pairs_file), DigestSet.load(postings_file)
+        missing = {col: DigestSet.load(path) for col, path in missing_files.items()}
+        delta, keys = posting_rows(drop_blank_skills(delta))
+        # Skills: only (posting, skill) pairs we haven't seen, in arrival order
+        new_pairs = pairs.add_new(_skill_pairs(keys, delta['skills']))
+        known = postings.contains(keys)
+        # Rows that give a known posting a title, location or company it lacks
+        fills = known & np.logical_or.reduce(
+            [missing[col].contains(keys) & delta[col].notna().to_numpy() for col in FIRST_COLUMNS])
+        if not new_pairs.any() and not fills.any():
+            cleaned = None
+            print(f"Merged {len(delta)} new Indeed rows (no new postings or skills)")
+        else:
+            cleaned = schemas.read_csv(data_path(INDEED_CLEANED_FILE), categorical=False)
+            cleaned.index = posting_keys(cleaned['job_title-href'])
+
+            # 'first' columns: keep what we have, fill gaps from the new rows
+            firsts = delta[['job_title-href'] + FIRST_COLUMNS].groupby(keys).first()
+            codes, uniques = pd.factorize(keys[new_pairs])
+            new_skills = pd.Series(join_skills(codes, delta['skills'][new_pairs]), index=uniques,
+                                   dtype=cleaned['skills'].dtype)
+
+            merged = new_skills.index.intersection(cleaned.index)
+            cleaned.loc[merged, 'skills'] = cleaned.loc[merged, 'skills'] + ', ' + new_skills[merged]
+            cleaned[FIRST_COLUMNS] = cleaned[FIRST_COLUMNS].combine_first(firsts[FIRST_COLUMNS].reindex(cleaned.index))
+
+            added = firsts.index.difference(cleaned.index)
+            added_rows = firsts.loc[added].assign(skills=new_skills.reindex(added))
+            cleaned = pd.concat([cleaned, added_rows]).sort_values('job_title-href', kind='stable')
+            postings.add_new(keys[~known])
+            missing = _missing(cleaned)
+            print(f"Merged {len(delta)} new Indeed rows ({len(added)} new postings)")
+
+    if cleaned is not None:
+        cleaned = cleaned.reset_index(drop=True)
+        cleaned.to_csv(data_path(INDEED_CLEANED_FILE), index=False)
+    pairs.save(pairs_file)
+    postings.save(postings_file)
+    for col, path in missing_files.items():
+        missing[col].save(path)
+    incremental.save_state(INDEED_STAGE, {
+        "keys": POSTING_KEYS,
+        "watermark": mark,
+        "output_stat": incremental.file_stat(INDEED_CLEANED_FILE),
+    })
+    return cleaned
+
+
+def plot_top_indeed(top_indeed):
+    # Plot for Indeed data
+    plt.figure(figsize=(10, 6))
+    plt.barh(list(top_indeed.index), top_indeed.to_numpy(), color='skyblue')
+    plt.title('Top Skills in Indeed Job Postings')
+    plt.xlabel('Sum of TF-IDF')
+    plt.ylabel('Skills')
+    plt.gca().invert_yaxis()  # To have the highest value at the top
+
+
+def plot_top_linkedin(top_linkedin):
+    # Plot for LinkedIn data
+    plt.figure(figsize=(10, 6))
+    plt.barh(list(top_linkedin.index), top_linkedin.to_numpy(), color='lightgreen')
+    plt.title('Top Skills in LinkedIn Job Postings')
+    plt.xlabel('Sum of TF-IDF')
+    plt.ylabel('Skills')
+    plt.gca().invert_yaxis()  # To have the highest value at the top
+
+
+def main(incremental_mode=False, top_k=10, out_of_core=False, batch_size=BATCH_SIZE):
+    # Step 1 + 2: Load and clean the Indeed data (grouped per posting)
+    with step("clean indeed") as s:
+        if incremental_mode:
+            indeed_data_cleaned = clean_indeed_incremental()
+        elif sql_backend.use_sql():
+            # Grouped by a DuckDB query on the file (ANALYSIS_BACKEND=duckdb, see sql_backend.py)
+            indeed_data_cleaned = sql_backend.group_indeed(INDEED_FILE)
+            indeed_data_cleaned.to_csv(data_path(INDEED_CLEANED_FILE), index=False)
+        else:
+            with step("load") as load:
+                indeed_data = load_dataset(INDEED_FILE)
+                load.rows_out = len(indeed_data)
+            indeed_data = drop_blank_skills(indeed_data)
+            with step("group", rows_in=len(indeed_data)) as group:
+                indeed_data_cleaned = group_indeed(indeed_data).reset_index(drop=True)
+                group.rows_out = len(indeed_data_cleaned)
+
+            # Save cleaned Indeed data to CSV
+            with step("save", rows_in=len(indeed_data_cleaned)):
+                indeed_data_cleaned.to_csv(data_path(INDEED_CLEANED_FILE), index=False)
+        if indeed_data_cleaned is not None:
+            s.rows_out = len(indeed_data_cleaned)
+
+    # Step 3: Load, clean and preprocess LinkedIn data
+    with step("clean linkedin") as s:
+        with step("load") as load:
+            linkedin_data = load_dataset("linkedin_historical.csv")
+            load.rows_out = len(linkedin_data)
+        with step("drop_duplicates", rows_in=len(linkedin_data)) as dedup:
+            linkedin_data = linkedin_data.drop_duplicates()  # Remove duplicate rows
+            dedup.rows_out = len(linkedin_data)
+        linkedin_data['job_summary'] = linkedin_data['job_summary'].fillna("No summary available")  # Fill missing job summaries
+        linkedin_data = linkedin_data.dropna(subset=['job_title', 'company', 'job_skills'])  # Drop rows with missing critical columns
+
+        # Save cleaned LinkedIn data to CSV
+        with step("save", rows_in=len(linkedin_data)):
+            linkedin_data.to_csv(data_path(LINKEDIN_CLEANED_FILE), index=False)
+        s.rows_out = len(linkedin_data)
+
+    # Analysis Process
+
+    # TF-IDF is a technique used in NLP to convert textual data
+    # into numerical form for machine learning models
+
+    # It is computed as TfidfVectorizer(stop_words='english', max_features=top_k)
+    # would, to focus on the most important words: more important or unique
+    # skills get higher weights. The skill columns are tokenized once into a
+    # persistent skill index (see skill_index.py) which skill_demand_evolution.py
+    # reuses, and each source keeps its own vocabulary.
+
+    # Step 4 + 5 + 6: Get the top terms (skills)
+    # calculates the sum of TF-IDF scores for each skill across all job postings
+    # and extracts the top_k (default 10) skills with the highest scores.
+    with step("tfidf fit"):
+        if out_of_core:
+            top_indeed = top_tfidf_out_of_core(INDEED_CLEANED_FILE, 'skills', k=top_k, max_features=top_k, batch_size=batch_size)
+            top_linkedin = top_tfidf_out_of_core(LINKEDIN_CLEANED_FILE, 'job_skills', k=top_k, max_features=top_k, batch_size=batch_size)
+        else:
+            # Build (or load) the skill index of each cleaned dataset
+            indeed_index = load_skill_index(INDEED_CLEANED_FILE, 'skills')
+            linkedin_index = load_skill_index(LINKEDIN_CLEANED_FILE, 'job_skills')
+            top_indeed = indeed_index.top_tfidf(k=top_k, max_features=top_k)
+            top_linkedin = linkedin_index.top_tfidf(k=top_k, max_features=top_k)
+
+    # Step 7: Plot the results (shown, or saved to graphs/ when headless, see plotting.py)
+    with step("plot"):
+        show_all([
+            ("TopSkillsIndeedJobPostings", top_indeed, plot_top_indeed),
+            ("TopSkillsLinkedInJobPostings", top_linkedin, plot_top_linkedin),
+        ])
+
+    print("Data cleaning and analysis completed! Results saved as CSV files.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Clean the Indeed/LinkedIn skill data and plot top TF-IDF skills")
+    parser.add_argument("--incremental", action="store_true", help="only merge Indeed rows appended since the last run")
+    parser.add_argument("--top-k", type=int, default=10, help="number of top TF-IDF skills to rank and plot")
+    parser.add_argument("--out-of-core", action="store_true", help="stream the TF-IDF step in batches (bounded memory)")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="postings per batch with --out-of-core")
+    args = parser.parse_args()
+    main(incremental_mode=args.incremental, top_k=args.top_k, out_of_core=args.out_of_core, batch_size=args.batch_size)
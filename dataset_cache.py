@@ -0,0 +1,159 @@
+"""
+dataset_cache.py
+Shared loader for the CSV datasets used by the analysis scripts.
+
+Each source CSV is parsed once and converted to a Parquet copy under
+./.dataset_cache/. Later loads read the Parquet copy, and only the columns
+the caller asks for. A copy is reused while the source file is unchanged:
+size and mtime are checked first, and the content hash is only recomputed
+when they differ (so a `touch` or a re-download of identical data does not
+force a re-parse).
+
+Columns are typed by the dataset's schema (see schemas.py), which the
+Parquet copy keeps; a copy made under another schema is rebuilt.
+
+If pyarrow is not installed the loader falls back to plain pd.read_csv.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+
+import pandas as pd
+
+import schemas
+
+try:
+    import pyarrow  # noqa: F401  (needed by DataFrame.to_parquet / read_parquet)
+    HAVE_PARQUET = True
+except ImportError:
+    HAVE_PARQUET = False
+
+# JOB_MARKET_DATA_DIR points the scripts (and the caches and graphs made from
+# the data) at another directory, e.g. synthetic data (see benchmarks/)
+DATA_DIR = Path(os.environ.get("JOB_MARKET_DATA_DIR") or Path(__file__).parent)
+CACHE_DIR = DATA_DIR / ".dataset_cache"
+
+
+def data_path(name) -> Path:
+    """Resolve a dataset file name against the repo directory."""
+    path = Path(name)
+    return path if path.is_absolute() else DATA_DIR / path
+
+
+def file_hash(path: Path, block_size: int = 1 << 20) -> str:
+    """Content hash of a file, read in blocks so large dumps don't need to fit in memory."""
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def fingerprint(path: Path, previous: dict = None) -> dict:
+    """Return {size, mtime_ns, hash} for path, reusing previous['hash'] if size/mtime match."""
+    st = os.stat(path)
+    fp = {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+    if previous and previous.get("size") == fp["size"] and previous.get("mtime_ns") == fp["mtime_ns"]:
+        fp["hash"] = previous["hash"]
+    else:
+        fp["hash"] = file_hash(path)
+    return fp
+
+
+def _cache_files(path: Path):
+    key = hashlib.blake2b(str(path.resolve()).encode(), digest_size=6).hexdigest()
+    stem = f"{path.stem}-{key}"
+    return CACHE_DIR / f"{stem}.parquet", CACHE_DIR / f"{stem}.json"
+
+
+def _read_manifest(manifest_file: Path) -> dict:
+    try:
+        with open(manifest_file) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_manifest(manifest_file: Path, manifest: dict):
+    tmp = manifest_file.with_suffix(f".{os.getpid()}.tmp")
+    with open(tmp, "w") as f:
+        json.dump(manifest, f)
+    os.replace(tmp, manifest_file)
+
+
+def replace_dir(tmp: Path, directory: Path):
+    """
+    Move a freshly written directory into place.
+
+    The old copy is renamed aside first (a non-empty directory can't be
+    replaced in one step). If another process put its own copy there in the
+    meantime, that one is kept and ours is dropped.
+    """
+    old = directory.with_name(f"{directory.name}.{os.getpid()}.old")
+    try:
+        os.replace(directory, old)
+    except FileNotFoundError:
+        pass
+    try:
+        os.replace(tmp, directory)
+    except OSError:
+        shutil.rmtree(tmp, ignore_errors=True)
+    shutil.rmtree(old, ignore_errors=True)
+
+
+def cached_parquet(name, build=True):
+    """
+    Return the path of an up-to-date Parquet copy of a CSV, building it if needed.
+
+    Returns None when Parquet is unavailable or the frame can't be stored as
+    Parquet, or (build=False) when there is no up-to-date copy yet.
+    """
+    if not HAVE_PARQUET:
+        return None
+    path = data_path(name)
+    parquet_file, manifest_file = _cache_files(path)
+    manifest = _read_manifest(manifest_file)
+    fp = fingerprint(path, manifest.get("source"))
+    schema = schemas.schema_version(path)
+
+    if (parquet_file.exists() and manifest.get("source", {}).get("hash") == fp["hash"]
+            and manifest.get("schema") == schema):
+        if manifest["source"] != fp:
+            # Same content, new mtime: remember the new stat so we skip hashing next time
+            manifest["source"] = fp
+            _write_manifest(manifest_file, manifest)
+        return parquet_file
+    if not build:
+        return None
+
+    df = schemas.read_csv(path)
+    CACHE_DIR.mkdir(exist_ok=True)
+    # Stages running at the same time may build the same copy: each writes its own tmp file
+    tmp = parquet_file.with_suffix(f".{os.getpid()}.tmp")
+    try:
+        df.to_parquet(tmp, index=False)
+    except Exception as e:
+        # e.g. object columns holding mixed str/int values that Arrow can't type
+        print(f"dataset_cache: not caching {path.name} ({e})")
+        tmp.unlink(missing_ok=True)
+        return None
+    os.replace(tmp, parquet_file)
+    _write_manifest(manifest_file, {"source": fp, "schema": schema, "columns": list(df.columns)})
+    return parquet_file
+
+
+def load_dataset(name, columns=None) -> pd.DataFrame:
+    """
+    Load a dataset CSV (by file name in the repo, or absolute path).
+
+    `columns` restricts the load to the given columns; with the Parquet cache
+    the other columns are never read from disk.
+    """
+    parquet_file = cached_parquet(name)
+    if parquet_file is not None:
+        return pd.read_parquet(parquet_file, columns=columns)
+    df = schemas.read_csv(data_path(name), columns=columns)
+    return df if columns is None else df[list(columns)]
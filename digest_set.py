@@ -0,0 +1,81 @@
+"""
+digest_set.py
+A compact set of 64-bit row digests, used to drop duplicate rows across
+chunks/runs without keeping the rows themselves in memory.
+
+Digests are kept as a few sorted uint64 NumPy arrays (8 bytes per entry,
+versus ~70 for a Python int in a set). New digests go into a small run;
+runs of similar size are merged, so inserts cost O(log n) amortised and a
+lookup is one searchsorted per run.
+"""
+
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+def row_digests(df: pd.DataFrame) -> np.ndarray:
+    """uint64 digest per row, computed over the values only (not the index)."""
+    return pd.util.hash_pandas_object(df, index=False).to_numpy(dtype=np.uint64)
+
+
+class DigestSet:
+    def __init__(self, digests=None):
+        self._runs = []
+        if digests is not None and len(digests):
+            self._runs.append(np.unique(np.asarray(digests, dtype=np.uint64)))
+
+    def __len__(self):
+        return sum(len(r) for r in self._runs)
+
+    def contains(self, digests: np.ndarray) -> np.ndarray:
+        """Boolean mask: which of `digests` are already in the set."""
+        digests = np.asarray(digests, dtype=np.uint64)
+        found = np.zeros(len(digests), dtype=bool)
+        for run in self._runs:
+            pos = np.searchsorted(run, digests)
+            pos[pos == len(run)] = 0
+            found |= run[pos] == digests
+        return found
+
+    def add_new(self, digests: np.ndarray) -> np.ndarray:
+        """
+        Insert digests and return a mask of the ones that were new.
+
+        Only the first occurrence of a digest within `digests` counts as new,
+        which matches DataFrame.drop_duplicates(keep='first').
+        """
+        digests = np.asarray(digests, dtype=np.uint64)
+        new = ~pd.Series(digests).duplicated().to_numpy()
+        new &= ~self.contains(digests)
+        if new.any():
+            self._push(np.sort(digests[new]))
+        return new
+
+    def _push(self, run: np.ndarray):
+        self._runs.append(run)
+        # Merge while the newest run is at least as large as the one before it
+        while len(self._runs) > 1 and len(self._runs[-1]) >= len(self._runs[-2]):
+            last = self._runs.pop()
+            self._runs[-1] = np.union1d(self._runs[-1], last)
+
+    def to_array(self) -> np.ndarray:
+        if not self._runs:
+            return np.empty(0, dtype=np.uint64)
+        return np.unique(np.concatenate(self._runs))
+
+    def save(self, path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.stem}.{os.getpid()}.tmp.npy")
+        np.save(tmp, self.to_array())
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        path = Path(path)
+        if not path.exists():
+            return cls()
+        return cls(np.load(path))
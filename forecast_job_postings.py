@@ -8,55 +8,70 @@
 
 import pandas as pd
 import matplotlib.pyplot as plt
-from statsmodels.tsa.arima.model import ARIMA
+from plotting import show
+from arima_cache import load_models, save_models
+from batch_forecast import forecast_segments
+from dataset_cache import data_path
+from instrumentation import step
+from timeseries_store import load_store
 
-# Load your LinkedIn data
-linkedin_recent = pd.read_csv("job-market-analysis/linkedin_no_skills_cleaned.csv")
+# Monthly job postings: the ("total", "all") series of the daily time-series
+# store built from the cleaned LinkedIn data (see timeseries_store.py);
+# batch_forecast.py forecasts every company, location and title family the same way
+with step("load series"):
+    series = load_store().matrix("M", dimension="total")
 
-# Convert datePosted to datetime
-linkedin_recent['datePosted'] = pd.to_datetime(linkedin_recent['datePosted'])
+# One row per month, dated on the 1st
+job_trends = pd.DataFrame({
+    'ds': series.columns.to_timestamp(),
+    'job_postings': series.loc[('total', 'all')].to_numpy(),
+})
 
-# Aggregate job postings per month
-linkedin_recent['year_month'] = linkedin_recent['datePosted'].dt.to_period('M')
-job_trends = linkedin_recent.groupby('year_month').size().reset_index(name='job_postings')
+# Plot historical job postings
+def plot_history(job_trends):
+    plt.figure(figsize=(10, 5))
+    plt.plot(job_trends['ds'], job_trends['job_postings'], marker='o', label='Actual Job Postings')
+    plt.title("Historical Job Postings")
+    plt.xlabel("Date")
+    plt.ylabel("Number of Job Postings")
+    plt.grid()
+    plt.legend()
 
-# Convert to datetime
-job_trends['ds'] = job_trends['year_month'].astype(str)
-job_trends['ds'] = pd.to_datetime(job_trends['ds'])
-job_trends = job_trends[['ds', 'job_postings']]
+# Shown, or saved as graphs/HistoricalJobPostings.png when headless (see plotting.py)
+with step("plot"):
+    show("HistoricalJobPostings", job_trends, plot_history)
 
-# Plot historical job postings
-plt.figure(figsize=(10, 5))
-plt.plot(job_trends['ds'], job_trends['job_postings'], marker='o', label='Actual Job Postings')
-plt.title("Historical Job Postings")
-plt.xlabel("Date")
-plt.ylabel("Number of Job Postings")
-plt.grid()
-plt.legend()
-plt.show()
-
-# Build the ARIMA model
+# Build the ARIMA model and forecast the next 6 months
 # p = trend lag, d = differencing, q = error term lag
-model = ARIMA(job_trends['job_postings'], order=(2, 1, 2))  # This combo is very stable
-model_fit = model.fit()
+# The fitted parameters are cached (see arima_cache.py): a rerun with the same
+# or one more month of data reuses them instead of refitting
+# min_length=1: unlike the per-segment batch, the total is always fitted with
+# ARIMA, however few months there are; only a series ARIMA can't fit at all
+# (e.g. 2 months) falls back to the mean of its last 3 months
+with step("ARIMA fit"):
+    models = load_models("forecast_job_postings")
+    forecast = forecast_segments(series, steps=6, order=(2, 1, 2), min_length=1, workers=1,
+                                 models=models)  # This combo is very stable
+    save_models(models, "forecast_job_postings")
 
-# Forecast the next 6 months
-forecast = model_fit.forecast(steps=6)
-
-# Create a future dataframe
-future_dates = pd.date_range(start=job_trends['ds'].max(), periods=7, freq='M')[1:]
-forecast_df = pd.DataFrame({'ds': future_dates, 'job_postings': forecast})
+# Create a future dataframe (forecast months are dated on their last day)
+forecast_df = forecast[['ds', 'forecast']].rename(columns={'forecast': 'job_postings'})
 
 # Plot the forecast
-plt.figure(figsize=(10, 5))
-plt.plot(job_trends['ds'], job_trends['job_postings'], marker='o', label='Actual Job Postings')
-plt.plot(forecast_df['ds'], forecast_df['job_postings'], marker='x', color='red', label='Predicted Job Postings')
-plt.title("Predicted Job Postings (Next 6 Months)")
-plt.xlabel("Date")
-plt.ylabel("Number of Job Postings")
-plt.grid()
-plt.legend()
-plt.show()
+def plot_forecast(data):
+    job_trends, forecast_df = data
+    plt.figure(figsize=(10, 5))
+    plt.plot(job_trends['ds'], job_trends['job_postings'], marker='o', label='Actual Job Postings')
+    plt.plot(forecast_df['ds'], forecast_df['job_postings'], marker='x', color='red', label='Predicted Job Postings')
+    plt.title("Predicted Job Postings (Next 6 Months)")
+    plt.xlabel("Date")
+    plt.ylabel("Number of Job Postings")
+    plt.grid()
+    plt.legend()
+
+# Shown, or saved as graphs/PredictedJobPostings6Months.png when headless
+with step("plot"):
+    show("PredictedJobPostings6Months", (job_trends, forecast_df), plot_forecast)
 
 # Save predictions to CSV
-forecast_df.to_csv("job-market-analysis/arima_job_postings.csv", index=False)
+forecast_df.to_csv(data_path("arima_job_postings.csv"), index=False)
@@ -0,0 +1,140 @@
+"""
+heavy_hitters.py
+Approximate top-k counting over streams, with bounded memory.
+
+- SpaceSaving keeps at most `capacity` counters. Each estimate is an
+  overestimate by at most its `error` (and by at most N / capacity
+  overall), so `count - error` is a guaranteed lower bound. Every item
+  whose true count exceeds N / capacity is monitored.
+- CountMinSketch keeps a depth x width table of counters. An estimate
+  overshoots by at most eps * N with probability 1 - delta, where
+  width = ceil(e / eps) and depth = ceil(ln(1 / delta)). A bounded set of
+  candidates is tracked to answer top-k queries.
+
+Both take weighted batches (e.g. the value_counts() of a chunk), and two
+sketches built on different shards of the data can be merged.
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+
+
+class SpaceSaving:
+    def __init__(self, capacity=1000):
+        self.capacity = capacity
+        self.counts = pd.Series(dtype=np.int64)
+        self.errors = pd.Series(dtype=np.int64)
+        self.n = 0
+
+    def _floor(self):
+        """Count assumed for an item that isn't monitored (0 while there's room)."""
+        return int(self.counts.min()) if len(self.counts) >= self.capacity else 0
+
+    def update(self, counts: pd.Series):
+        """Add a batch of exact item counts (item -> count)."""
+        # An exact batch: room for every item, so unmonitored items count as 0
+        batch = SpaceSaving(capacity=len(counts) + 1)
+        batch.counts = counts.astype(np.int64)
+        batch.errors = pd.Series(0, index=counts.index, dtype=np.int64)
+        batch.n = int(counts.sum())
+        self.merge(batch)
+
+    def update_values(self, values: pd.Series):
+        """Add one occurrence of each non-null value."""
+        self.update(values.value_counts(sort=False))
+
+    def merge(self, other: "SpaceSaving"):
+        """Fold another summary (e.g. from a different shard) into this one."""
+        floor_self, floor_other = self._floor(), other._floor()
+        index = self.counts.index.union(other.counts.index, sort=False)
+        counts = (self.counts.reindex(index).fillna(floor_self)
+                  + other.counts.reindex(index).fillna(floor_other))
+        errors = (self.errors.reindex(index).fillna(floor_self)
+                  + other.errors.reindex(index).fillna(floor_other))
+        keep = counts.nlargest(self.capacity, keep="first").index
+        self.counts = counts[keep].astype(np.int64)
+        self.errors = errors[keep].astype(np.int64)
+        self.n += other.n
+        return self
+
+    def top(self, k=10) -> pd.DataFrame:
+        """Estimated top-k with per-item error; `guaranteed` marks items surely in the true top-k."""
+        ranked = self.counts.sort_values(ascending=False, kind="stable")
+        top = pd.DataFrame({"count": ranked, "error": self.errors[ranked.index]}).head(k)
+        # An item is surely top-k if its lower bound beats the (k+1)-th estimate
+        threshold = int(ranked.iloc[k]) if len(ranked) > k else 0
+        top["guaranteed"] = (top["count"] - top["error"]) >= threshold
+        return top
+
+    @property
+    def error_bound(self):
+        return self.n / self.capacity
+
+    @property
+    def size(self):
+        """Counters held (memory grows with this)."""
+        return len(self.counts)
+
+
+class CountMinSketch:
+    def __init__(self, eps=1e-4, delta=1e-3, candidates=1000, seed=0):
+        self.width = math.ceil(math.e / eps)
+        self.depth = math.ceil(math.log(1 / delta))
+        self.table = np.zeros((self.depth, self.width), dtype=np.int64)
+        # hash_array takes a 16-character key; one key per row
+        self.keys = [f"{seed:08d}{row:08d}" for row in range(self.depth)]
+        self.max_candidates = candidates
+        self.candidates = pd.Series(dtype=np.int64)
+        self.n = 0
+
+    def _columns(self, items, row):
+        hashes = pd.util.hash_array(np.asarray(items, dtype=object), hash_key=self.keys[row])
+        return (hashes % np.uint64(self.width)).astype(np.int64)
+
+    def estimate(self, items) -> np.ndarray:
+        items = np.asarray(items, dtype=object)
+        estimates = np.full(len(items), np.iinfo(np.int64).max, dtype=np.int64)
+        for row in range(self.depth):
+            estimates = np.minimum(estimates, self.table[row, self._columns(items, row)])
+        return estimates
+
+    def update(self, counts: pd.Series):
+        """Add a batch of exact item counts (item -> count)."""
+        items = counts.index.to_numpy(dtype=object)
+        weights = counts.to_numpy(dtype=np.int64)
+        for row in range(self.depth):
+            self.table[row] += np.bincount(self._columns(items, row), weights=weights,
+                                           minlength=self.width).astype(np.int64)
+        self.n += int(weights.sum())
+        self._refresh_candidates(self.candidates.index.union(counts.index, sort=False))
+
+    def update_values(self, values: pd.Series):
+        self.update(values.value_counts(sort=False))
+
+    def _refresh_candidates(self, items):
+        estimates = pd.Series(self.estimate(items.to_numpy(dtype=object)), index=items)
+        self.candidates = estimates.nlargest(self.max_candidates, keep="first")
+
+    def merge(self, other: "CountMinSketch"):
+        if (self.width, self.depth, self.keys) != (other.width, other.depth, other.keys):
+            raise ValueError("can only merge sketches built with the same eps, delta and seed")
+        self.table += other.table
+        self.n += other.n
+        self._refresh_candidates(self.candidates.index.union(other.candidates.index, sort=False))
+        return self
+
+    def top(self, k=10) -> pd.DataFrame:
+        ranked = self.candidates.sort_values(ascending=False, kind="stable").head(k)
+        return pd.DataFrame({"count": ranked, "error": int(math.ceil(self.error_bound))})
+
+    @property
+    def error_bound(self):
+        """Overestimate bound eps * N (holds with probability 1 - delta)."""
+        return math.e / self.width * self.n
+
+    @property
+    def size(self):
+        """Counters held: the table plus the tracked candidates."""
+        return self.table.size + len(self.candidates)
@@ -5,24 +5,32 @@
 # Uses: linkedin_no_skills_cleaned.csv (we need to use the dataset with dates)
 # Produces: A graph of the job postings over time 
 
-import pandas as pd
 import matplotlib.pyplot as plt
+import sql_backend
+from plotting import show
+from instrumentation import step
+from timeseries_store import SOURCES, load_store
 
-linkedin_recent = pd.read_csv("job-market-analysis/linkedin_no_skills_cleaned.csv")
-
-# Convert date to datetime format
-linkedin_recent['datePosted'] = pd.to_datetime(linkedin_recent['datePosted'])
-
-# Aggregate by month
-linkedin_recent['year_month'] = linkedin_recent['datePosted'].dt.to_period('M')
-job_trends = linkedin_recent.groupby('year_month').size()
+# Postings per month, from the daily time-series store built once from the
+# cleaned data (see timeseries_store.py; it also has daily and weekly counts),
+# or with ANALYSIS_BACKEND=duckdb from a SQL query on the file (see sql_backend.py)
+with step("load series"):
+    if sql_backend.use_sql():
+        job_trends = sql_backend.postings_per_period(SOURCES["linkedin"]["file"], SOURCES["linkedin"]["date"], "M")
+    else:
+        job_trends = load_store().query("M")
+job_trends = job_trends.rename_axis("year_month")
 
 # Plot job postings over time
-plt.figure(figsize=(10, 5))
-job_trends.plot(kind='line', marker='o', color='blue')
-plt.title("LinkedIn Job Postings Over Time")
-plt.xlabel("Month (2021)")
-plt.ylabel("Number of Job Postings")
-plt.xticks(rotation=45)
-plt.grid()
-plt.show()
+def plot_trends(job_trends):
+    plt.figure(figsize=(10, 5))
+    job_trends.plot(kind='line', marker='o', color='blue')
+    plt.title("LinkedIn Job Postings Over Time")
+    plt.xlabel("Month (2021)")
+    plt.ylabel("Number of Job Postings")
+    plt.xticks(rotation=45)
+    plt.grid()
+
+# Shown, or saved as graphs/LinkedInJobPostingsOverTime.png when headless (see plotting.py)
+with step("plot"):
+    show("LinkedInJobPostingsOverTime", job_trends, plot_trends)
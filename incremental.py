@@ -0,0 +1,110 @@
+"""
+incremental.py
+State for the --incremental mode of the cleaning scripts.
+
+The raw scrapes are append-only, so each stage remembers a watermark: the
+byte offset it has consumed up to, plus a hash of the bytes just before it.
+On the next run only the bytes after the offset are parsed, up to the last
+newline: a row still being written is left for the run after. If the file
+shrank or the bytes before the offset changed, the file was rewritten and
+the stage falls back to a full rebuild.
+
+State lives in ./.incremental/<stage>.json (plus any .npy digest sets the
+stage keeps next to it).
+"""
+
+import hashlib
+import io
+import json
+import os
+
+import pandas as pd
+import schemas
+from dataset_cache import DATA_DIR, data_path
+
+STATE_DIR = DATA_DIR / ".incremental"
+TAIL_BYTES = 64 * 1024
+
+
+def state_file(stage, suffix=".json"):
+    return STATE_DIR / f"{stage}{suffix}"
+
+
+def load_state(stage) -> dict:
+    try:
+        with open(state_file(stage)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_state(stage, state: dict):
+    STATE_DIR.mkdir(exist_ok=True)
+    path = state_file(stage)
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    with open(tmp, "w") as f:
+        json.dump(state, f, indent=1)
+    os.replace(tmp, path)
+
+
+def _tail_hash(f, offset):
+    start = max(0, offset - TAIL_BYTES)
+    f.seek(start)
+    return hashlib.blake2b(f.read(offset - start), digest_size=16).hexdigest()
+
+
+def watermark(name) -> dict:
+    """Watermark for the current end of a file."""
+    path = data_path(name)
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        return {"offset": size, "tail_hash": _tail_hash(f, size)}
+
+
+def read_appended(name, mark, dtype=None):
+    """
+    Parse the rows appended to a CSV since `mark`.
+
+    Only complete lines are consumed: new_mark stops after the last newline,
+    so a partly written final row is read by the next call.
+
+    Returns (delta_df, new_mark). delta_df is None when there is no usable
+    mark, the file was rewritten, or the new rows don't fit `dtype`: the
+    caller must then rebuild from scratch.
+    """
+    path = data_path(name)
+    size = os.path.getsize(path)
+    if not mark or size < mark["offset"]:
+        return None, watermark(name)
+    with open(path, "rb") as f:
+        if _tail_hash(f, mark["offset"]) != mark["tail_hash"]:
+            return None, watermark(name)
+        f.seek(0)
+        header = f.readline()
+        f.seek(mark["offset"])
+        appended = f.read(size - mark["offset"])
+        appended = appended[:appended.rfind(b"\n") + 1]
+        end = mark["offset"] + len(appended)
+        new_mark = {"offset": end, "tail_hash": _tail_hash(f, end)}
+    try:
+        delta = schemas.read_csv(io.BytesIO(header + appended), categorical=False,
+                                 schema=schemas.schema_for(name), dtype=dtype)
+    except (ValueError, TypeError):
+        return None, new_mark
+    return delta, new_mark
+
+
+def numeric_dtypes(df: pd.DataFrame) -> dict:
+    """{column: dtype} for the numeric/bool columns, to parse later deltas the same way."""
+    return {c: str(t) for c, t in df.dtypes.items() if t.kind in "biuf"}
+
+
+def append_csv(df: pd.DataFrame, name):
+    """Append rows (no header) to an existing CSV written with to_csv(index=False)."""
+    with open(data_path(name), "a", newline="") as f:
+        df.to_csv(f, index=False, header=False)
+
+
+def file_stat(name) -> dict:
+    st = os.stat(data_path(name))
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
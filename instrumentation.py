@@ -0,0 +1,340 @@
+"""
+instrumentation.py
+Per-step timings of the analysis scripts, written as one trace file per run.
+
+A script wraps each of its steps in step():
+
+    with step("drop_duplicates", rows_in=len(df)) as s:
+        df = df.drop_duplicates()
+        s.rows_out = len(df)
+
+and each step records its wall time, CPU time (including worker processes
+that finished during it), peak RSS and the rows it read and wrote. Steps
+can nest; a step run several times (e.g. once per chunk) is summed into one
+entry with its number of calls.
+
+When the script exits, the steps are written to
+./.traces/<script>/<run id>.json, with the run's totals:
+
+    {"script": "clean_linkedin", "run_id": "20261016-210635-4242",
+     "started": "2026-10-16T21:06:35+00:00", "argv": [...],
+     "total": {"seconds": 3.2, "cpu_seconds": 3.0, "peak_rss_mib": 210.4},
+     "steps": [{"step": "load", "parent": null, "calls": 1, "seconds": 1.1,
+                "cpu_seconds": 1.0, "peak_rss_mib": 180.2, "rss_mib": 150.3,
+                "rows_in": null, "rows_out": 28410}, ...]}
+
+pipeline.py gives all stages of one run the same run id (JOB_MARKET_RUN_ID),
+and the dashboard charts the traces of each script across runs. Only the
+last MAX_TRACES runs of a script are kept. JOB_MARKET_TRACE=0 turns the
+trace files off.
+
+On Linux a step's peak RSS is its own: the process high-water mark is reset
+(/proc/self/clear_refs) when the step starts. Elsewhere it is the process's
+peak so far, and on Windows (no `resource` module) memory is reported as 0
+and CPU time excludes worker processes.
+
+Profiling is opt-in, from the run's first step to its exit, with
+JOB_MARKET_PROFILE:
+- cprofile: a cProfile dump next to the trace (<run id>.prof; open it with
+  pstats or snakeviz);
+- sample: the main thread's stack is sampled every SAMPLE_INTERVAL seconds
+  of CPU time and written as collapsed stacks (<run id>.stacks, one
+  "frame;frame;... count" line per stack, the input of flamegraph.pl and
+  speedscope). Much cheaper than cProfile on hot loops. Needs SIGPROF, so
+  on Windows it falls back to cprofile.
+"""
+
+import atexit
+import cProfile
+import json
+import os
+import signal
+import sys
+import time
+import warnings
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pandas as pd
+
+from dataset_cache import DATA_DIR
+
+try:
+    import resource  # Unix only
+except ImportError:
+    resource = None
+
+TRACE_DIR = DATA_DIR / ".traces"
+MAX_TRACES = 50
+SAMPLE_INTERVAL = 0.005
+TRACE = os.environ.get("JOB_MARKET_TRACE", "1") != "0"
+PROFILE = os.environ.get("JOB_MARKET_PROFILE", "")
+PROFILERS = ["", "cprofile", "sample"]
+
+# ru_maxrss is in KiB on Linux, bytes on macOS
+RSS_UNIT = 2 ** 20 if sys.platform == "darwin" else 2 ** 10
+
+
+def new_run_id() -> str:
+    return f"{datetime.now():%Y%m%d-%H%M%S}-{os.getpid()}"
+
+
+def _status_mib(field):
+    """A memory field of /proc/self/status (VmHWM, VmRSS) in MiB, or None off Linux."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def peak_rss_mib() -> float:
+    """High-water mark of this process's RSS since the last reset_peak_rss()."""
+    peak = _status_mib("VmHWM")
+    if peak is not None:
+        return peak
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / RSS_UNIT if resource else 0.0
+
+
+def reset_peak_rss() -> bool:
+    """Reset the RSS high-water mark to the current RSS (Linux only); whether it was reset."""
+    if not sys.platform.startswith("linux"):
+        return False
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _cpu_seconds():
+    """CPU time of this process and of its waited-for children (e.g. worker pools)."""
+    if resource is None:
+        return time.process_time()
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return time.process_time() + children.ru_utime + children.ru_stime
+
+
+class Step:
+    """One running step; set rows_in / rows_out on it inside the with block."""
+
+    def __init__(self, name, parent=None, rows_in=None):
+        self.name = name
+        self.parent = parent
+        self.path = f"{parent.path}/{name}" if parent else name
+        self.rows_in = rows_in
+        self.rows_out = None
+        self.peak = 0.0  # peaks seen before a nested step reset the high-water mark
+
+
+class Recorder:
+    """The steps of this process's run, merged by path (parent/.../name)."""
+
+    def __init__(self):
+        self.run_id = os.environ.get("JOB_MARKET_RUN_ID") or new_run_id()
+        self.started = datetime.now(timezone.utc)
+        self.start_seconds = time.perf_counter()
+        self.pid = os.getpid()
+        self.steps = {}
+        self.stack = []
+        self.peak = 0.0
+
+    def checkpoint(self):
+        """Fold the high-water mark so far into the run and every running step, then reset it."""
+        peak = peak_rss_mib()
+        self.peak = max(self.peak, peak)
+        for running in self.stack:
+            running.peak = max(running.peak, peak)
+        reset_peak_rss()
+
+    def entry(self, step: Step) -> dict:
+        """The entry of `step`'s path (entries are kept in the order the steps first started)."""
+        return self.steps.setdefault(step.path, {
+            "step": step.name, "parent": step.parent.path if step.parent else None, "calls": 0,
+            "seconds": 0.0, "cpu_seconds": 0.0, "peak_rss_mib": 0.0, "rss_mib": None,
+            "rows_in": None, "rows_out": None,
+        })
+
+    def add(self, step: Step, seconds, cpu_seconds, peak):
+        """Sum a finished run of `step` into its entry."""
+        entry = self.entry(step)
+        entry["calls"] += 1
+        entry["seconds"] = round(entry["seconds"] + seconds, 4)
+        entry["cpu_seconds"] = round(entry["cpu_seconds"] + cpu_seconds, 4)
+        entry["peak_rss_mib"] = round(max(entry["peak_rss_mib"], peak), 1)
+        rss = _status_mib("VmRSS")
+        entry["rss_mib"] = round(rss, 1) if rss is not None else None
+        for field in ["rows_in", "rows_out"]:
+            value = getattr(step, field)
+            if value is not None:
+                entry[field] = (entry[field] or 0) + int(value)
+
+    def summary(self) -> dict:
+        self.peak = max(self.peak, peak_rss_mib())
+        return {
+            "script": script_name(),
+            "run_id": self.run_id,
+            "started": self.started.isoformat(timespec="seconds"),
+            "argv": sys.argv[1:],
+            "total": {"seconds": round(time.perf_counter() - self.start_seconds, 4),
+                      "cpu_seconds": round(_cpu_seconds(), 4), "peak_rss_mib": round(self.peak, 1)},
+            "steps": list(self.steps.values()),
+        }
+
+
+def script_name() -> str:
+    return Path(sys.argv[0]).stem if sys.argv and sys.argv[0] else "python"
+
+
+def trace_path(script, run_id, suffix=".json") -> Path:
+    return TRACE_DIR / script / f"{run_id}{suffix}"
+
+
+_recorder = Recorder()
+_profiler = None
+
+
+@contextmanager
+def step(name, rows_in=None):
+    """Time one named step of this run; yields its Step (see the module docstring)."""
+    global _profiler
+    if _profiler is None and PROFILE:
+        _profiler = _start_profiler()
+    recorder = _recorder
+    current = Step(name, recorder.stack[-1] if recorder.stack else None, rows_in)
+    recorder.entry(current)
+    recorder.checkpoint()
+    recorder.stack.append(current)
+    start, cpu = time.perf_counter(), _cpu_seconds()
+    try:
+        yield current
+    finally:
+        seconds, cpu = time.perf_counter() - start, _cpu_seconds() - cpu
+        recorder.stack.pop()
+        peak = max(current.peak, peak_rss_mib())
+        recorder.peak = max(recorder.peak, peak)
+        # The enclosing step's peak includes this one
+        if recorder.stack:
+            recorder.stack[-1].peak = max(recorder.stack[-1].peak, peak)
+        recorder.add(current, seconds, cpu, peak)
+
+
+def run_id() -> str:
+    return _recorder.run_id
+
+
+def _prune(directory: Path):
+    traces = sorted(directory.glob("*.json"), key=lambda p: p.stat().st_mtime_ns)
+    for old in traces[:-MAX_TRACES]:
+        for path in directory.glob(old.stem + ".*"):
+            path.unlink(missing_ok=True)
+
+
+def write_trace(extra=None):
+    """Write this run's trace file (and any profile); its path, or None if there was nothing to write."""
+    if os.getpid() != _recorder.pid or not ((TRACE and _recorder.steps) or _profiler):
+        return None
+    summary = _recorder.summary()
+    path = trace_path(summary["script"], summary["run_id"])
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if _profiler is not None:
+        summary["profile"] = _profiler.save(path)
+    summary.update(extra or {})
+    tmp = path.with_suffix(".json.tmp")
+    with open(tmp, "w") as f:
+        json.dump(summary, f, indent=1)
+    os.replace(tmp, path)
+    _prune(path.parent)
+    return path
+
+
+def load_trace(path) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def load_traces(script=None) -> pd.DataFrame:
+    """
+    One row per step of every kept trace (of `script`, or of all scripts):
+    script, run_id, started, step, parent, calls, seconds, cpu_seconds,
+    peak_rss_mib, rss_mib, rows_in, rows_out. A "total" row per run holds
+    the run's totals.
+    """
+    rows = []
+    pattern = f"{script}/*.json" if script else "*/*.json"
+    for path in sorted(TRACE_DIR.glob(pattern)):
+        try:
+            trace = load_trace(path)
+        except (OSError, ValueError):
+            continue
+        run = {"script": trace["script"], "run_id": trace["run_id"], "started": trace["started"]}
+        rows.append({**run, "step": "total", "parent": None, "calls": 1, **trace["total"]})
+        rows.extend({**run, **entry} for entry in trace["steps"])
+    columns = ["script", "run_id", "started", "step", "parent", "calls", "seconds", "cpu_seconds",
+               "peak_rss_mib", "rss_mib", "rows_in", "rows_out"]
+    traces = pd.DataFrame(rows, columns=columns)
+    traces["started"] = pd.to_datetime(traces["started"])
+    return traces.sort_values(["started", "script"], kind="stable", ignore_index=True)
+
+
+# ---------------------------
+# Opt-in profilers
+# ---------------------------
+
+class _CProfiler:
+    def __init__(self):
+        self.profile = cProfile.Profile()
+        self.profile.enable()
+
+    def save(self, trace_file: Path) -> str:
+        self.profile.disable()
+        path = trace_file.with_suffix(".prof")
+        self.profile.dump_stats(path)
+        return path.name
+
+
+class _SamplingProfiler:
+    """Samples the main thread's stack on SIGPROF (every `interval` seconds of CPU time)."""
+
+    def __init__(self, interval=SAMPLE_INTERVAL):
+        self.stacks = Counter()
+        signal.signal(signal.SIGPROF, self._sample)
+        signal.setitimer(signal.ITIMER_PROF, interval, interval)
+
+    def _sample(self, signum, frame):
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append(f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})")
+            frame = frame.f_back
+        self.stacks[";".join(reversed(stack))] += 1
+
+    def save(self, trace_file: Path) -> str:
+        signal.setitimer(signal.ITIMER_PROF, 0, 0)
+        path = trace_file.with_suffix(".stacks")
+        with open(path, "w") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        return path.name
+
+
+def _start_profiler():
+    if PROFILE not in PROFILERS:
+        raise ValueError(f"JOB_MARKET_PROFILE must be one of {PROFILERS[1:]}, not {PROFILE!r}")
+    if PROFILE == "cprofile":
+        return _CProfiler()
+    if PROFILE == "sample":
+        if not hasattr(signal, "SIGPROF"):
+            warnings.warn("no SIGPROF on this platform, profiling with cProfile instead", RuntimeWarning)
+            return _CProfiler()
+        return _SamplingProfiler()
+    return None
+
+
+atexit.register(write_trace)
@@ -0,0 +1,256 @@
+"""
+job_aggregates.py
+Posting counts per job title, company and location across all three datasets.
+
+Each dataset is read once (only the columns below) and all three counts are
+computed in the same pass. The result is cached under ./.dataset_cache/ until
+one of the sources changes, so most_common_job_titles.py,
+top_hiring_companies.py and top_hiring_locations.py together scan the data
+once instead of three times.
+
+Counts (and the order of ties) match concatenating the columns of the three
+datasets and calling value_counts().
+
+Locations are counted per raw string. location_counts() either drops the
+strings that are just a country name (the default), or regroups the counts
+per normalized city, metro, region or country (see locations.py), so
+"320 Outerbelt Street, Columbus, OH 43213" and "Columbus, OH" count together.
+Likewise canonical_counts() merges the spelling variants of company names
+and titles ("Google LLC", "google inc.") using the alias table of
+canonical_names.py.
+
+approximate_aggregates() is the bounded-memory alternative for very large
+dumps: each dataset is streamed in chunks into heavy-hitter sketches (see
+heavy_hitters.py), one per dataset and dimension, which are then merged.
+Only the top values are kept, with error bounds.
+
+With ANALYSIS_BACKEND=duckdb the exact counts are computed by a SQL query
+instead (see sql_backend.py).
+
+Run `python job_aggregates.py [--approximate] [--level metro] [--canonical]` to print the top values.
+"""
+
+import argparse
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+import schemas
+import sql_backend
+from dataset_cache import CACHE_DIR, HAVE_PARQUET, data_path, fingerprint, load_dataset
+from canonical_names import load_aliases
+from heavy_hitters import CountMinSketch, SpaceSaving
+from locations import LEVELS, group_counts
+
+# Which column holds each dimension in each dataset
+SOURCES = {
+    "indeed": {"file": "indeed_webscrape.csv", "title": "job_title", "company": "company", "location": "location"},
+    "linkedin_historical": {"file": "linkedin_historical.csv", "title": "job_title", "company": "company", "location": "job_location"},
+    "linkedin_no_skills": {"file": "linkedin_no_skills.csv", "title": "title", "company": "company", "location": "location"},
+}
+DIMENSIONS = ["title", "company", "location"]
+
+# Locations that are just a country name are left out of the location counts
+COUNTRY_NAMES = ['united states', 'canada', 'united kingdom', 'australia', 'germany', 'france', 'india', 'china']
+
+AGGREGATES_FILE = CACHE_DIR / "job_aggregates.parquet"
+MANIFEST_FILE = CACHE_DIR / "job_aggregates.json"
+# Bumped when the cached table's contents change meaning
+AGGREGATES_VERSION = 2
+
+
+def value_counts_unsorted(values: pd.Series) -> pd.Series:
+    """
+    Like values.value_counts(sort=False), keys in order of first appearance.
+
+    The column is factorized into a categorical (int codes + distinct labels),
+    so the string column can be dropped right away and counting is a bincount.
+    """
+    codes, uniques = pd.factorize(values)
+    counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+    if isinstance(uniques, pd.CategoricalIndex):
+        # Plain labels, so sources with different categories combine by value
+        uniques = uniques.astype(uniques.categories.dtype)
+    return pd.Series(counts, index=pd.Index(uniques))
+
+
+def scan_source(source: str) -> dict:
+    """Unsorted counts per dimension for one dataset, from a single load."""
+    spec = SOURCES[source]
+    df = load_dataset(spec["file"], columns=[spec[d] for d in DIMENSIONS])
+    counts = {}
+    for dim in DIMENSIONS:
+        counts[dim] = value_counts_unsorted(df[spec[dim]])
+        del df[spec[dim]]
+    return counts
+
+
+def combine(per_source: list) -> pd.Series:
+    """Sum unsorted counts of several sources, keeping first-appearance order, and rank them."""
+    combined = pd.concat(per_source).groupby(level=0, sort=False).sum()
+    combined.index.name = None
+    return combined.sort_values(ascending=False, kind="stable").rename("count")
+
+
+def exclude_countries(counts: pd.Series) -> pd.Series:
+    return counts[~counts.index.str.lower().isin(COUNTRY_NAMES)]
+
+
+def location_counts(counts: pd.Series, level=None) -> pd.Series:
+    """
+    Counts per raw location string, without bare country names (level=None),
+    or regrouped per "city", "metro", "region" or "country" (locations.LEVELS).
+    """
+    return exclude_countries(counts) if level is None else group_counts(counts, level)
+
+
+def canonical_counts(counts: pd.Series, dimension: str) -> pd.Series:
+    """Counts of 'title' or 'company' values summed per canonical name (the alias table is updated and saved)."""
+    table = load_aliases(dimension)
+    if table.update(counts)["added"]:
+        table.save()
+    return table.group(counts)
+
+
+def compute_aggregates() -> dict:
+    """Ranked counts per dimension over all sources (one scan of each source)."""
+    if sql_backend.use_sql():
+        return sql_backend.aggregate_counts(SOURCES, DIMENSIONS)
+    scanned = [scan_source(source) for source in SOURCES]
+    return {dim: combine([s[dim] for s in scanned]) for dim in DIMENSIONS}
+
+
+def _source_fingerprints(previous: dict) -> dict:
+    return {
+        source: fingerprint(data_path(spec["file"]), previous.get(source))
+        for source, spec in SOURCES.items()
+    }
+
+
+def load_aggregates() -> dict:
+    """compute_aggregates(), reusing the cached result while the sources are unchanged."""
+    try:
+        with open(MANIFEST_FILE) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        manifest = {}
+    fps = _source_fingerprints(manifest.get("sources", {}))
+    hashes = {s: fp["hash"] for s, fp in fps.items()}
+
+    if (HAVE_PARQUET and AGGREGATES_FILE.exists() and manifest.get("hashes") == hashes
+            and manifest.get("version") == AGGREGATES_VERSION
+            and manifest.get("backend", "pandas") == sql_backend.BACKEND):
+        table = pd.read_parquet(AGGREGATES_FILE)
+        return {
+            dim: pd.Series(group["count"].to_numpy(), index=pd.Index(group["value"].to_numpy()), name="count")
+            for dim, group in table.groupby("dimension", sort=False)
+        }
+
+    aggregates = compute_aggregates()
+    if HAVE_PARQUET:
+        CACHE_DIR.mkdir(exist_ok=True)
+        table = pd.concat(
+            [pd.DataFrame({"dimension": dim, "value": counts.index, "count": counts.to_numpy()})
+             for dim, counts in aggregates.items()],
+            ignore_index=True,
+        )
+        tmp = AGGREGATES_FILE.with_suffix(f".{os.getpid()}.tmp")
+        table.to_parquet(tmp, index=False)
+        os.replace(tmp, AGGREGATES_FILE)
+        tmp = MANIFEST_FILE.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp, "w") as f:
+            json.dump({"sources": fps, "hashes": hashes, "version": AGGREGATES_VERSION,
+                       "backend": sql_backend.BACKEND}, f)
+        os.replace(tmp, MANIFEST_FILE)
+    return aggregates
+
+
+def _new_sketch(method, capacity, eps):
+    if method == "space-saving":
+        return SpaceSaving(capacity)
+    if method == "count-min":
+        return CountMinSketch(eps=eps, candidates=capacity)
+    raise ValueError(f"unknown sketch method {method!r}")
+
+
+def approximate_aggregates(method="space-saving", capacity=1000, eps=1e-4, chunksize=100_000, level=None,
+                           canonical=False) -> dict:
+    """
+    Heavy-hitter sketch per dimension over all sources.
+
+    Each source is streamed from its CSV in chunks, so memory is bounded by
+    the chunk size and the sketch size, not by the number of distinct values.
+    Each source gets its own sketches, merged at the end as shards would be.
+    Locations are counted as location_counts(level) labels, and with
+    canonical=True titles and companies as canonical names.
+    """
+    merged = {dim: _new_sketch(method, capacity, eps) for dim in DIMENSIONS}
+    # One alias table per dimension for the whole scan, updated in memory per
+    # chunk and saved once at the end
+    tables = {dim: load_aliases(dim) for dim in DIMENSIONS if dim != "location"} if canonical else {}
+    added = dict.fromkeys(tables, 0)
+    for spec in SOURCES.values():
+        shard = {dim: _new_sketch(method, capacity, eps) for dim in DIMENSIONS}
+        columns = [spec[d] for d in DIMENSIONS]
+        for chunk in schemas.read_csv(data_path(spec["file"]), columns=columns, chunksize=chunksize,
+                                      categorical=False):
+            for dim in DIMENSIONS:
+                counts = chunk[spec[dim]].value_counts(sort=False)
+                if dim == "location":
+                    counts = location_counts(counts, level)
+                elif canonical:
+                    added[dim] += tables[dim].update(counts)["added"]
+                    counts = tables[dim].group(counts)
+                shard[dim].update(counts)
+        for dim in DIMENSIONS:
+            merged[dim].merge(shard[dim])
+    for dim, table in tables.items():
+        if added[dim]:
+            table.save()
+    return merged
+
+
+def top_counts(dimension: str, k=10, approximate=False, level=None, canonical=False, **sketch_options) -> pd.Series:
+    """
+    The k most common values of 'title', 'company' or 'location' across all datasets.
+
+    level: for locations, see location_counts(). canonical=True counts
+    titles and companies per canonical name (see canonical_counts()).
+    approximate=True uses approximate_aggregates() (sketch_options are
+    passed on); the counts are then estimates.
+    """
+    if approximate:
+        sketch = approximate_aggregates(level=level, canonical=canonical, **sketch_options)[dimension]
+        return sketch.top(k)["count"].rename("count")
+    counts = load_aggregates()[dimension]
+    if dimension == "location":
+        return location_counts(counts, level).head(k)
+    return (canonical_counts(counts, dimension) if canonical else counts).head(k)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Print the top titles, companies and locations")
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--approximate", action="store_true", help="use streaming heavy-hitter sketches")
+    parser.add_argument("--method", choices=["space-saving", "count-min"], default="space-saving")
+    parser.add_argument("--capacity", type=int, default=1000, help="counters (space-saving) or candidates (count-min)")
+    parser.add_argument("--level", choices=LEVELS, help="group locations by normalized city, metro, region or country")
+    parser.add_argument("--canonical", action="store_true", help="merge spelling variants of titles and companies")
+    args = parser.parse_args()
+
+    if args.approximate:
+        sketches = approximate_aggregates(method=args.method, capacity=args.capacity, level=args.level,
+                                          canonical=args.canonical)
+        for dim, sketch in sketches.items():
+            print(f"== {dim} (estimates; overestimate bound {sketch.error_bound:,.0f})")
+            print(sketch.top(args.k).to_string())
+    else:
+        for dim, counts in load_aggregates().items():
+            if dim == "location":
+                counts = location_counts(counts, args.level)
+            elif args.canonical:
+                counts = canonical_counts(counts, dim)
+            print(f"== {dim}")
+            print(counts.head(args.k).to_string())
@@ -0,0 +1,156 @@
+"""
+linkedin_context.py
+Helpers for the `context` column of linkedin_no_skills.csv, which holds the
+schema.org JobPosting JSON of each posting.
+
+extract_context() is the parallel engine: it shards the column across a
+process pool and pulls several schema.org fields in one parse per row,
+using orjson or ujson when installed.
+"""
+
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+try:
+    import orjson
+    _loads = orjson.loads
+    JSON_BACKEND = "orjson"
+except ImportError:
+    try:
+        import ujson
+        _loads = ujson.loads
+        JSON_BACKEND = "ujson"
+    except ImportError:
+        _loads = json.loads
+        JSON_BACKEND = "json"
+
+# "datePosted": "<value without quotes or escapes>" as a key of the outermost
+# object: no bracket between the opening brace and the key
+DATE_POSTED_RE = r'^\s*\{[^{}\[\]]*?"datePosted"\s*:\s*"([^"\\]*)"'
+
+# Fields extract_context() knows how to flatten into a plain string column
+CONTEXT_FIELDS = ["datePosted", "validThrough", "employmentType", "hiringOrganization", "jobLocation"]
+SHARD_SIZE = 20_000
+
+
+def extract_date(json_str):
+    """Extract 'datePosted' from one JSON string (full json.loads parse)."""
+    try:
+        data = json.loads(json_str)
+        return data.get("datePosted", None)
+    except (json.JSONDecodeError, TypeError):
+        return None
+
+
+def extract_dates(context: pd.Series) -> pd.Series:
+    """
+    Vectorized 'datePosted' extraction for a whole `context` column.
+
+    A regex pulls the value straight out of the JSON text instead of parsing
+    the (mostly description) blob. It is only trusted when the cell looks like
+    a single JSON object with exactly one plain "datePosted" string, and the
+    key comes before any nested object or array (so it is a top-level key);
+    any other cell that mentions "datePosted" goes through extract_date().
+    Cells that don't mention it at all give None, as json.loads + .get
+    would. Results match extract_date() for well-formed JSON objects.
+    """
+    if isinstance(context.dtype, pd.StringDtype):
+        is_str = context.notna()
+    else:
+        is_str = context.map(lambda v: isinstance(v, str)).astype(bool)
+    text = context[is_str].astype(str)
+
+    matched = text.str.extract(DATE_POSTED_RE, expand=False)
+    trusted = (
+        matched.notna()
+        & (text.str.count('"datePosted"') == 1)
+        & text.str.rstrip().str.endswith("}")
+    )
+    mentions = text.str.contains('"datePosted"', regex=False)
+
+    result = pd.Series(None, index=context.index, dtype=object)
+    result.loc[trusted.index[trusted]] = matched[trusted].astype(object)
+    slow = mentions & ~trusted
+    if slow.any():
+        result.loc[slow.index[slow]] = text[slow].map(extract_date).astype(object)
+    return result
+
+
+def _flatten(field, value):
+    """Reduce a schema.org value to the string we keep in the CSV."""
+    if value is None:
+        return None
+    if field == "hiringOrganization":
+        return value.get("name") if isinstance(value, dict) else value
+    if field == "jobLocation":
+        places = value if isinstance(value, list) else [value]
+        parts = []
+        for place in places:
+            address = place.get("address", place) if isinstance(place, dict) else place
+            if isinstance(address, dict):
+                address = ", ".join(
+                    str(address[k]) for k in ("addressLocality", "addressRegion", "addressCountry")
+                    if address.get(k)
+                )
+            if address:
+                parts.append(str(address))
+        return " | ".join(parts) or None
+    if isinstance(value, list):
+        return ",".join(str(v) for v in value)
+    return value
+
+
+def _parse(json_str):
+    """_loads(json_str), retried with json.loads when orjson/ujson reject it (e.g. a bare NaN)."""
+    try:
+        return _loads(json_str)
+    except (ValueError, TypeError):
+        if _loads is json.loads:
+            raise
+        return json.loads(json_str)
+
+
+def extract_fields(json_str, fields=CONTEXT_FIELDS):
+    """Parse one context cell and return a tuple with one flattened value per field."""
+    try:
+        data = _parse(json_str)
+    except (ValueError, TypeError):
+        return (None,) * len(fields)
+    if not isinstance(data, dict):
+        return (None,) * len(fields)
+    return tuple(_flatten(f, data.get(f)) for f in fields)
+
+
+def _extract_shard(args):
+    values, fields = args
+    if fields == ["datePosted"]:
+        return extract_dates(pd.Series(values, dtype=object)).tolist()
+    return [extract_fields(v, fields) for v in values]
+
+
+def extract_context(context: pd.Series, fields=None, workers=1, shard_size=SHARD_SIZE) -> pd.DataFrame:
+    """
+    Extract `fields` (default: all CONTEXT_FIELDS) from a context column.
+
+    The column is split into shards of `shard_size` rows and processed by
+    `workers` processes (0 or None = one per CPU; 1 = in this process).
+    Asking only for datePosted uses the regex fast path of extract_dates().
+    """
+    fields = list(fields or CONTEXT_FIELDS)
+    workers = workers or os.cpu_count() or 1
+    values = context.tolist()
+    shards = [(values[i:i + shard_size], fields) for i in range(0, len(values), shard_size)]
+
+    if workers == 1 or len(shards) <= 1:
+        results = [_extract_shard(shard) for shard in shards]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_extract_shard, shards))
+
+    rows = [row for shard in results for row in shard]
+    if fields == ["datePosted"]:
+        return pd.DataFrame({"datePosted": pd.Series(rows, index=context.index, dtype=object)})
+    return pd.DataFrame.from_records(rows, columns=fields, index=context.index)
@@ -0,0 +1,175 @@
+"""
+locations.py
+Normalizes free-text job locations to city, metro, region and country.
+
+The scraped location strings come in many shapes for the same place:
+"Columbus, OH", "320 Outerbelt Street, Columbus, OH 43213",
+"Joliet, IL&nbsp;Remote", "Bengaluru, Karnataka, India", "India". Each is
+parsed from the right, against the offline gazetteer in gazetteer.csv
+(countries, US states and other regions, and cities with their metro area):
+
+- HTML entities, "Remote"/"Hybrid"/"On-site" markers and ZIP codes are dropped;
+- the last comma-separated part is the country if it names one;
+- the next one is the region (state) if it names one, by name or code;
+- the one before that is the city. Street addresses before it are ignored.
+
+A city missing from the gazetteer is kept as written when its region or
+country is known; its metro is then the city itself.
+
+normalize_location() parses one string and keeps the most recent
+LRU_SIZE results in an LRU memo. normalize_locations() does a whole column:
+it factorizes the column, so each distinct string is parsed once (or taken
+from the memo) and the results are spread back with the integer codes.
+
+    places = normalize_locations(df["location"])    # city, metro, region, country columns
+    group_counts(df["location"].value_counts(), "metro")
+"""
+
+import html
+import re
+from collections import namedtuple
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Shipped with the code, so it is found wherever the datasets are
+GAZETTEER_FILE = Path(__file__).parent / "gazetteer.csv"
+LRU_SIZE = 1 << 16
+
+LEVELS = ["city", "metro", "region", "country"]
+
+# One normalized location; each field is the label it is grouped under at that
+# level ("Columbus, OH", "Columbus, OH", "Ohio", "United States"), or None
+Place = namedtuple("Place", LEVELS)
+
+WORK_MODE_RE = re.compile(r"\b(remote|hybrid|on[- ]?site|in[- ]office)\b", re.IGNORECASE)
+ZIP_RE = re.compile(r"\b\d{5}(?:-\d{4})?\b")
+# "Austin TX": a trailing region code without a comma
+TRAILING_CODE_RE = re.compile(r"^(.*\S)\s+([A-Z]{2,3})$")
+
+
+def _key(text):
+    return re.sub(r"\s+", " ", text).strip(" .").lower()
+
+
+class Gazetteer:
+    def __init__(self, table: pd.DataFrame):
+        self.countries = {}   # key -> country code
+        self.country_names = {}
+        self.regions = {}     # key -> [(region code, country code)]
+        self.region_names = {}
+        self.cities = {}      # key -> [(name, region code, country code, metro)]
+        for row in table.itertuples(index=False):
+            names = [row.name] + [a for a in row.aliases.split("|") if a]
+            if row.type == "country":
+                self.country_names[row.code] = row.name
+                for name in names:
+                    self.countries[_key(name)] = row.code
+            elif row.type == "region":
+                self.region_names[(row.code, row.country)] = row.name
+                for name in names + [row.code]:
+                    self.regions.setdefault(_key(name), []).append((row.code, row.country))
+            elif row.type == "city":
+                for name in names:
+                    self.cities.setdefault(_key(name), []).append((row.name, row.region, row.country, row.metro))
+
+    @classmethod
+    def load(cls, path=GAZETTEER_FILE) -> "Gazetteer":
+        return cls(pd.read_csv(path, dtype=str, keep_default_na=False))
+
+    def country(self, text):
+        return self.countries.get(_key(text))
+
+    def region(self, text, country=None):
+        """(region code, country code) named by text; a US state when the country is unknown."""
+        matches = self.regions.get(_key(text), [])
+        if country is not None:
+            matches = [m for m in matches if m[1] == country]
+        else:
+            matches = sorted(matches, key=lambda m: m[1] != "US")
+        return matches[0] if matches else None
+
+    def city(self, text, region=None, country=None):
+        """(name, region code, country code, metro) of a known city, if unambiguous."""
+        matches = [m for m in self.cities.get(_key(text), [])
+                   if (region is None or m[1] == region) and (country is None or m[2] == country)]
+        return matches[0] if len(matches) == 1 else None
+
+    def place(self, city, region, country, metro=None) -> Place:
+        country_name = self.country_names.get(country)
+        region_name = self.region_names.get((region, country))
+        label = None
+        if city:
+            if country == "US" and region:
+                label = f"{city}, {region}"
+            else:
+                label = ", ".join(p for p in (city, country_name or region_name) if p)
+        return Place(label, metro or label, region_name, country_name)
+
+    def parse(self, raw) -> Place:
+        if not isinstance(raw, str):
+            return Place(None, None, None, None)
+        text = html.unescape(raw).replace("\xa0", " ").split("|")[0]
+        text = ZIP_RE.sub(" ", WORK_MODE_RE.sub(" ", text))
+        parts = [re.sub(r"\s+", " ", p).strip(" .-") for p in text.split(",")]
+        parts = [p for p in parts if p]
+
+        country = region = None
+        if parts and self.country(parts[-1]):
+            country = self.country(parts.pop())
+        if parts:
+            match = self.region(parts[-1], country)
+            split = TRAILING_CODE_RE.match(parts[-1]) if match is None else None
+            if split and self.region(split.group(2), country):
+                match = self.region(split.group(2), country)
+                parts[-1] = split.group(1)
+            elif match:
+                parts.pop()
+            if match:
+                region, country = match
+
+        if not parts:
+            # "New York, United States": a region that is also one of its cities
+            known = self.city(self.region_names[(region, country)], region, country) if region else None
+            return self.place(*known) if known else self.place(None, region, country)
+        known = self.city(parts[-1], region, country)
+        if known:
+            return self.place(*known)
+        if region is None and country is None:
+            return Place(None, None, None, None)
+        return self.place(parts[-1], region, country)
+
+
+@lru_cache(maxsize=1)
+def gazetteer() -> Gazetteer:
+    return Gazetteer.load()
+
+
+@lru_cache(maxsize=LRU_SIZE)
+def normalize_location(raw) -> Place:
+    """Place of one raw location string (all None when it can't be placed)."""
+    return gazetteer().parse(raw)
+
+
+def normalize_locations(values: pd.Series) -> pd.DataFrame:
+    """One row per value: its city, metro, region and country labels (None where unknown)."""
+    codes, uniques = pd.factorize(values)
+    # The last row (all None) is what the missing values' code -1 picks
+    places = np.array([normalize_location(u) for u in uniques] + [Place(None, None, None, None)], dtype=object)
+    return pd.DataFrame(places[codes], index=values.index, columns=LEVELS)
+
+
+def group_counts(counts: pd.Series, level="city") -> pd.Series:
+    """
+    Re-aggregate counts per raw location string (e.g. a value_counts())
+    per `level`, ranked. Strings that don't resolve at that level (e.g. a
+    bare country at the city level) are left out.
+    """
+    if level not in LEVELS:
+        raise ValueError(f"level must be one of {LEVELS}, not {level!r}")
+    labels = normalize_locations(counts.index.to_series())[level].to_numpy()
+    keep = pd.notna(labels)
+    grouped = pd.Series(counts.to_numpy()[keep], index=labels[keep]).groupby(level=0, sort=False).sum()
+    return grouped.sort_values(ascending=False, kind="stable").rename(counts.name)
@@ -0,0 +1,262 @@
+"""
+pipeline.py
+Runs the analysis scripts as a dependency graph.
+
+Each stage is one script, with the files it reads and writes declared in
+STAGES. A stage that reads another stage's output runs after it; stages
+that don't depend on each other run at the same time, each in its own
+Python process (at most `workers` at once).
+
+A stage is skipped if its script, its inputs and its outputs are all
+unchanged since its last successful run (content hashes, see
+dataset_cache.fingerprint). The hashes are kept in
+./.dataset_cache/pipeline.json.
+
+run() yields events as they happen, so a caller (the dashboard, or the CLI
+below) can show progress and logs live:
+    ("start", stage, None)
+    ("log", stage, line)
+    ("skip", stage, reason)
+    ("done", stage, {"ok": bool, "seconds": float, "returncode": int, "trace": dict or None})
+
+Every stage of one run() gets the same JOB_MARKET_RUN_ID, so their
+per-step trace files (see instrumentation.py) can be told apart from other
+runs; "trace" is the stage's trace, if it wrote one.
+
+Run: python pipeline.py [stage ...] [--workers N] [--force]
+"""
+
+import argparse
+import json
+import os
+import queue
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+from batch_forecast import FORECASTS_FILE
+from dataset_cache import CACHE_DIR, DATA_DIR, data_path, fingerprint
+from instrumentation import load_trace, new_run_id, trace_path
+
+# Files each script reads and writes (names relative to the data directory,
+# dataset_cache.DATA_DIR: the repo unless JOB_MARKET_DATA_DIR is set), and
+# "code_inputs": files shipped next to the scripts (e.g. locations.GAZETTEER_FILE);
+# figures are saved to graphs/ because stages run headless (see plotting.py)
+STAGES = {
+    "clean_linkedin": {
+        "inputs": ["linkedin_no_skills.csv"],
+        "outputs": ["linkedin_no_skills_cleaned.csv"],
+    },
+    "clean_skills_plot": {
+        "inputs": ["indeed_webscrape.csv", "linkedin_historical.csv"],
+        "outputs": ["indeed_webscrape_cleaned.csv", "linkedin_historical_cleaned.csv",
+                    "graphs/TopSkillsIndeedJobPostings.png", "graphs/TopSkillsLinkedInJobPostings.png"],
+    },
+    "most_common_job_titles": {
+        "inputs": ["indeed_webscrape.csv", "linkedin_historical.csv", "linkedin_no_skills.csv"],
+        "outputs": ["graphs/Top10JobTitles.png"],
+    },
+    "skill_demand_evolution": {
+        "inputs": ["indeed_webscrape_cleaned.csv", "linkedin_historical_cleaned.csv"],
+        "outputs": ["skill_demand_trends.csv", "top_rising_skills.csv", "graphs/Top10EmergingSkills.png"],
+    },
+    "top_hiring_companies": {
+        "inputs": ["indeed_webscrape.csv", "linkedin_historical.csv", "linkedin_no_skills.csv"],
+        "outputs": ["graphs/Top10HiringCompanies.png"],
+    },
+    "top_hiring_locations": {
+        "inputs": ["indeed_webscrape.csv", "linkedin_historical.csv", "linkedin_no_skills.csv"],
+        "code_inputs": ["gazetteer.csv"],
+        "outputs": ["graphs/Top10HiringLocations.png"],
+    },
+    "hiring_trends_overtime": {
+        "inputs": ["linkedin_no_skills_cleaned.csv"],
+        "outputs": ["graphs/LinkedInJobPostingsOverTime.png"],
+    },
+    "forecast_job_postings": {
+        "inputs": ["linkedin_no_skills_cleaned.csv"],
+        "outputs": ["arima_job_postings.csv", "graphs/HistoricalJobPostings.png",
+                    "graphs/PredictedJobPostings6Months.png"],
+    },
+    "batch_forecast": {
+        "inputs": ["linkedin_no_skills_cleaned.csv"],
+        "outputs": [FORECASTS_FILE],
+    },
+}
+
+STATE_FILE = CACHE_DIR / "pipeline.json"
+SCRIPTS_DIR = Path(__file__).parent
+DEFAULT_TIMEOUT = 300
+
+
+def script_path(stage):
+    return SCRIPTS_DIR / f"{stage}.py"
+
+
+def dependencies(stage) -> set:
+    """Stages whose outputs `stage` reads."""
+    inputs = set(STAGES[stage]["inputs"])
+    return {other for other, spec in STAGES.items() if other != stage and inputs & set(spec["outputs"])}
+
+
+def with_dependencies(stages) -> list:
+    """`stages` plus everything upstream of them, in STAGES order."""
+    needed, todo = set(), list(stages)
+    while todo:
+        stage = todo.pop()
+        if stage not in needed:
+            needed.add(stage)
+            todo.extend(dependencies(stage))
+    return [stage for stage in STAGES if stage in needed]
+
+
+def load_state() -> dict:
+    try:
+        with open(STATE_FILE) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_state(state):
+    CACHE_DIR.mkdir(exist_ok=True)
+    tmp = STATE_FILE.with_suffix(f".{os.getpid()}.tmp")
+    with open(tmp, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp, STATE_FILE)
+
+
+def stage_fingerprints(stage, previous: dict) -> dict:
+    """Fingerprint of the script and every declared file (None for missing files)."""
+    script = script_path(stage)
+    files = {script.name: script}
+    files.update((name, SCRIPTS_DIR / name) for name in STAGES[stage].get("code_inputs", []))
+    files.update((name, data_path(name)) for name in STAGES[stage]["inputs"] + STAGES[stage]["outputs"])
+    fps = {}
+    for name, path in files.items():
+        fps[name] = fingerprint(path, previous.get(name)) if path.exists() else None
+    return fps
+
+
+def _unchanged(old: dict, new: dict) -> bool:
+    """Same content, ignoring mtime-only changes."""
+    if not old or old.keys() != new.keys():
+        return False
+    return all((old[n] and old[n]["hash"]) == (new[n] and new[n]["hash"]) for n in new)
+
+
+def _run_stage(stage, events, timeout, run_id):
+    """Run one script in its own process, forwarding its output line by line."""
+    start = time.perf_counter()
+    events.put(("start", stage, None))
+    env = dict(os.environ, MPLBACKEND="Agg", PYTHONUNBUFFERED="1", JOB_MARKET_RUN_ID=run_id)
+    proc = subprocess.Popen(
+        [sys.executable, str(script_path(stage))], cwd=DATA_DIR, env=env,
+        stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True,
+    )
+    timer = threading.Timer(timeout, proc.kill)
+    timer.start()
+    try:
+        for line in proc.stdout:
+            events.put(("log", stage, line.rstrip("\n")))
+        returncode = proc.wait()
+    finally:
+        timer.cancel()
+    if returncode < 0:
+        events.put(("log", stage, f"killed (signal {-returncode}; timeout is {timeout}s)"))
+    seconds = time.perf_counter() - start
+    try:
+        trace = load_trace(trace_path(stage, run_id))
+    except (OSError, ValueError):
+        trace = None
+    events.put(("done", stage, {"ok": returncode == 0, "seconds": seconds, "returncode": returncode,
+                                "trace": trace}))
+
+
+def run(stages=None, workers=None, force=False, timeout=DEFAULT_TIMEOUT):
+    """
+    Run `stages` (default: all) and the stages they depend on, yielding
+    events as they happen. A stage starts once all its dependencies have
+    finished; it is skipped if one of them failed, or (unless force=True)
+    if nothing it touches changed since its last successful run.
+    """
+    stages = with_dependencies(stages if stages is not None else STAGES)
+    workers = workers or os.cpu_count() or 1
+    state = load_state()
+    events = queue.Queue()
+    pending = {stage: dependencies(stage) & set(stages) for stage in stages}
+    failed, running = set(), {}
+    run_id = new_run_id()
+
+    while pending or running:
+        # Start (or skip) every stage whose dependencies have all finished
+        for stage in [s for s, deps in pending.items() if not deps]:
+            if len(running) >= workers:
+                break
+            del pending[stage]
+            previous = state.get(stage, {})
+            fps = stage_fingerprints(stage, previous.get("files", {}))
+            if failed & dependencies(stage):
+                failed.add(stage)
+                events.put(("skip", stage, "a dependency failed"))
+            elif not force and previous.get("ok") and _unchanged(previous.get("files"), fps):
+                events.put(("skip", stage, "unchanged since last run"))
+            else:
+                thread = threading.Thread(target=_run_stage, args=(stage, events, timeout, run_id), daemon=True)
+                running[stage] = thread
+                thread.start()
+                continue
+            _finish(stage, pending)
+
+        event = events.get()
+        yield event
+        kind, stage, info = event
+        if kind == "done":
+            running.pop(stage).join()
+            if info["ok"]:
+                state[stage] = {"ok": True, "files": stage_fingerprints(stage, {})}
+                save_state(state)
+            else:
+                failed.add(stage)
+                state.pop(stage, None)
+                save_state(state)
+            _finish(stage, pending)
+
+    # Skip events queued after the last stage finished
+    while not events.empty():
+        yield events.get()
+
+
+def _finish(stage, pending):
+    for deps in pending.values():
+        deps.discard(stage)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the analysis scripts in dependency order")
+    parser.add_argument("stages", nargs="*", help=f"default: all of {', '.join(STAGES)}")
+    parser.add_argument("--workers", type=int, default=None, help="stages run at once (default: CPU count)")
+    parser.add_argument("--force", action="store_true", help="run stages even if nothing changed")
+    parser.add_argument("--timeout", type=int, default=DEFAULT_TIMEOUT, help="seconds per stage")
+    args = parser.parse_args()
+    unknown = set(args.stages) - set(STAGES)
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(sorted(unknown))}")
+
+    ok = True
+    for kind, stage, info in run(args.stages or None, args.workers, args.force, args.timeout):
+        if kind == "start":
+            print(f"[{stage}] started")
+        elif kind == "log":
+            print(f"[{stage}] {info}")
+        elif kind == "skip":
+            print(f"[{stage}] skipped: {info}")
+        else:
+            ok = ok and info["ok"]
+            steps = [s for s in (info["trace"] or {}).get("steps", []) if s["parent"] is None]
+            breakdown = ", ".join(f"{s['step']} {s['seconds']:.1f}s" for s in steps)
+            print(f"[{stage}] {'finished' if info['ok'] else 'FAILED'} in {info['seconds']:.1f}s"
+                  + (f" ({breakdown})" if breakdown else ""))
+    sys.exit(0 if ok else 1)
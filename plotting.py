@@ -0,0 +1,150 @@
+"""
+plotting.py
+Shows the analysis scripts' figures, or saves them to ./graphs/ when headless.
+
+Each script wraps its plotting code in a function of the data it plots and
+calls show(name, data, draw) instead of plt.show():
+
+- Interactive (a GUI matplotlib backend): draw(data), then plt.show().
+- Headless (a non-interactive backend such as Agg, which pipeline.py and the
+  dashboard use, or GRAPHS_HEADLESS=1): draw(data) is saved to
+  graphs/<name>.png, the file name DashBoard.py lists.
+
+Headless figures are only redrawn when the plotted data or the draw function
+changed: a hash of both is kept per figure in ./.dataset_cache/graphs.json
+and the PNG is left alone if it matches. show_all() renders several figures
+of one script, the stale ones in parallel worker processes.
+"""
+
+import hashlib
+import json
+import marshal
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+
+if os.environ.get("GRAPHS_HEADLESS") == "1":
+    matplotlib.use("Agg")
+
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+
+from dataset_cache import CACHE_DIR, DATA_DIR
+
+GRAPHS_DIR = DATA_DIR / "graphs"
+MANIFEST_FILE = CACHE_DIR / "graphs.json"
+NON_INTERACTIVE_BACKENDS = {"agg", "cairo", "pdf", "pgf", "ps", "svg", "template"}
+
+
+def is_headless() -> bool:
+    return matplotlib.get_backend().lower() in NON_INTERACTIVE_BACKENDS
+
+
+def graph_path(name):
+    return GRAPHS_DIR / f"{name}.png"
+
+
+def _update(h, data):
+    """Feed the content of `data` (pandas objects, arrays, tuples/lists/dicts of them, scalars) to h."""
+    if isinstance(data, (pd.Series, pd.DataFrame, pd.Index)):
+        h.update(repr((type(data).__name__, getattr(data, "name", None), data.shape)).encode())
+        if isinstance(data, pd.DataFrame):
+            h.update(repr([list(data.columns), [str(t) for t in data.dtypes]]).encode())
+            data = data.reset_index()
+        h.update(pd.util.hash_pandas_object(data, index=not isinstance(data, pd.Index)).to_numpy().tobytes())
+    elif isinstance(data, np.ndarray):
+        h.update(repr((data.dtype.str, data.shape)).encode())
+        h.update(np.ascontiguousarray(data).tobytes() if data.dtype != object else repr(data.tolist()).encode())
+    elif isinstance(data, (list, tuple)):
+        h.update(f"{type(data).__name__}{len(data)}".encode())
+        for item in data:
+            _update(h, item)
+    elif isinstance(data, dict):
+        for key in sorted(data, key=repr):
+            h.update(repr(key).encode())
+            _update(h, data[key])
+    else:
+        h.update(repr(data).encode())
+
+
+def figure_hash(data, draw) -> str:
+    """Hash of the plotted data plus the code that plots it."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(marshal.dumps(draw.__code__))
+    _update(h, data)
+    return h.hexdigest()
+
+
+def _load_manifest() -> dict:
+    try:
+        with open(MANIFEST_FILE) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_manifest(hashes: dict):
+    # Re-read first: other scripts may have rendered their figures meanwhile
+    manifest = _load_manifest()
+    manifest.update(hashes)
+    CACHE_DIR.mkdir(exist_ok=True)
+    tmp = MANIFEST_FILE.with_suffix(f".{os.getpid()}.tmp")
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp, MANIFEST_FILE)
+
+
+def _render(name, data, draw):
+    """draw(data) and save the current figure as graphs/<name>.png."""
+    matplotlib.use("Agg")
+    draw(data)
+    GRAPHS_DIR.mkdir(exist_ok=True)
+    path = graph_path(name)
+    tmp = path.with_name(f".{path.stem}.{os.getpid()}.png")
+    plt.gcf().savefig(tmp)
+    plt.close("all")
+    os.replace(tmp, path)
+    return path
+
+
+def show_all(figures, workers=None):
+    """
+    figures: list of (name, data, draw). Interactive: draw and show each one.
+    Headless: save the figures whose data/code changed, in parallel.
+    """
+    if not is_headless():
+        for _, data, draw in figures:
+            draw(data)
+            plt.show()
+        return
+
+    manifest = _load_manifest()
+    stale = {}
+    for name, data, draw in figures:
+        key = figure_hash(data, draw)
+        if manifest.get(name) != key or not graph_path(name).exists():
+            stale[name] = (key, data, draw)
+    if not stale:
+        return
+
+    # Worker processes are forked so that draw functions defined in the
+    # running script are available to them without re-running the script
+    can_fork = "fork" in multiprocessing.get_all_start_methods()
+    if len(stale) > 1 and can_fork and workers != 1:
+        with ProcessPoolExecutor(max_workers=workers or min(len(stale), os.cpu_count() or 1),
+                                 mp_context=multiprocessing.get_context("fork")) as pool:
+            futures = [pool.submit(_render, name, data, draw) for name, (_, data, draw) in stale.items()]
+            for future in futures:
+                future.result()
+    else:
+        for name, (_, data, draw) in stale.items():
+            _render(name, data, draw)
+    _save_manifest({name: key for name, (key, _, _) in stale.items()})
+
+
+def show(name, data, draw):
+    """show_all() for a single figure."""
+    show_all([(name, data, draw)])
@@ -0,0 +1,51 @@
+"""
+posting_urls.py
+Canonical keys for the job-posting links of the Indeed scrape.
+
+A job_title-href is the link of one impression of a posting:
+/rc/clk?jk=<job key>&from=serp&..., /viewjob?jk=..., or for sponsored
+postings /pagead/clk?mo=r&ad=<ad token>&xkcb=...&camk=...&p=12&fvj=0&vjs=3.
+The tracking parameters (xkcb, camk, p, fvj, vjs, ...) change from one
+impression to the next, so a repeat scrape lists the same posting under a
+new link.
+
+canonical_url() reduces a link to what identifies the posting:
+- "jk:<job key>" when it has a jk= (or vjk=) parameter, whatever the host
+  or path;
+- "ad:<ad token>" for a sponsored link's ad= parameter;
+- otherwise the URL without its query string and fragment.
+
+posting_keys() hashes those to uint64 keys (pd.util.hash_array), which
+clean_skills_plot.py groups and deduplicates the postings by. A scrape
+lists each link once per skill, so each distinct link is canonicalized
+once. (The links are ~1 KB; splitting the query string beats a regex
+search through it.)
+"""
+
+import numpy as np
+import pandas as pd
+
+# Query parameters that identify a posting, tried in order, and the prefix
+# of the canonical key they give (vjk= on search pages is the same job key)
+ID_PARAMS = [("jk", "jk"), ("vjk", "jk"), ("ad", "ad")]
+
+
+def canonical_url(href: str) -> str:
+    """The canonical form of a link (see the module docstring)."""
+    path, _, query = href.partition("#")[0].partition("?")
+    values = {}
+    for pair in query.split("&"):
+        name, _, value = pair.partition("=")
+        if value:
+            values.setdefault(name, value)
+    for param, prefix in ID_PARAMS:
+        if param in values:
+            return f"{prefix}:{values[param]}"
+    return path
+
+
+def posting_keys(hrefs: pd.Series) -> np.ndarray:
+    """uint64 key of each link's posting (links must not be missing)."""
+    codes, links = pd.factorize(hrefs)
+    canonical = np.array([canonical_url(link) for link in np.asarray(links, dtype=object)], dtype=object)
+    return pd.util.hash_array(canonical)[codes]
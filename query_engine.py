@@ -0,0 +1,202 @@
+"""
+query_engine.py
+Structured, indexed queries over a loaded dataset (the dashboard's
+"Quick custom query").
+
+A query is a list of filters, each a (column, op, value) triple, plus
+optional free-text search terms; all of them must match. The ops are
+
+    ==  !=  contains  not contains  startswith
+
+and every comparison is case-insensitive. Nothing the user types is
+evaluated as code: parse_query() only splits "column op value" clauses
+(joined by ";", except inside a quoted value: company == 'A; B'), and a
+clause without an op is a search term that matches if any indexed column
+contains it.
+
+QueryEngine is built once per loaded frame and keeps inverted indexes
+(distinct value -> sorted row ids) on the location, company and title
+columns, and on the individual skills of the comma-separated job_skills
+column (a skills filter matches a row if any of its skills matches). A
+filter on an indexed column is matched against the distinct values only,
+a few hundred strings instead of every row, and the row ids of the matching
+values are merged; filters are combined by intersecting row ids. Other
+columns are scanned with vectorized string methods. Only the requested page
+of rows is taken out of the frame.
+
+    engine = QueryEngine(load_dataset("linkedin_historical.csv"))
+    filters, search = parse_query("location contains Bengaluru; skills == python")
+    page = engine.query(filters, search, page=0)   # page.rows, page.total, page.pages
+"""
+
+import re
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from skill_tokenizer import tokenize
+
+INDEXED_COLUMNS = ["job_location", "company", "job_title"]
+SKILL_COLUMN = "job_skills"
+PAGE_SIZE = 50
+
+# Short names accepted in queries
+COLUMN_ALIASES = {
+    "location": "job_location", "title": "job_title", "skill": "job_skills", "skills": "job_skills",
+    "link": "job_link", "summary": "job_summary",
+}
+OPS = ["==", "!=", "contains", "not contains", "startswith"]
+NEGATED = {"!=": "==", "not contains": "contains"}
+
+# "location contains Bengaluru", "company == 'Google'"; longer ops first so
+# "not contains" isn't read as a value starting with "not"
+CLAUSE_RE = re.compile(
+    r"^\s*(\w+)\s+(" + "|".join(re.escape(op) for op in sorted(OPS, key=len, reverse=True)) + r"|=)\s+(.+?)\s*$",
+    re.IGNORECASE,
+)
+# A clause runs to the next ";" outside quotes; a quote only opens at the
+# start of a word, so the apostrophe of "McDonald's" is just a character
+CLAUSE_SPLIT_RE = re.compile(r"""(?:(?<!\S)'[^']*'|(?<!\S)"[^"]*"|[^;])+""")
+
+Filter = namedtuple("Filter", ["column", "op", "value"])
+Page = namedtuple("Page", ["rows", "total", "page", "pages"])
+
+
+def _unquote(value):
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in "'\"":
+        return value[1:-1]
+    return value
+
+
+def parse_query(text):
+    """
+    Split query text into (filters, search terms). Clauses are separated by
+    ";" (outside quotes); "column op value" is a filter, anything else a
+    search term.
+    """
+    filters, search = [], []
+    for clause in CLAUSE_SPLIT_RE.findall(text):
+        clause = clause.strip()
+        if not clause:
+            continue
+        match = CLAUSE_RE.match(clause)
+        if match:
+            column, op, value = match.groups()
+            op = "==" if op == "=" else op.lower()
+            filters.append(Filter(column, op, _unquote(value)))
+        else:
+            search.append(_unquote(clause))
+    return filters, search
+
+
+def _matches(labels: pd.Series, op, value) -> np.ndarray:
+    """Boolean mask of the string labels that `op value` selects, ignoring case."""
+    value = value.lower()
+    if op == "==":
+        result = labels.str.lower() == value
+    elif op == "contains":
+        result = labels.str.contains(value, case=False, regex=False)
+    elif op == "startswith":
+        result = labels.str.lower().str.startswith(value)
+    else:
+        raise ValueError(f"op must be one of {OPS}, not {op!r}")
+    return result.fillna(False).to_numpy(dtype=bool)
+
+
+class InvertedIndex:
+    """Distinct labels of a column and the sorted ids of the rows holding each."""
+
+    def __init__(self, codes, labels, rows, n_rows):
+        # codes[i] is the label id of row rows[i] (-1: missing)
+        keep = codes >= 0
+        codes, rows = codes[keep], rows[keep]
+        order = np.argsort(codes, kind="stable")
+        self.rows = rows[order]
+        self.offsets = np.concatenate([[0], np.cumsum(np.bincount(codes, minlength=len(labels)))])
+        self.labels = pd.Series(labels, dtype=object)
+        self.n_rows = n_rows
+
+    @classmethod
+    def from_column(cls, values: pd.Series) -> "InvertedIndex":
+        codes, uniques = pd.factorize(values)
+        return cls(codes, uniques, np.arange(len(codes)), len(codes))
+
+    @classmethod
+    def from_skills(cls, values: pd.Series) -> "InvertedIndex":
+        """One entry per skill of each row of a comma-separated column."""
+        present = values.notna().to_numpy()
+        per_row = values[present].astype(str).str.count(",").to_numpy() + 1
+        codes, labels = tokenize(values)
+        rows = np.repeat(np.flatnonzero(present), per_row)
+        return cls(codes, labels, rows, len(values))
+
+    def lookup(self, op, value) -> np.ndarray:
+        """Sorted ids of the rows holding a label that `op value` selects."""
+        codes = np.flatnonzero(_matches(self.labels, op, value))
+        if len(codes) == 1:
+            return self.rows[self.offsets[codes[0]]:self.offsets[codes[0] + 1]]
+        # Several labels: mark their rows (a row can hold more than one skill)
+        hit = np.zeros(self.n_rows, dtype=bool)
+        for code in codes:
+            hit[self.rows[self.offsets[code]:self.offsets[code + 1]]] = True
+        return np.flatnonzero(hit)
+
+
+class QueryEngine:
+    def __init__(self, frame: pd.DataFrame):
+        """`frame` is shared, not copied; it must not be modified afterwards."""
+        self.frame = frame
+        self.n_rows = len(frame)
+        self.indexes = {column: InvertedIndex.from_column(frame[column])
+                        for column in INDEXED_COLUMNS if column in frame.columns}
+        if SKILL_COLUMN in frame.columns:
+            self.indexes[SKILL_COLUMN] = InvertedIndex.from_skills(frame[SKILL_COLUMN])
+
+    def column(self, name):
+        """The frame column a query names (directly or by its short alias)."""
+        column = COLUMN_ALIASES.get(name.lower(), name)
+        if column not in self.frame.columns:
+            raise ValueError(f"unknown column {name!r}; columns are {list(self.frame.columns)}")
+        return column
+
+    def rows(self, flt: Filter) -> np.ndarray:
+        """Sorted ids of the rows one filter selects."""
+        column = self.column(flt.column)
+        op = NEGATED.get(flt.op, flt.op)
+        if op not in OPS:
+            raise ValueError(f"op must be one of {OPS}, not {flt.op!r}")
+        if column in self.indexes:
+            ids = self.indexes[column].lookup(op, flt.value)
+        else:
+            values = self.frame[column]
+            if not pd.api.types.is_string_dtype(values.dtype):
+                values = values.astype(str).where(values.notna())
+            ids = np.flatnonzero(_matches(values, op, flt.value))
+        if flt.op in NEGATED:
+            ids = np.setdiff1d(np.arange(self.n_rows), ids, assume_unique=True)
+        return ids
+
+    def search(self, term) -> np.ndarray:
+        """Sorted ids of the rows with `term` in any indexed column."""
+        hit = np.zeros(self.n_rows, dtype=bool)
+        for index in self.indexes.values():
+            hit[index.lookup("contains", term)] = True
+        return np.flatnonzero(hit)
+
+    def query(self, filters=(), search=(), page=0, page_size=PAGE_SIZE) -> Page:
+        """Page `page` (0-based) of the rows matching every filter and search term."""
+        ids = None
+        for selected in [self.rows(f) for f in filters] + [self.search(t) for t in search]:
+            if ids is None:
+                ids = selected
+            else:
+                hit = np.zeros(self.n_rows, dtype=bool)
+                hit[selected] = True
+                ids = ids[hit[ids]]
+        if ids is None:
+            ids = np.arange(self.n_rows)
+        pages = max(1, -(-len(ids) // page_size))
+        page = min(max(page, 0), pages - 1)
+        rows = self.frame.take(ids[page * page_size:(page + 1) * page_size])
+        return Page(rows, len(ids), page, pages)
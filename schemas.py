@@ -0,0 +1,156 @@
+"""
+schemas.py
+Column types of the datasets, applied whenever one of them is read.
+
+Without a schema pd.read_csv infers every column, and every text column
+ends up a generic string column. Here each known column gets a kind:
+
+- "category": low-cardinality labels (companies, locations, titles), stored
+  as integer codes plus one copy of each distinct value;
+- "string": free text and URLs, as pyarrow-backed strings (missing values
+  are NaN, as with plain object columns);
+- "date": ISO-8601 dates, parsed with parse_dates().
+
+Columns a schema doesn't list are inferred as before. Numeric columns are
+left to inference, so an integer column is still written back as integers
+(the streaming reader of clean_linkedin.py unifies their dtype across
+chunks). Files are matched by name, so a cleaned copy shares the schema of
+its source. A whole-file read of a file whose columns are all in its
+schema uses pyarrow's multithreaded CSV parser (nothing is left for it to
+infer, so the result is the same).
+
+    df = read_csv(data_path("linkedin_no_skills.csv"))
+    for chunk in read_csv(path, chunksize=100_000, categorical=False): ...
+"""
+
+import hashlib
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401  (read_csv engine="pyarrow")
+    HAVE_PYARROW = True
+except ImportError:
+    HAVE_PYARROW = False
+
+try:
+    STRING = pd.StringDtype("pyarrow", na_value=np.nan)
+except (TypeError, ImportError):
+    try:
+        STRING = pd.StringDtype("pyarrow_numpy")
+    except (TypeError, ImportError):
+        STRING = object
+
+DATE_FORMAT = "%Y-%m-%d"
+
+SCHEMAS = {
+    "indeed_webscrape.csv": {
+        "job_title": "category",
+        "job_title-href": "string",
+        "location": "category",
+        "skills": "string",
+        "company": "category",
+    },
+    "linkedin_historical.csv": {
+        "job_link": "string",
+        "job_title": "category",
+        "company": "category",
+        "job_location": "category",
+        "job_summary": "string",
+        "job_skills": "string",
+    },
+    "linkedin_no_skills.csv": {
+        "title": "category",
+        "company": "category",
+        "location": "category",
+        "context": "string",
+    },
+}
+SCHEMAS["indeed_webscrape_cleaned.csv"] = SCHEMAS["indeed_webscrape.csv"]
+SCHEMAS["linkedin_historical_cleaned.csv"] = SCHEMAS["linkedin_historical.csv"]
+SCHEMAS["linkedin_no_skills_cleaned.csv"] = {**SCHEMAS["linkedin_no_skills.csv"], "datePosted": "date"}
+
+
+def schema_for(name) -> dict:
+    """{column: kind} of a dataset file (by name or path); {} for unknown files."""
+    return SCHEMAS.get(Path(name).name, {})
+
+
+def schema_version(name) -> str:
+    """Changes whenever the schema of `name` (or the string dtype it maps to) does."""
+    spec = json.dumps([schema_for(name), str(STRING), DATE_FORMAT], sort_keys=True)
+    return hashlib.blake2b(spec.encode(), digest_size=8).hexdigest()
+
+
+def _dtype(kind, categorical):
+    if kind == "category":
+        return "category" if categorical else STRING
+    if kind in ("string", "date"):
+        return STRING
+    return kind
+
+
+def parse_dates(values: pd.Series) -> pd.Series:
+    """
+    Calendar dates of ISO-8601 strings ('2021-08-04', '2021-08-04T09:30:00-07:00', ...).
+
+    Each distinct value is parsed once. The date part is read with the exact
+    format DATE_FORMAT, so time of day and UTC offset are dropped and every
+    value keeps the date it was written with. Values that don't start with a
+    date go through pandas' per-element parser; unparseable ones are NaT.
+    """
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values
+    codes, uniques = pd.factorize(values)
+    text = pd.Series(uniques, dtype=STRING)
+    parsed = pd.to_datetime(text.str.slice(0, 10), format=DATE_FORMAT, errors="coerce")
+    slow = parsed.isna() & text.notna()
+    if slow.any():
+        fallback = [pd.to_datetime(v, errors="coerce") for v in text[slow]]
+        parsed[slow] = [v if v is pd.NaT else v.tz_localize(None).normalize() for v in fallback]
+    dates = parsed.to_numpy()
+    result = np.full(len(codes), np.datetime64("NaT"), dtype=dates.dtype)
+    result[codes >= 0] = dates[codes[codes >= 0]]
+    return pd.Series(result, index=values.index, name=values.name)
+
+
+def apply_schema(df: pd.DataFrame, schema: dict) -> pd.DataFrame:
+    """Parse the "date" columns of a frame read with the schema's dtypes (in place)."""
+    for column, kind in schema.items():
+        if kind == "date" and column in df.columns:
+            df[column] = parse_dates(df[column])
+    return df
+
+
+def _engine(path, schema, kwargs):
+    """"pyarrow" for a whole-file read of a file fully covered by `schema`, else the default."""
+    if not HAVE_PYARROW or kwargs or not isinstance(path, (str, Path)):
+        return None
+    header = pd.read_csv(path, nrows=0).columns
+    return "pyarrow" if all(column in schema for column in header) else None
+
+
+def read_csv(path, columns=None, categorical=True, schema=None, **kwargs):
+    """
+    pd.read_csv with the schema of `path` (or `schema`, e.g. for a buffer).
+
+    columns: only read these columns. categorical=False reads "category"
+    columns as strings, for frames that are appended to or mutated (new
+    values would need new categories). An explicit dtype= overrides the
+    schema per column. With chunksize=, returns an iterator of typed chunks.
+    """
+    schema = schema_for(path) if schema is None else schema
+    dtype = kwargs.pop("dtype", None) or {}
+    engine = _engine(path, schema, kwargs)
+    if columns is not None:
+        schema = {c: k for c, k in schema.items() if c in columns}
+    dtype = {**{c: _dtype(k, categorical) for c, k in schema.items()}, **dtype}
+    if engine:
+        kwargs["engine"] = engine
+    result = pd.read_csv(path, usecols=columns, dtype=dtype, **kwargs)
+    if kwargs.get("chunksize") or kwargs.get("iterator"):
+        return (apply_schema(chunk, schema) for chunk in result)
+    return apply_schema(result, schema)
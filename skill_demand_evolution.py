@@ -1,28 +1,35 @@
 import pandas as pd
 import matplotlib.pyplot as plt
+from plotting import show
+import sql_backend
+from dataset_cache import data_path
+from instrumentation import step
+from skill_index import load_skill_index
 
-# Step 1: Load cleaned datasets
-indeed_data = pd.read_csv("job-market-analysis/indeed_webscrape_cleaned.csv")
-linkedin_data = pd.read_csv("job-market-analysis/linkedin_historical_cleaned.csv")
+# Step 1: The skill column of each cleaned dataset. Its skills are counted from
+# the skill index (tokenized once by clean_skills_plot.py, see skill_index.py),
+# or with ANALYSIS_BACKEND=duckdb by a SQL query on the file (see sql_backend.py)
+indeed_source = ("indeed_webscrape_cleaned.csv", 'skills')
+linkedin_source = ("linkedin_historical_cleaned.csv", 'job_skills')
 
 # Step 2: Define a list of terms or patterns to exclude (e.g., company names, locations, etc.)
 exclude_terms = ['inc.', 'labs', 'corp', 'company', 'university', 'research', 'technologies', 'manager', 'director']
 
 # Step 3: Clean the skills data
-def extract_skills(skill_column):
-    """Splits comma-separated skill strings into a list of individual skills and filters out unwanted terms."""
-    all_skills = []
-    for skills in skill_column.dropna():
-        # Split skills and clean them
-        skill_list = [skill.strip().lower() for skill in skills.split(',')]
-        # Filter out unwanted terms (e.g., company names, generic terms)
-        filtered_skills = [skill for skill in skill_list if not any(exclude_term in skill for exclude_term in exclude_terms)]
-        all_skills.extend(filtered_skills)
-    return pd.Series(all_skills).value_counts()
+def extract_skills(source, normalize=True):
+    """
+    Counts the individual skills of a (file, column) source, filtering out unwanted terms.
+    normalize=True also strips '(required)' / 'matching qualification' from every
+    skill before counting (see skill_tokenizer.py).
+    """
+    if sql_backend.use_sql():
+        return sql_backend.skill_counts(*source, exclude_terms, normalize=normalize)
+    return load_skill_index(*source).counts(exclude_terms, normalize=normalize)
 
 # Compute skill frequencies for Indeed and LinkedIn data
-indeed_skill_counts = extract_skills(indeed_data['skills'])
-linkedin_skill_counts = extract_skills(linkedin_data['job_skills'])
+with step("extract skills"):
+    indeed_skill_counts = extract_skills(indeed_source)
+    linkedin_skill_counts = extract_skills(linkedin_source)
 
 # Step 4: Merge skill frequencies into a single DataFrame
 skill_trends = pd.DataFrame({
@@ -37,22 +44,22 @@ skill_trends['% Change'] = ((skill_trends['Indeed (Recent)'] - skill_trends['Lin
 # Step 6: Identify rising skills based on the change percentage
 rising_skills = skill_trends.sort_values('% Change', ascending=False).head(10)
 
-# Remove '(required)' from skill labels
-rising_skills.index = rising_skills.index.str.replace(r'\s*\(required\)', '', regex=True).str.strip()
-rising_skills.index = rising_skills.index.str.replace(r'\s*matching qualification', '', regex=True).str.strip()
-
-
 # Step 7: Plot skill trends (only rising skills)
-plt.figure(figsize=(14, 8))  # Increased height for better spacing
-plt.yticks(fontsize=8)  # Reduce font size of y-axis labels
-plt.barh(rising_skills.index, rising_skills['% Change'], color='green')
-plt.xlabel('% Change in Demand')
-plt.title('Top 10 Emerging Skills')
-plt.gca().invert_yaxis()
-plt.show()
+def plot_rising(change):
+    plt.figure(figsize=(14, 8))  # Increased height for better spacing
+    plt.yticks(fontsize=8)  # Reduce font size of y-axis labels
+    plt.barh(change.index, change, color='green')
+    plt.xlabel('% Change in Demand')
+    plt.title('Top 10 Emerging Skills')
+    plt.gca().invert_yaxis()
+
+# Shown, or saved as graphs/Top10EmergingSkills.png when headless (see plotting.py)
+with step("plot"):
+    show("Top10EmergingSkills", rising_skills['% Change'], plot_rising)
 
 # Save results
-skill_trends.to_csv("job-market-analysis/skill_demand_trends.csv")
-rising_skills.to_csv("job-market-analysis/top_rising_skills.csv")
+with step("save", rows_in=len(skill_trends)):
+    skill_trends.to_csv(data_path("skill_demand_trends.csv"))
+    rising_skills.to_csv(data_path("top_rising_skills.csv"))
 
 print("Skill demand evolution analysis completed! Results saved as CSV files.")
@@ -0,0 +1,148 @@
+"""
+skill_index.py
+Persistent skill vocabulary and posting x skill matrix per dataset.
+
+A skill column (comma-separated skills per posting) is tokenized once into:
+- a vocabulary: skill text -> integer id (stripped, lowercased, in order of
+  first appearance), and
+- a CSR matrix with one row per posting and one column per skill id.
+
+Both are stored under ./.skill_index/ as .npy files and memory-mapped on
+load. They are rebuilt only when the source CSV's content changes. Skill
+frequency counts (skill_demand_evolution.py) and the top TF-IDF terms
+(clean_skills_plot.py) are both computed from this index, without
+re-tokenizing the text.
+"""
+
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.feature_extraction.text import TfidfTransformer, TfidfVectorizer
+
+from dataset_cache import DATA_DIR, data_path, fingerprint, load_dataset, replace_dir
+from skill_tokenizer import rank_skill_counts, tokenize
+
+INDEX_DIR = DATA_DIR / ".skill_index"
+
+
+class SkillIndex:
+    def __init__(self, vocab: pd.Index, matrix: sparse.csr_matrix):
+        self.vocab = vocab
+        self.matrix = matrix
+
+    @classmethod
+    def build(cls, skill_column: pd.Series) -> "SkillIndex":
+        """Tokenize a skill column (one entry per posting) into an index."""
+        codes, labels = tokenize(skill_column)
+        notna = skill_column.notna().to_numpy()
+        lengths = np.zeros(len(skill_column), dtype=np.int64)
+        lengths[notna] = skill_column[notna].astype(str).str.count(',').to_numpy() + 1
+        indptr = np.concatenate([[0], np.cumsum(lengths)])
+        data = np.ones(len(codes), dtype=np.int32)
+        matrix = sparse.csr_matrix((data, codes, indptr), shape=(len(skill_column), len(labels)))
+        matrix.sum_duplicates()
+        return cls(labels, matrix)
+
+    def save(self, directory, meta=None):
+        # Stages running at the same time may save the same index: each builds its own copy
+        tmp = directory.with_name(f"{directory.name}.{os.getpid()}.tmp")
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir(parents=True)
+        for part in ("data", "indices", "indptr"):
+            np.save(tmp / f"{part}.npy", getattr(self.matrix, part))
+        with open(tmp / "vocab.json", "w") as f:
+            json.dump(list(self.vocab), f)
+        if meta is not None:
+            with open(tmp / "meta.json", "w") as f:
+                json.dump(meta, f)
+        replace_dir(tmp, directory)
+
+    @classmethod
+    def load(cls, directory) -> "SkillIndex":
+        parts = {p: np.load(directory / f"{p}.npy", mmap_mode="r") for p in ("data", "indices", "indptr")}
+        with open(directory / "vocab.json") as f:
+            vocab = pd.Index(json.load(f))
+        matrix = sparse.csr_matrix(
+            (parts["data"], parts["indices"], parts["indptr"]),
+            shape=(len(parts["indptr"]) - 1, len(vocab)),
+            copy=False,
+        )
+        return cls(vocab, matrix)
+
+    def counts(self, exclude_terms=(), normalize=False) -> pd.Series:
+        """Skill frequencies, same result as skill_tokenizer.count_skills() on the source column."""
+        totals = np.bincount(self.matrix.indices, weights=self.matrix.data, minlength=len(self.vocab))
+        counts = pd.Series(totals.astype(np.int64), index=self.vocab)
+        return rank_skill_counts(counts, exclude_terms, normalize)
+
+    def word_matrix(self, stop_words='english'):
+        """
+        Posting x word count matrix, as CountVectorizer(stop_words=...) would
+        build from the raw skill text, and its (alphabetical) word list.
+
+        Each skill is tokenized into words once; since commas always end a
+        word, this gives the same counts as tokenizing whole postings.
+        """
+        analyzer = TfidfVectorizer(stop_words=stop_words).build_analyzer()
+        skill_words = [analyzer(label) for label in self.vocab]
+        words = sorted({w for ws in skill_words for w in ws})
+        word_ids = {w: i for i, w in enumerate(words)}
+        rows = np.repeat(np.arange(len(skill_words)), [len(ws) for ws in skill_words])
+        cols = np.array([word_ids[w] for ws in skill_words for w in ws], dtype=np.int64)
+        skill_to_word = sparse.csr_matrix(
+            (np.ones(len(cols), dtype=np.int64), (rows, cols)), shape=(len(self.vocab), len(words))
+        )
+        return (self.matrix.astype(np.int64) @ skill_to_word).tocsr(), np.array(words, dtype=object)
+
+    def top_tfidf(self, k=10, max_features=10, stop_words='english') -> pd.Series:
+        """
+        Terms with the highest sum of TF-IDF over all postings, highest first.
+
+        Matches TfidfVectorizer(stop_words=stop_words, max_features=max_features)
+        fitted on the source column, followed by .sum(axis=0) and a top-k argsort.
+        """
+        X, words = self.word_matrix(stop_words)
+        if max_features is not None and len(words) > max_features:
+            # Same selection as CountVectorizer._limit_features
+            tfs = np.asarray(X.sum(axis=0)).ravel()
+            kept = np.sort((-tfs).argsort()[:max_features])
+            X, words = X[:, kept], words[kept]
+        sums = TfidfTransformer().fit_transform(X).sum(axis=0).A1
+        top = sums.argsort()[-k:][::-1]
+        return pd.Series(sums[top], index=words[top], name="tfidf")
+
+
+def _index_dir(name, column):
+    path = data_path(name)
+    return INDEX_DIR / f"{path.stem}-{column}"
+
+
+def load_skill_index(name, column) -> SkillIndex:
+    """
+    Skill index of `column` in dataset `name`, from disk if it is up to date
+    with the CSV, otherwise built (and saved) now.
+    """
+    directory = _index_dir(name, column)
+    meta_file = directory / "meta.json"
+    try:
+        with open(meta_file) as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        meta = {}
+    fp = fingerprint(data_path(name), meta.get("source"))
+    if meta.get("source", {}).get("hash") == fp["hash"]:
+        if meta["source"] != fp:
+            meta["source"] = fp
+            tmp = meta_file.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp, "w") as f:
+                json.dump(meta, f)
+            os.replace(tmp, meta_file)
+        return SkillIndex.load(directory)
+
+    index = SkillIndex.build(load_dataset(name, columns=[column])[column])
+    index.save(directory, {"source": fp, "column": column})
+    return index
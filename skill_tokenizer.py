@@ -0,0 +1,77 @@
+"""
+skill_tokenizer.py
+Vectorized skill extraction for comma-separated skill columns.
+
+The column is split into one flat token array and factorized, so stripping,
+lowercasing, the exclusion check and label normalization run once per
+distinct token rather than once per token. Counts come out in the
+same order as pd.Series(tokens).value_counts() on the equivalent Python loop.
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+# Label clean-up for skills scraped from Indeed, e.g.
+# "matching qualificationREST (Required)" -> "rest"
+NORMALIZE_PATTERNS = [r'\s*\(required\)', r'\s*matching qualification']
+
+
+def exclusion_regex(exclude_terms):
+    """One compiled alternation matching any of the (literal) exclude terms."""
+    return re.compile("|".join(re.escape(term) for term in exclude_terms))
+
+
+def normalize_labels(labels: pd.Series) -> pd.Series:
+    """Drop '(required)' / 'matching qualification' from (lowercased) skill labels."""
+    for pattern in NORMALIZE_PATTERNS:
+        labels = labels.str.replace(pattern, '', regex=True).str.strip()
+    return labels
+
+
+def tokenize(skill_column: pd.Series):
+    """
+    Split a comma-separated skill column into tokens.
+
+    Returns (codes, labels): codes[i] is the token id of the i-th token
+    (in column order) and labels[id] is its stripped, lowercased text.
+    Distinct raw spellings that clean to the same text share one id.
+    """
+    values = skill_column.dropna().astype(str).tolist()
+    # Joining the rows and splitting once gives the same token sequence as
+    # splitting row by row, without building a list per row
+    raw = np.array(",".join(values).split(",") if values else [], dtype=object)
+    raw_codes, raw_uniques = pd.factorize(raw)
+    cleaned = pd.Series(raw_uniques, dtype=object).str.strip().str.lower()
+    # Re-number by cleaned text; factorize keeps first-appearance order
+    label_codes, labels = pd.factorize(cleaned.to_numpy())
+    return label_codes[raw_codes], pd.Index(labels)
+
+
+def count_skills(skill_column: pd.Series, exclude_terms=(), normalize=False) -> pd.Series:
+    """
+    Frequency of each skill in a comma-separated skill column, most common first.
+
+    Skills containing any of `exclude_terms` are dropped. With normalize=True
+    the NORMALIZE_PATTERNS clean-up is applied to every skill before counting
+    (so "rest (required)" and "rest" are counted together).
+    """
+    codes, labels = tokenize(skill_column)
+    counts = pd.Series(np.bincount(codes, minlength=len(labels)), index=labels)
+    return rank_skill_counts(counts, exclude_terms, normalize)
+
+
+def rank_skill_counts(counts: pd.Series, exclude_terms=(), normalize=False) -> pd.Series:
+    """
+    Apply the exclusion/normalization of count_skills() to per-token counts
+    (indexed by token label, in first-appearance order) and sort them.
+    """
+    labels = counts.index
+    if exclude_terms:
+        excluded = labels.str.contains(exclusion_regex(exclude_terms), regex=True)
+        counts = counts[~np.asarray(excluded, dtype=bool)]
+    if normalize:
+        counts = counts.groupby(normalize_labels(counts.index.to_series()).to_numpy(), sort=False).sum()
+    counts.index.name = None
+    return counts.sort_values(ascending=False, kind="stable").rename("count")
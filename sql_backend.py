@@ -0,0 +1,261 @@
+"""
+sql_backend.py
+Optional DuckDB backend: the analyses' aggregations as SQL queries run
+in-process on the dataset files.
+
+With ANALYSIS_BACKEND=duckdb in the environment (pipeline.py passes it on
+to the scripts it runs), these steps run as queries instead of pandas code
+over fully loaded frames:
+
+- job_aggregates.py: title / company / location counts over all sources;
+- clean_skills_plot.py: grouping the Indeed rows per posting;
+- skill_demand_evolution.py: skill frequencies;
+- hiring_trends_overtime.py: postings per month.
+
+Each query reads a dataset's Parquet copy (see dataset_cache.py) when an
+up-to-date one exists, otherwise the CSV itself, so a file bigger than
+memory is streamed rather than loaded. DuckDB scans in parallel on all
+cores, reads only the columns a query uses and pushes filters down into the
+scan. Results are returned as the same pandas objects as the pandas path.
+
+Ties are ordered by first appearance, like the pandas path, when the
+Parquet copy is read (it keeps the row order); when the CSV is scanned
+directly, ties are ordered by value. Grouping the Indeed rows needs the row
+order, so it builds the Parquet copy first. Dates are parsed in the ISO
+format of the schema only (schemas.DATE_FORMAT); other spellings that
+schemas.parse_dates() falls back on are not counted.
+
+Run: python sql_backend.py to check (and time) every query against the
+pandas path; tests/test_sql_backend.py runs the same comparisons under
+pytest.
+"""
+
+import argparse
+import os
+import time
+from functools import lru_cache
+
+import pandas as pd
+
+from dataset_cache import cached_parquet, data_path
+from posting_urls import ID_PARAMS
+from schemas import DATE_FORMAT
+from skill_tokenizer import NORMALIZE_PATTERNS
+
+try:
+    import duckdb
+    HAVE_DUCKDB = True
+except ImportError:
+    HAVE_DUCKDB = False
+
+BACKENDS = ["pandas", "duckdb"]
+BACKEND = os.environ.get("ANALYSIS_BACKEND", "pandas")
+
+# What pd.read_csv reads as missing, so a CSV scan sees the same nulls
+NA_VALUES = ["", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+             "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null"]
+
+PERIOD_UNITS = {"D": "day", "W": "week", "M": "month"}
+
+# Python's \s and str.strip() also cover Unicode spaces (e.g. the \xa0 in
+# "C#\xa0(Required)"); RE2's \s is ASCII only
+WHITESPACE = r"[\s\pZ\x{85}\x{1c}-\x{1f}]"
+STRIP_RE = f"^{WHITESPACE}+|{WHITESPACE}+$"
+
+
+def use_sql() -> bool:
+    """Whether ANALYSIS_BACKEND selects DuckDB (an error if it's unknown or DuckDB isn't installed)."""
+    if BACKEND not in BACKENDS:
+        raise ValueError(f"ANALYSIS_BACKEND must be one of {BACKENDS}, not {BACKEND!r}")
+    if BACKEND == "duckdb" and not HAVE_DUCKDB:
+        raise ImportError("ANALYSIS_BACKEND=duckdb needs the duckdb package (pip install duckdb)")
+    return BACKEND == "duckdb"
+
+
+@lru_cache(maxsize=1)
+def connection():
+    return duckdb.connect()
+
+
+def _literal(value) -> str:
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def _column(name) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def scan(name, ordered=False) -> str:
+    """
+    SQL table expression over dataset `name`, with an extra _row column:
+    the row's position in the file, or NULL when the CSV is scanned.
+    ordered=True builds the Parquet copy if needed, so _row is always set.
+    """
+    parquet_file = cached_parquet(name, build=ordered)
+    if parquet_file is not None:
+        return (f"(SELECT * EXCLUDE (file_row_number), file_row_number AS _row "
+                f"FROM read_parquet({_literal(parquet_file)}, file_row_number=true))")
+    if ordered:
+        raise RuntimeError(f"ordering the rows of {name} needs its Parquet copy (pip install pyarrow)")
+    na_values = "[" + ", ".join(_literal(v) for v in NA_VALUES) + "]"
+    return (f"(SELECT *, NULL::BIGINT AS _row FROM read_csv({_literal(data_path(name))}, header=true, "
+            f"all_varchar=true, nullstr={na_values}))")
+
+
+def aggregate_counts(sources: dict, dimensions) -> dict:
+    """job_aggregates.compute_aggregates(): one GROUP BY per dimension over all sources."""
+    scans = {source: scan(spec["file"]) for source, spec in sources.items()}
+    aggregates = {}
+    for dim in dimensions:
+        union = " UNION ALL ".join(
+            f"SELECT CAST({_column(spec[dim])} AS VARCHAR) AS value, {i} AS source, _row FROM {scans[source]}"
+            for i, (source, spec) in enumerate(sources.items())
+        )
+        counts = connection().sql(f"""
+            SELECT value, count(*) AS count FROM ({union}) WHERE value IS NOT NULL
+            GROUP BY value ORDER BY count DESC, min([source, coalesce(_row, 0)]), value
+        """).df()
+        aggregates[dim] = pd.Series(counts["count"].to_numpy(), index=pd.Index(counts["value"].to_numpy()),
+                                    name="count")
+    return aggregates
+
+
+def canonical_url(column) -> str:
+    """posting_urls.canonical_url() as a SQL expression."""
+    link = f"regexp_replace({column}, '#.*$', '')"
+    key = f"regexp_replace({column}, '[?#].*$', '')"
+    for param, prefix in reversed(ID_PARAMS):
+        value = f"nullif(regexp_extract({link}, '[?&]{param}=([^&]+)', 1), '')"
+        key = f"coalesce('{prefix}:' || {value}, {key})"
+    return key
+
+
+def group_indeed(name) -> pd.DataFrame:
+    """
+    clean_skills_plot.group_indeed(drop_blank_skills(...)): one row per
+    posting (canonical link, see posting_urls.py) with the link it was first
+    seen under, the first non-missing title, location and company, and its
+    distinct skills in order of appearance.
+    """
+    rows = scan(name, ordered=True)
+    return connection().sql(f"""
+        WITH postings AS (
+            SELECT {canonical_url('"job_title-href"')} AS posting, "job_title-href" AS href,
+                   job_title, location, company, skills, _row FROM {rows}
+            WHERE "job_title-href" IS NOT NULL AND regexp_replace(skills, '{STRIP_RE}', '', 'g') <> ''
+        ),
+        firsts AS (
+            SELECT posting, first(href ORDER BY _row) AS href,
+                   first(job_title ORDER BY _row) FILTER (WHERE job_title IS NOT NULL) AS job_title,
+                   first(location ORDER BY _row) FILTER (WHERE location IS NOT NULL) AS location,
+                   first(company ORDER BY _row) FILTER (WHERE company IS NOT NULL) AS company
+            FROM postings GROUP BY posting
+        ),
+        skills AS (
+            SELECT posting, string_agg(skills, ', ' ORDER BY first_row) AS skills
+            FROM (SELECT posting, skills, min(_row) AS first_row FROM postings GROUP BY posting, skills)
+            GROUP BY posting
+        )
+        SELECT href AS "job_title-href", CAST(job_title AS VARCHAR) AS job_title,
+               CAST(location AS VARCHAR) AS location, CAST(company AS VARCHAR) AS company, skills
+        FROM firsts JOIN skills USING (posting) ORDER BY href
+    """).df()
+
+
+def skill_counts(name, column, exclude_terms=(), normalize=False) -> pd.Series:
+    """skill_index.load_skill_index(name, column).counts(exclude_terms, normalize)."""
+    skills = f"string_split(CAST({_column(column)} AS VARCHAR), ',')"
+    # As skill_tokenizer: strip and lowercase, drop excluded skills, then normalize
+    label = "skill"
+    if normalize:
+        for pattern in NORMALIZE_PATTERNS:
+            pattern = _literal(pattern.replace(r"\s", WHITESPACE))
+            label = f"regexp_replace(regexp_replace({label}, {pattern}, '', 'g'), '{STRIP_RE}', '', 'g')"
+    excluded = " OR ".join(f"contains(skill, {_literal(term)})" for term in exclude_terms) or "false"
+    counts = connection().sql(f"""
+        WITH tokens AS (
+            SELECT unnest({skills}) AS token, generate_subscripts({skills}, 1) AS pos, _row
+            FROM {scan(name)} WHERE {_column(column)} IS NOT NULL
+        ),
+        labels AS (
+            SELECT lower(regexp_replace(token, '{STRIP_RE}', '', 'g')) AS skill, pos, _row FROM tokens
+        )
+        SELECT {label} AS skill, count(*) AS count FROM labels WHERE NOT ({excluded})
+        GROUP BY 1 ORDER BY count DESC, min([coalesce(_row, 0), pos]), 1
+    """).df()
+    return pd.Series(counts["count"].to_numpy(), index=pd.Index(counts["skill"].to_numpy()), name="count")
+
+
+def postings_per_period(name, date_column, freq="M") -> pd.Series:
+    """timeseries_store.load_store().query(freq): postings per day, week or month, empty periods included."""
+    if freq not in PERIOD_UNITS:
+        raise ValueError(f"freq must be one of {list(PERIOD_UNITS)}, not {freq!r}")
+    counts = connection().sql(f"""
+        SELECT date_trunc('{PERIOD_UNITS[freq]}', day) AS period, count(*) AS count
+        FROM (SELECT try_strptime(left(CAST({_column(date_column)} AS VARCHAR), 10), '{DATE_FORMAT}') AS day
+              FROM {scan(name)})
+        WHERE day IS NOT NULL GROUP BY 1
+    """).df()
+    index = pd.PeriodIndex(pd.to_datetime(counts["period"]), freq=freq)
+    series = pd.Series(counts["count"].to_numpy(dtype="int32"), index=index, name="all")
+    return series.reindex(pd.period_range(index.min(), index.max(), freq=freq), fill_value=0)
+
+
+def check_parity() -> list:
+    """(analysis, same result, pandas seconds, DuckDB seconds) for each query against its pandas path."""
+    from clean_skills_plot import INDEED_FILE, drop_blank_skills, group_indeed as pandas_group_indeed
+    from dataset_cache import load_dataset
+    from job_aggregates import DIMENSIONS, SOURCES, combine, scan_source
+    from skill_index import load_skill_index
+    from timeseries_store import SOURCES as TREND_SOURCES, load_store
+
+    def pandas_aggregates():
+        scanned = [scan_source(source) for source in SOURCES]
+        return {dim: combine([s[dim] for s in scanned]) for dim in DIMENSIONS}
+
+    def same_counts(a, b):
+        return list(a.index) == list(b.index) and list(a) == list(b)
+
+    trends = TREND_SOURCES["linkedin"]
+    skill_sources = [("indeed_webscrape_cleaned.csv", "skills"), ("linkedin_historical_cleaned.csv", "job_skills")]
+    # Queries on a Parquet copy order ties like the pandas path, so the results must be identical
+    for name in [spec["file"] for spec in SOURCES.values()] + [trends["file"]] + [n for n, _ in skill_sources]:
+        cached_parquet(name)
+    exclude_terms = ["inc.", "labs", "university", "manager"]
+    checks = [
+        ("job aggregates", pandas_aggregates, lambda: aggregate_counts(SOURCES, DIMENSIONS),
+         lambda a, b: all(same_counts(a[d], b[d]) for d in DIMENSIONS)),
+        ("indeed postings", lambda: pandas_group_indeed(drop_blank_skills(load_dataset(INDEED_FILE))),
+         lambda: group_indeed(INDEED_FILE), lambda a, b: a.to_csv(index=False) == b.to_csv(index=False)),
+        ("monthly postings", lambda: load_store().query("M"),
+         lambda: postings_per_period(trends["file"], trends["date"], "M"), same_counts),
+    ]
+    for name, column in skill_sources:
+        checks.append((f"skills of {name}",
+                       lambda name=name, column=column: load_skill_index(name, column).counts(exclude_terms, True),
+                       lambda name=name, column=column: skill_counts(name, column, exclude_terms, True),
+                       same_counts))
+
+    results = []
+    for label, pandas_path, sql_path, same in checks:
+        start = time.perf_counter()
+        expected = pandas_path()
+        pandas_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        actual = sql_path()
+        sql_seconds = time.perf_counter() - start
+        results.append((label, same(expected, actual), pandas_seconds, sql_seconds))
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check the DuckDB queries against the pandas path")
+    parser.parse_args()
+    if not HAVE_DUCKDB:
+        raise SystemExit("duckdb is not installed (pip install duckdb)")
+    print(f"{'analysis':<44}{'same':>6}{'pandas s':>10}{'duckdb s':>10}")
+    results = check_parity()
+    for label, same, pandas_seconds, sql_seconds in results:
+        print(f"{label:<44}{'yes' if same else 'NO':>6}{pandas_seconds:>10.2f}{sql_seconds:>10.2f}")
+    if not all(same for _, same, _, _ in results):
+        raise SystemExit(1)
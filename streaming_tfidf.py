@@ -0,0 +1,133 @@
+"""
+streaming_tfidf.py
+Out-of-core "sum of TF-IDF per term" ranking for large skill columns.
+
+Postings are read from the CSV in batches and each term is hashed into one
+of `n_features` buckets, so memory is bounded by the batch size and
+n_features, not by the corpus or its vocabulary.
+
+- Pass 1 tokenizes each batch, accumulates per-bucket term and document
+  frequencies, and spills the batch's bucket-count matrix to a temp dir.
+- Pass 2 reads the spilled matrices back and sums the L2-normalized
+  TF-IDF rows.
+
+Without hash collisions (which are reported) the result is the same as
+TfidfVectorizer(stop_words=..., max_features=...) on the whole column.
+"""
+
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.utils import murmurhash3_32
+
+import schemas
+from dataset_cache import data_path
+
+N_FEATURES = 2 ** 20
+BATCH_SIZE = 50_000
+
+
+def iter_batches(name, column, batch_size=BATCH_SIZE):
+    """Non-null values of one CSV column, batch_size rows at a time."""
+    for chunk in schemas.read_csv(data_path(name), columns=[column], chunksize=batch_size, categorical=False):
+        yield chunk[column].dropna().astype(str).tolist()
+
+
+class HashedTermStats:
+    """Per-bucket term/document frequencies plus the term seen in each bucket."""
+
+    def __init__(self, n_features=N_FEATURES, stop_words='english'):
+        self.n_features = n_features
+        self.analyzer = TfidfVectorizer(stop_words=stop_words).build_analyzer()
+        self.tf = np.zeros(n_features, dtype=np.int64)
+        self.df = np.zeros(n_features, dtype=np.int64)
+        self.n_docs = 0
+        self.names = {}
+        self.collisions = set()
+
+    def transform(self, docs) -> sparse.csr_matrix:
+        """Bucket-count matrix of a batch; also updates the frequency totals."""
+        vocab = {}
+        indices, indptr = [], [0]
+        for doc in docs:
+            for term in self.analyzer(doc):
+                indices.append(vocab.setdefault(term, len(vocab)))
+            indptr.append(len(indices))
+
+        buckets = np.empty(len(vocab), dtype=np.int64)
+        for term, local in vocab.items():
+            bucket = murmurhash3_32(term, seed=0, positive=True) % self.n_features
+            buckets[local] = bucket
+            seen = self.names.setdefault(bucket, term)
+            if seen != term:
+                self.collisions.add(bucket)
+
+        cols = buckets[np.asarray(indices, dtype=np.int64)]
+        counts = sparse.csr_matrix(
+            (np.ones(len(cols), dtype=np.int64), cols, np.asarray(indptr)),
+            shape=(len(docs), self.n_features),
+        )
+        counts.sum_duplicates()
+        self.tf += np.bincount(counts.indices, weights=counts.data, minlength=self.n_features).astype(np.int64)
+        self.df += np.bincount(counts.indices, minlength=self.n_features)
+        self.n_docs += len(docs)
+        return counts
+
+
+def hashed_top_tfidf(batches, k=10, max_features=10, n_features=N_FEATURES, stop_words='english'):
+    """
+    Top-k terms by sum of TF-IDF over all documents in `batches` (an iterable
+    of lists of strings). Returns (Series term -> score, number of colliding
+    buckets among the kept terms).
+    """
+    stats = HashedTermStats(n_features, stop_words)
+    with tempfile.TemporaryDirectory(prefix="tfidf-") as spill_dir:
+        spilled = []
+        for i, docs in enumerate(batches):
+            path = Path(spill_dir) / f"batch{i}.npz"
+            sparse.save_npz(path, stats.transform(docs))
+            spilled.append(path)
+
+        # Terms in alphabetical order, as CountVectorizer sorts its vocabulary,
+        # so ties are broken exactly as in the in-memory path
+        used = np.flatnonzero(stats.df)
+        names = np.array([stats.names[b] for b in used], dtype=object)
+        order = np.argsort(names, kind="stable")
+        used, names = used[order], names[order]
+        if max_features is not None and len(used) > max_features:
+            kept = np.sort((-stats.tf[used]).argsort()[:max_features])
+            used, names = used[kept], names[kept]
+
+        column_of = np.full(n_features, -1, dtype=np.int64)
+        column_of[used] = np.arange(len(used))
+        # Smoothed idf, as TfidfTransformer(smooth_idf=True)
+        idf = np.log((1 + stats.n_docs) / (1 + stats.df[used])) + 1
+        sums = np.zeros(len(used))
+
+        for path in spilled:
+            counts = sparse.load_npz(path).tocoo()
+            keep = column_of[counts.col] >= 0
+            restricted = sparse.csr_matrix(
+                (counts.data[keep] * idf[column_of[counts.col[keep]]], (counts.row[keep], column_of[counts.col[keep]])),
+                shape=(counts.shape[0], len(used)),
+            )
+            norms = np.sqrt(np.asarray(restricted.multiply(restricted).sum(axis=1)).ravel())
+            norms[norms == 0] = 1
+            sums += np.asarray((sparse.diags(1 / norms) @ restricted).sum(axis=0)).ravel()
+
+    top = sums.argsort()[-k:][::-1]
+    collided = len(stats.collisions.intersection(used[top].tolist()))
+    return pd.Series(sums[top], index=names[top], name="tfidf"), collided
+
+
+def top_tfidf_out_of_core(name, column, k=10, max_features=10, batch_size=BATCH_SIZE, n_features=N_FEATURES):
+    """hashed_top_tfidf() over one column of a dataset CSV, streamed in batches."""
+    top, collided = hashed_top_tfidf(iter_batches(name, column, batch_size), k, max_features, n_features)
+    if collided:
+        print(f"streaming_tfidf: {collided} of the top {k} terms share a hash bucket with another term; "
+              f"consider a larger n_features")
+    return top
@@ -0,0 +1,69 @@
+import pandas as pd
+import pytest
+
+from canonical_names import AliasTable, normalize_name, similar
+
+
+@pytest.mark.parametrize("name, key", [
+    ("Google", "google"),
+    ("Google LLC", "google"),
+    ("google inc.", "google"),
+    ("Amazon.com, Inc.", "amazon"),
+    ("AT&amp;T Corp", "at t"),
+    ("Company", "company"),  # a lone suffix is the name
+    (None, ""),
+])
+def test_normalize_company(name, key):
+    assert normalize_name(name, "company") == key
+
+
+@pytest.mark.parametrize("name, key", [
+    ("Sr. Software Engineer", "senior software engineer"),
+    ("Senior Software Engineer", "senior software engineer"),
+    ("Jr Data Eng", "junior data engineer"),
+    ("C++ Developer, Inc", "c++ developer inc"),  # suffixes are only dropped from companies
+])
+def test_normalize_title(name, key):
+    assert normalize_name(name, "title") == key
+
+
+@pytest.mark.parametrize("a, b, expected", [
+    ("amazn", "amazon", True),
+    ("data enginer", "data engineer", True),
+    ("junior data engineer", "senior data engineer", False),
+    ("software engineer ii", "software engineer iii", False),
+    ("c++ developer", "c developer", False),
+    ("data engineer", "senior data engineer", False),  # word counts differ
+    ("meta", "metal", False),  # too short to be a typo
+])
+def test_similar(a, b, expected):
+    assert similar(a, b) is expected
+    assert similar(b, a) is expected
+
+
+def test_update_maps_known_names_by_key():
+    table = AliasTable("company")
+    first = table.update(pd.Series({"Google": 5, "Google LLC": 2, "Amazon": 3}))
+    assert first["added"] == 3 and first["merged"] == 1
+    assert table.aliases["Google LLC"] == "Google"
+
+    # A later run starts from the saved table
+    table = AliasTable("company", table.aliases, table.keys)
+    stats = table.update(pd.Series({"Google": 1, "google inc.": 4, "Amazn": 2, "Netflix": 1}))
+    # "Google" is known; "google inc." has a known key; only "amazn" and
+    # "netflix" are scored, and only "amazn" shares a block (with "amazon")
+    assert stats == {"added": 3, "by_key": 1, "compared": 1, "naive": 5, "avoided": 4, "merged": 1}
+    assert table.aliases["google inc."] == "Google"
+    assert table.aliases["Amazn"] == "Amazon"
+    assert table.aliases["Netflix"] == "Netflix"
+    assert table.update(pd.Series({"Amazn": 1, "Google LLC": 1}))["added"] == 0
+
+
+def test_update_in_chunks_matches_one_update():
+    names = pd.Series(["Google", "Google LLC", "Amazon", "Amazn", "Netflix", "Netflx Inc", "Amazon.com"] * 3)
+    whole = AliasTable("company")
+    whole.update(names.value_counts(sort=False))
+    chunked = AliasTable("company")
+    for start in range(0, len(names), 5):
+        chunked.update(names.iloc[start:start + 5].value_counts(sort=False))
+    assert chunked.lookup(names).tolist() == whole.lookup(names).tolist()
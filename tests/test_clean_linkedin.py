@@ -0,0 +1,81 @@
+"""
+clean_linkedin.py must write the same bytes as the original script, in
+memory and with --stream (whose chunks must agree with a full read).
+"""
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+REPO = Path(__file__).resolve().parent.parent
+
+# The script as it was before the schema, streaming and parallel parsing
+BASELINE = '''
+import json
+import pandas as pd
+
+df = pd.read_csv("linkedin_no_skills.csv")
+
+def extract_date(json_str):
+    try:
+        data = json.loads(json_str)
+        return data.get("datePosted", None)
+    except (json.JSONDecodeError, TypeError):
+        return None
+
+df["datePosted"] = df["context"].apply(extract_date)
+df = df.dropna(subset=["datePosted"])
+df = df.drop_duplicates()
+df.to_csv("linkedin_no_skills_cleaned.csv", index=False)
+'''
+
+
+def _context(date):
+    return json.dumps({"@type": "JobPosting", "datePosted": date, "hiringOrganization": {"name": "Acme"}})
+
+
+def _input(missing_n):
+    rows = []
+    for i in range(60):
+        rows.append({
+            "title": f"Data Engineer {i % 7}",
+            "company": f"Company {i % 5}",
+            "location": "New York, NY" if i % 2 else "Austin, TX",
+            "context": "not json" if i % 11 == 0 else _context(f"2021-0{1 + i % 9}-1{i % 10}"),
+            "n": i % 4,
+        })
+    rows += rows[:5]  # duplicates
+    df = pd.DataFrame(rows)
+    if missing_n:
+        # NaNs only near the end: a chunk on its own would read n as int
+        df.loc[df.index[-3:], "n"] = None
+    return df
+
+
+def _run(data_dir, *args, script=None):
+    env = {**os.environ, "JOB_MARKET_DATA_DIR": str(data_dir), "MPLBACKEND": "Agg"}
+    command = [sys.executable, "-c", script] if script else [sys.executable, str(REPO / "clean_linkedin.py"), *args]
+    subprocess.run(command, cwd=data_dir, env=env, check=True, capture_output=True)
+    return (data_dir / "linkedin_no_skills_cleaned.csv").read_bytes()
+
+
+@pytest.mark.parametrize("missing_n", [False, True])
+def test_cleaned_csv_matches_baseline(tmp_path, missing_n):
+    _input(missing_n).to_csv(tmp_path / "linkedin_no_skills.csv", index=False)
+    expected = _run(tmp_path, script=BASELINE)
+    assert _run(tmp_path) == expected
+    assert _run(tmp_path, "--stream", "--chunksize", "16") == expected
+
+
+@pytest.mark.skipif(not (REPO / "linkedin_no_skills.csv").exists(), reason="sample data not present")
+def test_sample_data_matches_baseline(tmp_path):
+    shutil.copy(REPO / "linkedin_no_skills.csv", tmp_path)
+    expected = _run(tmp_path, script=BASELINE)
+    assert _run(tmp_path) == expected
+    assert _run(tmp_path, "--stream", "--chunksize", "1000") == expected
@@ -0,0 +1,29 @@
+import numpy as np
+import pandas as pd
+
+from clean_skills_plot import group_indeed, join_skills
+
+
+def test_join_skills():
+    codes = np.array([1, 0, 1, 0, 2, 1, 0])
+    skills = pd.Series(["SQL", "Python", "Excel", "Python", "Tableau", "SQL", "R"])
+    # Distinct skills per code, in order of first appearance
+    assert join_skills(codes, skills).tolist() == ["Python, R", "SQL, Excel", "Tableau"]
+    assert join_skills(np.array([], dtype=np.intp), pd.Series([], dtype=object)).tolist() == []
+
+
+def test_group_indeed_merges_links_of_a_posting():
+    df = pd.DataFrame({
+        "job_title": [None, "Analyst", "Engineer"],
+        "job_title-href": ["/rc/clk?jk=a&p=1", "/viewjob?jk=a&p=2", "/rc/clk?jk=b"],
+        "location": ["Austin, TX", "Dallas, TX", "Austin, TX"],
+        "skills": ["SQL", "Python", "SQL"],
+        "company": ["Acme", "Acme", "Globex"],
+    })
+    grouped = group_indeed(df).reset_index(drop=True)
+    assert grouped.to_dict("records") == [
+        {"job_title-href": "/rc/clk?jk=a&p=1", "job_title": "Analyst", "location": "Austin, TX",
+         "company": "Acme", "skills": "SQL, Python"},
+        {"job_title-href": "/rc/clk?jk=b", "job_title": "Engineer", "location": "Austin, TX",
+         "company": "Globex", "skills": "SQL"},
+    ]
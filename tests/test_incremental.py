@@ -0,0 +1,86 @@
+"""
+The --incremental stages must end up with the same cleaned file as a full
+rebuild when rows are appended between runs, including a final row caught
+half written.
+"""
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+REPO = Path(__file__).resolve().parent.parent
+
+CLEAN_INDEED = f"""
+import sys
+sys.path.insert(0, {str(REPO)!r})
+from clean_skills_plot import clean_indeed_incremental
+clean_indeed_incremental()
+"""
+
+
+def _linkedin_rows(n=90):
+    rows = []
+    for i in range(n):
+        context = "not json" if i % 11 == 0 else json.dumps({"datePosted": f"2021-0{1 + i % 9}-1{i % 10}"})
+        rows.append({"title": f"Data Engineer {i % 7}", "company": f"Company {i % 5}",
+                     "location": "New York, NY" if i % 2 else "Austin, TX", "context": context, "n": i % 4})
+    return pd.DataFrame(rows + rows[:5] + rows[40:45])  # duplicates, also across the appends
+
+
+def _indeed_rows(n=120, seed=0):
+    rng = np.random.default_rng(seed)
+    jobs = rng.integers(0, 25, n)
+    # Repeat scrapes list a posting under new tracking parameters, or as an ad
+    hrefs = [f"/pagead/clk?mo=r&ad=A{j}&p={rng.integers(20)}" if j % 6 == 0
+             else f"/rc/clk?jk={j:04x}&from=serp&vjs={rng.integers(5)}" for j in jobs]
+    titles = pd.Series([f"Analyst {j}" for j in jobs], dtype=object)
+    titles[rng.random(n) < 0.3] = None  # filled in by later rows of the posting
+    return pd.DataFrame({
+        "job_title": titles,
+        "job_title-href": hrefs,
+        "location": [f"City {j % 4}" for j in jobs],
+        "skills": rng.choice(["Python", "SQL", "Excel", "Tableau", " "], n),
+        "company": [f"Company {j % 7}" for j in jobs],
+    })
+
+
+def _run(data_dir, output, *args, script=None):
+    env = {**os.environ, "JOB_MARKET_DATA_DIR": str(data_dir), "MPLBACKEND": "Agg"}
+    command = [sys.executable, "-c", script] if script else [sys.executable, *args]
+    subprocess.run(command, cwd=data_dir, env=env, check=True, capture_output=True)
+    return (data_dir / output).read_bytes()
+
+
+def _appends(text):
+    """The file after each append: a third of the rows, then more plus half a row, then the rest."""
+    lines = text.splitlines(keepends=True)
+    first, second = len(lines) // 3, 2 * len(lines) // 3
+    half = len(lines[second]) // 2
+    return ["".join(lines[:first]), "".join(lines[:second]) + lines[second][:half], text]
+
+
+@pytest.mark.parametrize("stage", ["linkedin", "indeed"])
+def test_incremental_appends_match_full_rebuild(tmp_path, stage):
+    if stage == "linkedin":
+        source, output, df = "linkedin_no_skills.csv", "linkedin_no_skills_cleaned.csv", _linkedin_rows()
+        args, script = [str(REPO / "clean_linkedin.py"), "--incremental"], None
+    else:
+        source, output, df = "indeed_webscrape.csv", "indeed_webscrape_cleaned.csv", _indeed_rows()
+        args, script = [], CLEAN_INDEED
+    text = df.to_csv(index=False)
+    full_dir, incremental_dir = tmp_path / "full", tmp_path / "incremental"
+    full_dir.mkdir()
+    incremental_dir.mkdir()
+
+    (full_dir / source).write_text(text)
+    expected = _run(full_dir, output, *args, script=script)
+    for contents in _appends(text):
+        (incremental_dir / source).write_text(contents)
+        _run(incremental_dir, output, *args, script=script)
+    assert (incremental_dir / output).read_bytes() == expected
@@ -0,0 +1,31 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parent.parent
+
+# No `resource` module, no SIGPROF and no /proc, as on Windows
+WINDOWS_LIKE = '''
+import signal, sys
+import pandas
+sys.modules["resource"] = None
+del signal.SIGPROF
+sys.platform = "win32"
+import instrumentation
+assert instrumentation.resource is None
+assert not instrumentation.reset_peak_rss()
+with instrumentation.step("work", rows_in=3) as s:
+    s.rows_out = sum(range(10 ** 5))
+assert instrumentation._recorder.steps["work"]["calls"] == 1
+import warnings
+with warnings.catch_warnings(record=True) as caught:
+    warnings.simplefilter("always")
+    assert isinstance(instrumentation._start_profiler(), instrumentation._CProfiler)
+assert caught and "SIGPROF" in str(caught[0].message)
+'''
+
+
+def test_imports_without_unix_modules(tmp_path):
+    env = {**os.environ, "JOB_MARKET_DATA_DIR": str(tmp_path), "JOB_MARKET_PROFILE": "sample"}
+    subprocess.run([sys.executable, "-c", WINDOWS_LIKE], cwd=REPO, env=env, check=True)
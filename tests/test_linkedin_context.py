@@ -0,0 +1,27 @@
+import json
+
+import pandas as pd
+
+from linkedin_context import extract_context, extract_date, extract_dates
+
+CASES = [
+    '{"datePosted": "2021-01-01", "baseSalary": NaN}',
+    '{"hiringOrganization": {"datePosted": "2020-01-01"}, "title": "x"}',
+    '{"hiringOrganization": {"datePosted": "2020-01-01"}, "datePosted": "2021-02-02"}',
+    '{"description": "braces { [ in text", "datePosted": "2021-03-03"}',
+    '{"description": "an escaped \\" {", "datePosted": "2021-04-04"}',
+    '{"jobLocation": [{"address": "Austin"}], "datePosted": "2021-05-05"}',
+    json.dumps({"@type": "JobPosting", "datePosted": "2021-06-06", "description": "x" * 1000}),
+    "not json",
+]
+
+
+def test_dates_match_json_loads():
+    expected = [extract_date(c) for c in CASES]
+    assert extract_dates(pd.Series(CASES, dtype=object)).where(lambda s: s.notna(), None).tolist() == expected
+
+
+def test_parallel_engine_matches_json_loads():
+    expected = [extract_date(c) for c in CASES]
+    extracted = extract_context(pd.Series(CASES), fields=["datePosted", "validThrough"], workers=2, shard_size=3)
+    assert extracted["datePosted"].tolist() == expected
@@ -0,0 +1,27 @@
+import pandas as pd
+import pytest
+
+from posting_urls import canonical_url, posting_keys
+
+
+@pytest.mark.parametrize("href, expected", [
+    ("/rc/clk?jk=abc123&from=serp&vjs=3", "jk:abc123"),
+    ("https://www.indeed.com/viewjob?from=serp&jk=abc123#apply", "jk:abc123"),
+    ("/jobs?q=data&vjk=abc123", "jk:abc123"),
+    ("/jobs?vjk=other&jk=abc123", "jk:abc123"),  # jk= wins over vjk=
+    ("/pagead/clk?mo=r&ad=TOKEN&xkcb=1&camk=2&p=12&fvj=0&vjs=3", "ad:TOKEN"),
+    ("/pagead/clk?ad=TOKEN&jk=abc123", "jk:abc123"),  # a job key wins over an ad token
+    ("/rc/clk?jk=&ad=TOKEN", "ad:TOKEN"),  # empty values don't count
+    ("/rc/clk?jk=first&jk=second", "jk:first"),
+    ("/company/acme/jobs?from=serp&p=2#top", "/company/acme/jobs"),
+    ("/company/acme/jobs#top?jk=abc123", "/company/acme/jobs"),  # a fragment ends the link
+])
+def test_canonical_url(href, expected):
+    assert canonical_url(href) == expected
+
+
+def test_posting_keys():
+    hrefs = pd.Series(["/rc/clk?jk=a&p=1", "/viewjob?jk=a&p=2", "/rc/clk?jk=b", "/pagead/clk?ad=a"])
+    keys = posting_keys(hrefs)
+    assert keys[0] == keys[1]
+    assert len(set(keys[1:])) == 3
@@ -0,0 +1,75 @@
+import pandas as pd
+import pytest
+
+from query_engine import Filter, QueryEngine, parse_query
+
+
+@pytest.fixture
+def engine():
+    return QueryEngine(pd.DataFrame({
+        "job_title": ["Data Engineer", "Data Scientist", "Analyst", "Data Engineer", None],
+        "company": ["Acme", "Globex", "Acme", "Initech", "Globex"],
+        "job_location": ["Bengaluru", "Austin, TX", "Bengaluru", "Austin, TX", "Pune"],
+        "job_skills": ["Python, SQL, PySpark", "python, R", "Excel", None, "SQL"],
+        "job_link": [f"https://example.com/{i}" for i in range(5)],
+    }))
+
+
+def _ids(engine, text):
+    filters, search = parse_query(text)
+    return engine.query(filters, search).rows.index.tolist()
+
+
+@pytest.mark.parametrize("text, filters, search", [
+    ("location contains Bengaluru", [Filter("location", "contains", "Bengaluru")], []),
+    ("title not contains data", [Filter("title", "not contains", "data")], []),
+    ("company == nothing else", [Filter("company", "==", "nothing else")], []),
+    ("company = Acme", [Filter("company", "==", "Acme")], []),
+    ("company NOT CONTAINS acme", [Filter("company", "not contains", "acme")], []),
+    ("company == 'Acme'; \"data engineer\"", [Filter("company", "==", "Acme")], ["data engineer"]),
+    ("company == 'A; B'; python", [Filter("company", "==", "A; B")], ["python"]),
+    ("company == McDonald's; title startswith Data",
+     [Filter("company", "==", "McDonald's"), Filter("title", "startswith", "Data")], []),
+    (" ; python ;; ", [], ["python"]),
+])
+def test_parse_query(text, filters, search):
+    assert parse_query(text) == (filters, search)
+
+
+def test_filters(engine):
+    assert _ids(engine, "company = acme") == [0, 2]
+    assert _ids(engine, "location contains bengaluru; title startswith data") == [0]
+    assert _ids(engine, "link contains /3") == [3]  # not indexed: scanned
+    assert _ids(engine, "austin") == [1, 3]
+
+
+def test_negated_filters(engine):
+    assert _ids(engine, "company != Acme") == [1, 3, 4]
+    assert _ids(engine, "title not contains data") == [2, 4]  # a missing title contains nothing
+    assert _ids(engine, "skills not contains sql") == [1, 2, 3]
+
+
+def test_skill_lookups(engine):
+    assert _ids(engine, "skills == python") == [0, 1]  # skills are matched ignoring case
+    # "py" selects two skills of row 0; the row is listed once
+    assert _ids(engine, "skills contains py") == [0, 1]
+    assert _ids(engine, "skills == py") == []
+
+
+def test_unknown_column_or_op(engine):
+    with pytest.raises(ValueError, match="unknown column"):
+        engine.query([Filter("salary", "==", "1")])
+    with pytest.raises(ValueError, match="op must be one of"):
+        engine.query([Filter("company", ">", "A")])
+
+
+def test_pagination(engine):
+    first = engine.query(page=0, page_size=2)
+    assert (first.total, first.page, first.pages) == (5, 0, 3)
+    assert first.rows.index.tolist() == [0, 1]
+    last = engine.query(page=2, page_size=2)
+    assert last.rows.index.tolist() == [4]
+    assert engine.query(page=7, page_size=2).page == 2
+    assert engine.query(page=-1, page_size=2).page == 0
+    empty = engine.query([Filter("company", "==", "Umbrella")], page=3)
+    assert (empty.total, empty.page, empty.pages, len(empty.rows)) == (0, 0, 1, 0)
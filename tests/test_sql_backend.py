@@ -0,0 +1,81 @@
+"""
+Every DuckDB query of sql_backend.py against its pandas path, on the sample
+data (like `python sql_backend.py`, which also times them).
+"""
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("duckdb")
+
+import sql_backend  # noqa: E402
+from clean_skills_plot import INDEED_FILE, drop_blank_skills, group_indeed  # noqa: E402
+from dataset_cache import cached_parquet, data_path, load_dataset  # noqa: E402
+from job_aggregates import DIMENSIONS, SOURCES, combine, scan_source  # noqa: E402
+from schemas import SCHEMAS  # noqa: E402
+from skill_index import load_skill_index  # noqa: E402
+from timeseries_store import SOURCES as TREND_SOURCES, load_store  # noqa: E402
+
+TRENDS = TREND_SOURCES["linkedin"]
+SKILL_SOURCES = [("indeed_webscrape_cleaned.csv", "skills"), ("linkedin_historical_cleaned.csv", "job_skills")]
+EXCLUDE_TERMS = ["inc.", "labs", "university", "manager"]
+
+
+def _require(*names):
+    missing = [name for name in names if not data_path(name).exists()]
+    if missing:
+        pytest.skip(f"sample data not present: {', '.join(missing)}")
+    # Queries on a Parquet copy order ties like the pandas path
+    for name in names:
+        cached_parquet(name)
+
+
+def _objects(df):
+    df = df.astype(object)
+    return df.where(df.notna(), None)
+
+
+def test_aggregate_counts():
+    _require(*[spec["file"] for spec in SOURCES.values()])
+    scanned = [scan_source(source) for source in SOURCES]
+    actual = sql_backend.aggregate_counts(SOURCES, DIMENSIONS)
+    for dim in DIMENSIONS:
+        expected = combine([s[dim] for s in scanned])
+        pd.testing.assert_frame_equal(actual[dim].to_frame(), expected.to_frame(), check_index_type=False)
+
+
+def test_group_indeed():
+    _require(INDEED_FILE)
+    expected = group_indeed(drop_blank_skills(load_dataset(INDEED_FILE)))
+    actual = sql_backend.group_indeed(INDEED_FILE)
+    # The pandas index holds posting keys; both are written with index=False
+    expected = expected.reset_index(drop=True)
+    # Column dtypes differ (categories, Arrow strings), and so do their missing values
+    pd.testing.assert_frame_equal(_objects(actual), _objects(expected))
+
+
+def test_postings_per_period():
+    _require(TRENDS["file"])
+    for freq in ("D", "W", "M"):
+        expected = load_store().query(freq)
+        actual = sql_backend.postings_per_period(TRENDS["file"], TRENDS["date"], freq)
+        pd.testing.assert_frame_equal(actual.to_frame(), expected.to_frame())
+
+
+@pytest.mark.parametrize("name, column", SKILL_SOURCES)
+def test_skill_counts(name, column):
+    _require(name)
+    expected = load_skill_index(name, column).counts(EXCLUDE_TERMS, True)
+    actual = sql_backend.skill_counts(name, column, EXCLUDE_TERMS, True)
+    pd.testing.assert_frame_equal(actual.to_frame(), expected.to_frame(), check_index_type=False)
+
+
+@pytest.mark.parametrize("name", sorted(SCHEMAS))
+def test_numeric_columns_match_csv(name):
+    """Typed loads keep the numbers DuckDB reads from the CSV (an integer column stays integer)."""
+    _require(name)
+    scanned = sql_backend.connection().sql(f"SELECT * FROM read_csv({sql_backend._literal(data_path(name))})").df()
+    numeric = [c for c, t in scanned.dtypes.items() if pd.api.types.is_numeric_dtype(t)]
+    # pandas reads an integer column with missing values as float64
+    expected = scanned[numeric].apply(lambda col: col.astype("float64") if col.hasnans else col)
+    pd.testing.assert_frame_equal(load_dataset(name)[numeric], expected)
@@ -0,0 +1,81 @@
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import dataset_cache
+import timeseries_store
+from timeseries_store import SOURCES, TimeSeriesStore, load_store
+
+SAMPLE = Path(__file__).resolve().parent.parent / SOURCES["linkedin"]["file"]
+
+
+def _postings(n=400, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.Timestamp("2021-01-01") + pd.to_timedelta(rng.integers(0, 300, n), unit="D")
+    return pd.DataFrame({
+        "title": rng.choice(["Sr. Data Engineer", "Data Engineer", "Data Scientist"], n),
+        "company": rng.choice(["Acme", "Globex", "Initech"], n),
+        "location": rng.choice(["New York, NY", "Austin, TX"], n),
+        "context": "{}",
+        "n": 1,
+        "datePosted": dates.strftime("%Y-%m-%d"),
+    })
+
+
+def _assert_same(a: TimeSeriesStore, b: TimeSeriesStore):
+    for freq in ("D", "W", "M"):
+        left, right = a.matrix(freq), b.matrix(freq)
+        pd.testing.assert_frame_equal(left.sort_index(), right.sort_index())
+
+
+def test_add_matches_full_build():
+    df = _postings()
+    # The appended rows start earlier and end later, and bring a new company
+    head = df.iloc[:300]
+    tail = df.iloc[300:].assign(company="Umbrella")
+    full = pd.concat([head, tail])
+    _assert_same(TimeSeriesStore.build(head).add(TimeSeriesStore.build(tail)), TimeSeriesStore.build(full))
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(dataset_cache, "DATA_DIR", tmp_path)
+    monkeypatch.setattr(dataset_cache, "CACHE_DIR", tmp_path / ".dataset_cache")
+    monkeypatch.setattr(timeseries_store, "STORE_DIR", tmp_path / ".timeseries")
+    return tmp_path
+
+
+def test_load_store_appends_new_rows(data_dir, monkeypatch):
+    path = data_dir / SOURCES["linkedin"]["file"]
+    df = _postings()
+    df.iloc[:250].to_csv(path, index=False)
+    load_store()
+    with open(path, "a", newline="") as f:
+        df.iloc[250:].to_csv(f, index=False, header=False)
+
+    # Only the appended rows may be read: a full rebuild would fail here
+    monkeypatch.setattr(timeseries_store, "load_dataset", None)
+    _assert_same(load_store(), TimeSeriesStore.build(df))
+
+
+def test_load_store_rebuilds_rewritten_history(data_dir):
+    path = data_dir / SOURCES["linkedin"]["file"]
+    df = _postings()
+    df.to_csv(path, index=False)
+    load_store()
+    rewritten = _postings(seed=1)
+    rewritten.to_csv(path, index=False)
+    _assert_same(load_store(), TimeSeriesStore.build(rewritten))
+
+
+@pytest.mark.skipif(not SAMPLE.exists(), reason="sample data not present")
+def test_sample_data_append(data_dir):
+    lines = SAMPLE.read_bytes().splitlines(keepends=True)
+    path = data_dir / SAMPLE.name
+    path.write_bytes(b"".join(lines[:len(lines) // 2]))
+    load_store()
+    shutil.copy(SAMPLE, path)
+    _assert_same(load_store(), TimeSeriesStore.build(pd.read_csv(SAMPLE)))
@@ -0,0 +1,241 @@
+"""
+timeseries_store.py
+Daily posting counts per segment, with weekly and monthly rollups.
+
+The cleaned LinkedIn postings are counted once per day for the total and
+for every company, location and title family, into an int32 NumPy array
+(one row per segment, one column per day). Weekly (Monday-Sunday) and
+monthly sums are precomputed. The arrays are stored under ./.timeseries/
+and memory-mapped on load. When the source CSV changes, the store is kept in
+step the way the cleaning stages keep their outputs (see incremental.py):
+rows appended since the last load are counted and added, and only a
+rewrite of earlier rows rebuilds it from the whole file.
+
+    store = load_store()
+    store.query("M")                                    # total per month
+    store.query("D", "2021-03-01", "2021-03-31")        # total per day
+    store.query("W", dimension="company", segment="Amazon.com Inc")
+    store.matrix("M")                                   # every segment per month
+
+Ranges are inclusive dates. A week or month cut by the range only counts
+the days inside it (summed from the daily array); otherwise the rollup is
+sliced directly.
+"""
+
+import json
+import os
+import re
+import shutil
+
+import numpy as np
+import pandas as pd
+
+import incremental
+from dataset_cache import DATA_DIR, data_path, fingerprint, load_dataset, replace_dir
+from schemas import parse_dates
+
+STORE_DIR = DATA_DIR / ".timeseries"
+
+# Sources with a posting date, and the column holding it
+SOURCES = {"linkedin": {"file": "linkedin_no_skills_cleaned.csv", "date": "datePosted"}}
+
+# Segment dimension -> column it is read from
+DIMENSIONS = {"company": "company", "location": "location", "title_family": "title"}
+
+FREQS = {"D": "daily", "W": "weekly", "M": "monthly"}
+
+# Seniority words dropped when grouping titles into families
+SENIORITY_RE = re.compile(
+    r"\b(senior|sr|junior|jr|lead|principal|staff|associate|intern|entry level|mid level|i{1,3}|iv)\b\.?"
+)
+
+
+def title_families(titles: pd.Series) -> pd.Series:
+    """'Sr. Data Engineer' -> 'data engineer'. Each distinct title is normalized once."""
+    codes, uniques = pd.factorize(titles)
+    families = (pd.Series(uniques, dtype=object).str.lower()
+                .str.replace(SENIORITY_RE, " ", regex=True)
+                .str.replace(r"[^\w+#]+", " ", regex=True)
+                .str.strip())
+    families = families.where(families != "", pd.Series(uniques, dtype=object).str.lower())
+    result = np.where(codes >= 0, families.to_numpy()[codes], None)
+    return pd.Series(result, index=titles.index, dtype=object)
+
+
+class TimeSeriesStore:
+    def __init__(self, segments: pd.MultiIndex, start: pd.Timestamp, daily, weekly, monthly):
+        self.segments = segments
+        self.start = start
+        self.arrays = {"D": daily, "W": weekly, "M": monthly}
+        self.rows = {key: i for i, key in enumerate(segments)}
+
+    @property
+    def n_days(self):
+        return self.arrays["D"].shape[1]
+
+    @property
+    def end(self) -> pd.Timestamp:
+        return self.start + pd.Timedelta(days=self.n_days - 1)
+
+    @classmethod
+    def build(cls, df: pd.DataFrame, date_column="datePosted") -> "TimeSeriesStore":
+        """Count the postings in df per day, for the total and every segment of DIMENSIONS."""
+        dates = parse_dates(df[date_column])
+        valid = dates.notna().to_numpy()
+        start = dates.min()
+        n_days = (dates.max() - start).days + 1
+        day = (dates[valid] - start).dt.days.to_numpy()
+
+        keys, rows = [("total", "all")], [np.zeros(len(day), dtype=np.int64)]
+        for dimension, column in DIMENSIONS.items():
+            values = title_families(df[column]) if dimension == "title_family" else df[column]
+            codes, uniques = pd.factorize(values[valid])
+            keys += [(dimension, u) for u in uniques]
+            rows.append(np.where(codes >= 0, codes + len(keys) - len(uniques), -1))
+        row = np.concatenate(rows)
+        day = np.tile(day, len(rows))
+        keep = row >= 0
+
+        flat = np.bincount(row[keep] * n_days + day[keep], minlength=len(keys) * n_days)
+        daily = flat.reshape(len(keys), n_days).astype(np.int32)
+        segments = pd.MultiIndex.from_tuples(keys, names=["dimension", "segment"])
+        return cls(segments, start, daily, None, None)._rollup()
+
+    def add(self, other: "TimeSeriesStore") -> "TimeSeriesStore":
+        """
+        This store plus the counts of `other` (e.g. built from rows appended
+        to the source since), with the days and segments of both.
+        """
+        segments = self.segments.append(other.segments[~other.segments.isin(self.segments)])
+        segments.names = self.segments.names
+        start = min(self.start, other.start)
+        n_days = (max(self.end, other.end) - start).days + 1
+        daily = np.zeros((len(segments), n_days), dtype=np.int32)
+        for store in (self, other):
+            first = (store.start - start).days
+            daily[segments.get_indexer(store.segments), first:first + store.n_days] += store.arrays["D"]
+        return TimeSeriesStore(segments, start, daily, None, None)._rollup()
+
+    def _rollup(self) -> "TimeSeriesStore":
+        """Recompute the weekly and monthly sums from the daily array (in place)."""
+        daily = self.arrays["D"]
+        for freq in ("W", "M"):
+            self.arrays[freq] = self._sum_days(daily, self.periods(freq), 0, self.n_days - 1)
+        return self
+
+    def save(self, directory):
+        tmp = directory.with_name(f"{directory.name}.{os.getpid()}.tmp")
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir(parents=True)
+        for freq, name in FREQS.items():
+            np.save(tmp / f"{name}.npy", self.arrays[freq])
+        with open(tmp / "segments.json", "w") as f:
+            json.dump({"start": self.start.strftime("%Y-%m-%d"), "segments": list(map(list, self.segments))}, f)
+        replace_dir(tmp, directory)
+
+    @classmethod
+    def load(cls, directory) -> "TimeSeriesStore":
+        arrays = {freq: np.load(directory / f"{name}.npy", mmap_mode="r") for freq, name in FREQS.items()}
+        with open(directory / "segments.json") as f:
+            meta = json.load(f)
+        segments = pd.MultiIndex.from_tuples(map(tuple, meta["segments"]), names=["dimension", "segment"])
+        return cls(segments, pd.Timestamp(meta["start"]), arrays["D"], arrays["W"], arrays["M"])
+
+    def periods(self, freq, start=None, end=None) -> pd.PeriodIndex:
+        """Periods of `freq` overlapping [start, end] (default: the whole store)."""
+        return pd.period_range(pd.Period(start or self.start, freq), pd.Period(end or self.end, freq), freq=freq)
+
+    def _day(self, date) -> int:
+        return (pd.Timestamp(date).normalize() - self.start).days
+
+    def _sum_days(self, daily, periods, first_day, last_day):
+        """Per-period sums of daily[:, first_day:last_day + 1] (periods cover that range)."""
+        bounds = (periods.start_time - self.start).days.to_numpy()
+        bounds = np.clip(bounds, first_day, None) - first_day
+        window = daily[:, first_day:last_day + 1]
+        return np.add.reduceat(window, bounds, axis=1).astype(np.int32) if window.shape[1] else window
+
+    def _window(self, freq, start, end, rows):
+        if freq not in FREQS:
+            raise ValueError(f"freq must be one of {list(FREQS)}, not {freq!r}")
+        first_day = max(0, self._day(start)) if start is not None else 0
+        last_day = min(self.n_days - 1, self._day(end)) if end is not None else self.n_days - 1
+        if last_day < first_day:
+            return np.zeros((len(rows), 0), dtype=np.int32), pd.PeriodIndex([], freq=freq)
+        periods = self.periods(freq, self.start + pd.Timedelta(days=first_day), self.start + pd.Timedelta(days=last_day))
+        if freq == "D":
+            return np.asarray(self.arrays["D"][rows, first_day:last_day + 1]), periods
+
+        # Whole periods (or the store's edges) come straight from the rollup
+        offset = (periods[0] - self.periods(freq)[0]).n
+        aligned = (first_day == max(0, self._day(periods[0].start_time))
+                   and last_day == min(self.n_days - 1, self._day(periods[-1].end_time)))
+        if aligned:
+            return np.asarray(self.arrays[freq][rows, offset:offset + len(periods)]), periods
+        return self._sum_days(self.arrays["D"][rows], periods, first_day, last_day), periods
+
+    def query(self, freq="M", start=None, end=None, dimension="total", segment="all") -> pd.Series:
+        """Postings of one segment per period of `freq` ('D', 'W' or 'M') between start and end."""
+        row = self.rows[(dimension, segment)]
+        values, periods = self._window(freq, start, end, [row])
+        return pd.Series(values[0], index=periods, name=segment)
+
+    def matrix(self, freq="M", start=None, end=None, dimension=None) -> pd.DataFrame:
+        """Postings per segment (rows) and period (columns); all segments, or one dimension's."""
+        if dimension is None:
+            rows = np.arange(len(self.segments))
+        else:
+            rows = np.flatnonzero(self.segments.get_level_values(0) == dimension)
+        values, periods = self._window(freq, start, end, rows)
+        return pd.DataFrame(values, index=self.segments[rows], columns=periods)
+
+
+def _store_dir(source):
+    return STORE_DIR / source
+
+
+def _write_meta(meta_file, meta):
+    tmp = meta_file.with_suffix(f".{os.getpid()}.tmp")
+    with open(tmp, "w") as f:
+        json.dump(meta, f)
+    os.replace(tmp, meta_file)
+
+
+def load_store(source="linkedin") -> TimeSeriesStore:
+    """
+    The store of a SOURCES entry, from disk if it is up to date with the CSV.
+
+    If rows were only appended to the CSV since the store was saved (as
+    `clean_linkedin.py --incremental` does), just those rows are counted
+    and added; if earlier rows changed, the store is rebuilt from the CSV.
+    """
+    spec = SOURCES[source]
+    directory = _store_dir(source)
+    meta_file = STORE_DIR / f"{source}.json"
+    try:
+        with open(meta_file) as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        meta = {}
+    fp = fingerprint(data_path(spec["file"]), meta.get("source"))
+    if meta.get("source", {}).get("hash") == fp["hash"] and directory.exists():
+        if meta["source"] != fp:
+            meta["source"] = fp
+            _write_meta(meta_file, meta)
+        return TimeSeriesStore.load(directory)
+
+    columns = [spec["date"]] + sorted(set(DIMENSIONS.values()))
+    delta = None
+    if directory.exists():
+        delta, mark = incremental.read_appended(spec["file"], meta.get("watermark"))
+    if delta is None:
+        mark = incremental.watermark(spec["file"])
+        store = TimeSeriesStore.build(load_dataset(spec["file"], columns=columns), spec["date"])
+    else:
+        store = TimeSeriesStore.load(directory)
+        delta = delta[columns]
+        if parse_dates(delta[spec["date"]]).notna().any():
+            store = store.add(TimeSeriesStore.build(delta, spec["date"]))
+    store.save(directory)
+    _write_meta(meta_file, {"source": fp, "watermark": mark})
+    return store
@@ -1,31 +1,27 @@
 # TOP HIRING COMPANIES
 # USES ALL 3 DATASETS (INDEED, LINKEDIN SKILLS, LINKEDIN DATES)
 
-import pandas as pd
 import matplotlib.pyplot as plt
+from plotting import show
+from instrumentation import step
+from job_aggregates import top_counts
 
-# Step 1: Load all three datasets
-indeed_data = pd.read_csv("job-market-analysis/indeed_webscrape.csv")
-linkedin_historical_data = pd.read_csv("job-market-analysis/linkedin_historical.csv")
-linkedin_no_skills_data = pd.read_csv("job-market-analysis/linkedin_no_skills.csv")
+# Step 1: Count the occurrences of each company across all three datasets
+# (titles, companies and locations are counted in one scan; see job_aggregates.py).
+# Variants of a name ("Google LLC", "google inc.") count as one (see canonical_names.py)
+with step("aggregate"):
+    top_companies = top_counts("company", 10, canonical=True)
 
-# Step 2: Extract company names from each dataset
-indeed_companies = indeed_data['company']  # Extract from Indeed
-linkedin_historical_companies = linkedin_historical_data['company']  # Extract from LinkedIn Historical
-linkedin_no_skills_companies = linkedin_no_skills_data['company']  # Extract from LinkedIn No Skills
+# Step 2: Plot the top 10 hiring companies
+def plot_counts(counts):
+    plt.figure(figsize=(12, 6))  # Increase the figure size to accommodate longer labels
+    counts.plot(kind='bar', color='orange')
+    plt.title("Top 10 Hiring Companies from All Datasets")
+    plt.xlabel("Company")
+    plt.ylabel("Number of Job Postings")
+    plt.xticks(rotation=45, ha='right')  # Rotate labels and align them to the right
+    plt.tight_layout()  # Adjust the layout to ensure everything fits
 
-# Step 3: Combine all companies into one series
-all_companies = pd.concat([indeed_companies, linkedin_historical_companies, linkedin_no_skills_companies])
-
-# Step 4: Count the occurrences of each company
-top_companies = all_companies.value_counts().head(10)
-
-# Step 5: Plot the top 10 hiring companies
-plt.figure(figsize=(12, 6))  # Increase the figure size to accommodate longer labels
-top_companies.plot(kind='bar', color='orange')
-plt.title("Top 10 Hiring Companies from All Datasets")
-plt.xlabel("Company")
-plt.ylabel("Number of Job Postings")
-plt.xticks(rotation=45, ha='right')  # Rotate labels and align them to the right
-plt.tight_layout()  # Adjust the layout to ensure everything fits
-plt.show()
+# Shown, or saved as graphs/Top10HiringCompanies.png when headless (see plotting.py)
+with step("plot"):
+    show("Top10HiringCompanies", top_companies, plot_counts)